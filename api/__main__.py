@@ -1,11 +1,26 @@
+import sys
+from functools import partial
 from logging import getLogger
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette import status
 from uvicorn import run
 
 from api.config import DefaultSettings
 from api.config.utils import get_settings
+from api.db.connection import RedisManager, SessionManager
 from api.endpoints import list_of_routes
+from api.logs import LoggingManager
+from api.metrics.middleware import MetricsMiddleware
+from api.repositories.blocklist_filter import BlocklistFilterManager
+from api.repositories.storage import TieredStorageManager
+from api.repositories.user_cache import UserCacheManager
+from api.responses import OrjsonResponse
+from api.server import Arbiter
+from api.services.jwt.cache import TokenCacheManager
+from api.services.passwords.exc import HashingQueueFullError
+from api.services.passwords.service import PasswordHasher
 from api.utils import get_hostname
 
 
@@ -20,6 +35,61 @@ def bind_routes(application: FastAPI, setting: DefaultSettings) -> None:
         application.include_router(route, prefix=setting.PATH_PREFIX)
 
 
+def bind_events(application: FastAPI, setting: DefaultSettings) -> None:
+    """
+    Bind startup and shutdown of long-lived resources to application lifespan.
+    """
+    logging_manager = LoggingManager()
+    session_manager = SessionManager()
+    redis_manager = RedisManager()
+    tiered_storage_manager = TieredStorageManager()
+    blocklist_filter_manager = BlocklistFilterManager()
+    token_cache_manager = TokenCacheManager()
+    user_cache_manager = UserCacheManager()
+    hasher = PasswordHasher()
+
+    resources = [
+        (logging_manager.start, logging_manager.stop),
+        (session_manager.start, session_manager.dispose),
+    ]
+    if setting.redis_required:
+        resources.append((redis_manager.connect, redis_manager.close))
+    resources += [
+        (tiered_storage_manager.start, tiered_storage_manager.stop),
+        (blocklist_filter_manager.start, blocklist_filter_manager.stop),
+        (token_cache_manager.start, token_cache_manager.stop),
+        (user_cache_manager.start, user_cache_manager.stop),
+        (partial(hasher.start, **setting.password_hash_settings), hasher.shutdown),
+    ]
+    for startup, _ in resources:
+        application.add_event_handler("startup", startup)
+    for _, shutdown in reversed(resources):
+        application.add_event_handler("shutdown", shutdown)
+
+
+async def hashing_queue_full_handler(_: Request, exc: HashingQueueFullError) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
+def bind_exception_handlers(application: FastAPI) -> None:
+    """
+    Bind handlers for exceptions that are not raised by endpoints directly.
+    """
+    application.add_exception_handler(HashingQueueFullError, hashing_queue_full_handler)
+
+
+def bind_middlewares(application: FastAPI, setting: DefaultSettings) -> None:
+    """
+    Bind ASGI middlewares wrapping every request.
+    """
+    if setting.METRICS_ENABLED:
+        application.add_middleware(MetricsMiddleware, server_timing=setting.SERVER_TIMING_ENABLED)
+
+
 def get_app() -> FastAPI:
     """
     Creates application and all dependable objects.
@@ -48,9 +118,13 @@ def get_app() -> FastAPI:
         openapi_url="/openapi",
         version="1.0.0",
         openapi_tags=tags_metadata,
+        default_response_class=OrjsonResponse,
     )
     settings = get_settings()
     bind_routes(application, settings)
+    bind_events(application, settings)
+    bind_exception_handlers(application)
+    bind_middlewares(application, settings)
     application.state.settings = settings
 
     return application
@@ -61,6 +135,8 @@ app = get_app()
 
 if __name__ == "__main__":  # pragma: no cover
     settings_for_application = get_settings()
+    if settings_for_application.SERVER_MODE == "production":
+        sys.exit(Arbiter(app, settings_for_application).run())
     run(
         "api.__main__:app",
         host=get_hostname(settings_for_application.APP_HOST),
@@ -0,0 +1,67 @@
+"""
+Bulk import users from a CSV (with header) or NDJSON file:
+
+    python -m api.cli.import_users users.csv
+    python -m api.cli.import_users users.ndjson --batch-size 5000
+
+Rows that were not imported are printed to stdout as NDJSON, followed by a summary line.
+"""
+import argparse
+import asyncio
+import sys
+import typing as tp
+from dataclasses import asdict
+from pathlib import Path
+
+import orjson
+
+from api.config import get_settings
+from api.db.connection import SessionManager
+from api.repositories.users import UsersRepository
+from api.services.passwords.service import PasswordHasher
+from api.services.user_import import UserImportService
+
+
+CHUNK_SIZE = 1 << 20
+
+
+async def read_chunks(path: Path) -> tp.AsyncIterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def main(path: Path, fmt: str, batch_size: int) -> None:
+    settings = get_settings()
+    session_manager = SessionManager()
+    hasher = PasswordHasher()
+    hasher.start(**settings.password_hash_settings)
+
+    try:
+        async with session_manager.get_session_maker()() as session:
+            service = UserImportService(
+                UsersRepository(session),
+                hasher,
+                batch_size=batch_size,
+                hash_concurrency=settings.PASSWORD_HASH_WORKERS,
+            )
+            report = await service.import_users(read_chunks(path), fmt)
+    finally:
+        hasher.shutdown()
+        await session_manager.dispose()
+
+    for error in report.errors:
+        sys.stdout.buffer.write(orjson.dumps(asdict(error)) + b"\n")  # pylint: disable=no-member
+    summary = {"inserted": report.inserted, "failed": len(report.errors)}
+    sys.stdout.buffer.write(orjson.dumps(summary) + b"\n")  # pylint: disable=no-member
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Bulk import users")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None, help="Guessed from file extension")
+    parser.add_argument("--batch-size", type=int, default=get_settings().USER_IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    file_format = args.format or ("ndjson" if args.path.suffix in (".ndjson", ".jsonl") else "csv")
+    asyncio.run(main(args.path, file_format, args.batch_size))
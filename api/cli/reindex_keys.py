@@ -0,0 +1,46 @@
+"""
+Rebuild the primary key indexes of all models:
+
+    python -m api.cli.reindex_keys
+    python -m api.cli.reindex_keys --dry-run
+
+New rows get time-ordered keys and are appended to the right edge of the primary key index, while keys
+generated with uuid4 before left it with half-empty pages all over. The column type does not change,
+so existing keys stay valid and nothing has to be rewritten; rebuilding the index once packs the old
+keys densely. REINDEX CONCURRENTLY does not block reads or writes, but needs postgres 12 or newer.
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from api.db.connection import SessionManager
+from api.db.models.base import Base
+
+
+INDEX_SIZE_QUERY = text("SELECT pg_relation_size(to_regclass(:index))")
+
+
+async def main(dry_run: bool) -> None:
+    session_manager = SessionManager()
+    session_manager.refresh()
+    try:
+        async with session_manager.engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            for table in Base.metadata.sorted_tables:  # pylint: disable=no-member
+                index = f'"{table.name}_pkey"'
+                before = await connection.scalar(INDEX_SIZE_QUERY, {"index": index})
+                if before is None:
+                    continue
+                if not dry_run:
+                    await connection.execute(text(f"REINDEX INDEX CONCURRENTLY {index}"))
+                after = await connection.scalar(INDEX_SIZE_QUERY, {"index": index})
+                print(f"{table.name:<24} {before / 2**20:10.2f} MiB -> {after / 2**20:10.2f} MiB")
+    finally:
+        await session_manager.dispose()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Rebuild primary key indexes")
+    parser.add_argument("--dry-run", action="store_true", help="only report the current index sizes")
+    asyncio.run(main(parser.parse_args().dry_run))
@@ -1,4 +1,4 @@
-from os import environ
+from os import cpu_count, environ
 
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseSettings
@@ -16,6 +16,15 @@ class DefaultSettings(BaseSettings):
     PATH_PREFIX: str = environ.get("PATH_PREFIX", "/api/v1")
     APP_HOST: str = environ.get("APP_HOST", "http://127.0.0.1")
     APP_PORT: int = int(environ.get("APP_PORT", 8000))
+    # "development" runs one reloading process, "production" forks SERVER_WORKERS workers from a warmed master
+    SERVER_MODE: str = environ.get("SERVER_MODE", "development")
+    SERVER_WORKERS: int = int(environ.get("SERVER_WORKERS", cpu_count() or 1))
+    # every worker binds its own socket and the kernel balances connections between them
+    SERVER_REUSE_PORT: bool = environ.get("SERVER_REUSE_PORT", False)
+    SERVER_BACKLOG: int = int(environ.get("SERVER_BACKLOG", 2048))
+    SERVER_KEEP_ALIVE: int = int(environ.get("SERVER_KEEP_ALIVE", 5))
+    SERVER_GRACEFUL_TIMEOUT: float = float(environ.get("SERVER_GRACEFUL_TIMEOUT", 30))
+    SERVER_MEMORY_REPORT_INTERVAL: float = float(environ.get("SERVER_MEMORY_REPORT_INTERVAL", 60))
     OAUTH2_SCHEME = OAuth2PasswordBearer(tokenUrl=f"{APP_HOST}:{APP_PORT}{PATH_PREFIX}/tokens")
 
     POSTGRES_DB: str = environ.get("POSTGRES_DB", "polly_shop_db")
@@ -23,8 +32,81 @@ class DefaultSettings(BaseSettings):
     POSTGRES_USER: str = environ.get("POSTGRES_USER", "user")
     POSTGRES_PORT: int = int(environ.get("POSTGRES_PORT", "5432")[-4:])
     POSTGRES_PASSWORD: str = environ.get("POSTGRES_PASSWORD", "hackme")
+    # comma separated host[:port] of streaming replicas that take the read-only statements
+    POSTGRES_REPLICA_HOSTS: str = environ.get("POSTGRES_REPLICA_HOSTS", "")
+    DB_REPLICA_ROUTING: str = environ.get("DB_REPLICA_ROUTING", "round_robin")
+    DB_REPLICA_MAX_LAG: float = float(environ.get("DB_REPLICA_MAX_LAG", 1.0))
+    DB_REPLICA_CHECK_INTERVAL: float = float(environ.get("DB_REPLICA_CHECK_INTERVAL", 5))
     DB_CONNECT_RETRY: int = environ.get("DB_CONNECT_RETRY", 20)
     DB_POOL_SIZE: int = environ.get("DB_POOL_SIZE", 15)
+    DB_MAX_OVERFLOW: int = int(environ.get("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(environ.get("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(environ.get("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = environ.get("DB_POOL_PRE_PING", True)
+    DB_ECHO: bool = environ.get("DB_ECHO", False)
+    # compiled statements kept per engine and prepared statements kept per asyncpg connection
+    DB_QUERY_CACHE_SIZE: int = int(environ.get("DB_QUERY_CACHE_SIZE", 500))
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = int(environ.get("DB_PREPARED_STATEMENT_CACHE_SIZE", 500))
+    DB_SLOW_QUERY_THRESHOLD: float = float(environ.get("DB_SLOW_QUERY_THRESHOLD", 0.1))
+    DB_REPEATED_STATEMENT_THRESHOLD: int = int(environ.get("DB_REPEATED_STATEMENT_THRESHOLD", 10))
+
+    REDIS_HOST: str = environ.get("REDIS_HOST", "localhost")
+    REDIS_PORT: int = int(environ.get("REDIS_PORT", 6379))
+    REDIS_DB: int = int(environ.get("REDIS_DB", 0))
+    REDIS_PASSWORD: str | None = environ.get("REDIS_PASSWORD")
+    REDIS_MAX_CONNECTIONS: int = int(environ.get("REDIS_MAX_CONNECTIONS", 50))
+    REDIS_POOL_TIMEOUT: float = float(environ.get("REDIS_POOL_TIMEOUT", 5))
+    REDIS_SOCKET_TIMEOUT: float = float(environ.get("REDIS_SOCKET_TIMEOUT", 2))
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = float(environ.get("REDIS_SOCKET_CONNECT_TIMEOUT", 2))
+    REDIS_HEALTH_CHECK_INTERVAL: int = int(environ.get("REDIS_HEALTH_CHECK_INTERVAL", 30))
+
+    # "redis", "memory" or "tiered"; memory keeps refresh tokens and the blocklist in the worker process,
+    # which is only correct for a single worker, tiered caches redis in every worker
+    KEY_VALUE_STORAGE: str = environ.get("KEY_VALUE_STORAGE", "redis")
+    MEMORY_STORAGE_MAX_ENTRIES: int = int(environ.get("MEMORY_STORAGE_MAX_ENTRIES", 100000))
+    MEMORY_STORAGE_TICK: float = float(environ.get("MEMORY_STORAGE_TICK", 1.0))
+    TIERED_STORAGE_MAX_ENTRIES: int = int(environ.get("TIERED_STORAGE_MAX_ENTRIES", 100000))
+    TIERED_STORAGE_TTL: float = float(environ.get("TIERED_STORAGE_TTL", 5))
+    TIERED_STORAGE_NEGATIVE_TTL: float = float(environ.get("TIERED_STORAGE_NEGATIVE_TTL", 1))
+    TIERED_STORAGE_CONFIGURE_NOTIFICATIONS: bool = environ.get("TIERED_STORAGE_CONFIGURE_NOTIFICATIONS", False)
+
+    LOG_LEVEL: str = environ.get("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = environ.get("LOG_FORMAT", "json")
+    LOG_QUEUE_SIZE: int = int(environ.get("LOG_QUEUE_SIZE", 10000))
+    # comma separated logger=value pairs, applied to child loggers as well,
+    # e.g. LOG_SAMPLING="uvicorn.access=0.1" LOG_RATE_LIMITS="api.db.connection.instrumentation=20"
+    LOG_SAMPLING: str = environ.get("LOG_SAMPLING", "")
+    LOG_RATE_LIMITS: str = environ.get("LOG_RATE_LIMITS", "")
+
+    METRICS_ENABLED: bool = environ.get("METRICS_ENABLED", True)
+    SERVER_TIMING_ENABLED: bool = environ.get("SERVER_TIMING_ENABLED", False)
+
+    JWT_SECRET_KEY: str = environ.get("JWT_SECRET_KEY", "")
+
+    TOKEN_CACHE_ENABLED: bool = environ.get("TOKEN_CACHE_ENABLED", False)
+    TOKEN_CACHE_MAX_SIZE: int = int(environ.get("TOKEN_CACHE_MAX_SIZE", 10000))
+    TOKEN_CACHE_TTL: int = int(environ.get("TOKEN_CACHE_TTL", 300))
+    TOKEN_REVOCATION_CHANNEL: str = environ.get("TOKEN_REVOCATION_CHANNEL", "token-revocations")
+
+    # also read refresh and blocklist entries written as JSON under the old keys,
+    # can be turned off once the longest token lifetime has passed since the upgrade
+    TOKEN_STORAGE_READ_LEGACY: bool = environ.get("TOKEN_STORAGE_READ_LEGACY", True)
+
+    BLOCKLIST_EXPIRE_TIME: int = int(environ.get("BLOCKLIST_EXPIRE_TIME", 3600))
+    BLOCKLIST_FILTER_ENABLED: bool = environ.get("BLOCKLIST_FILTER_ENABLED", True)
+    BLOCKLIST_FILTER_CAPACITY: int = int(environ.get("BLOCKLIST_FILTER_CAPACITY", 100000))
+    BLOCKLIST_FILTER_ERROR_RATE: float = float(environ.get("BLOCKLIST_FILTER_ERROR_RATE", 0.001))
+    BLOCKLIST_FILTER_CHANNEL: str = environ.get("BLOCKLIST_FILTER_CHANNEL", "blocklist-updates")
+
+    USER_CACHE_ENABLED: bool = environ.get("USER_CACHE_ENABLED", True)
+    USER_CACHE_MAX_SIZE: int = int(environ.get("USER_CACHE_MAX_SIZE", 10000))
+    USER_CACHE_TTL: int = int(environ.get("USER_CACHE_TTL", 60))
+    USER_CACHE_REDIS_ENABLED: bool = environ.get("USER_CACHE_REDIS_ENABLED", False)
+    USER_CACHE_REDIS_TTL: int = int(environ.get("USER_CACHE_REDIS_TTL", 600))
+    USER_CACHE_CHANNEL: str = environ.get("USER_CACHE_CHANNEL", "user-invalidations")
+
+    # roles only change with migrations, every worker reloads the role table this often
+    ROLE_REGISTRY_TTL: float = float(environ.get("ROLE_REGISTRY_TTL", 300))
 
     MAIL_USERNAME: str = environ.get("MAIL_USERNAME", "")
     MAIL_PASSWORD: str = environ.get("MAIL_PASSWORD", "")
@@ -35,6 +117,14 @@ class DefaultSettings(BaseSettings):
     MAIL_SSL_TLS: bool = environ.get("MAIL_SSL_TLS", True)
     USE_CREDENTIALS: bool = environ.get("USE_CREDENTIALS", True)
 
+    PASSWORD_HASH_EXECUTOR: str = environ.get("PASSWORD_HASH_EXECUTOR", "process")
+    PASSWORD_HASH_WORKERS: int = int(environ.get("PASSWORD_HASH_WORKERS", cpu_count() or 1))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(environ.get("PASSWORD_HASH_QUEUE_SIZE", 64))
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = float(environ.get("PASSWORD_HASH_QUEUE_TIMEOUT", 1.0))
+
+    USER_IMPORT_BATCH_SIZE: int = int(environ.get("USER_IMPORT_BATCH_SIZE", 1000))
+    USER_LIST_BATCH_SIZE: int = int(environ.get("USER_LIST_BATCH_SIZE", 500))
+
     @property
     def database_settings(self) -> dict:
         """
@@ -57,6 +147,35 @@ class DefaultSettings(BaseSettings):
             **self.database_settings,
         )
 
+    @property
+    def database_replica_uris(self) -> dict[str, str]:
+        """
+        Get uris for connection with the read replicas by their host and port.
+        """
+        uris = {}
+        for item in filter(None, (part.strip() for part in self.POSTGRES_REPLICA_HOSTS.split(","))):
+            host, _, port = item.partition(":")
+            settings = self.database_settings | {"host": host, "port": int(port or self.POSTGRES_PORT)}
+            name = f"{host}:{settings['port']}"
+            uris[name] = "postgresql+asyncpg://{user}:{password}@{host}:{port}/{database}".format(**settings)
+        return uris
+
+    @property
+    def database_engine_settings(self) -> dict:
+        """
+        Get all settings for the database engine and its connection pool.
+        """
+        return {
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+            "echo": self.DB_ECHO,
+            "query_cache_size": self.DB_QUERY_CACHE_SIZE,
+            "connect_args": {"prepared_statement_cache_size": self.DB_PREPARED_STATEMENT_CACHE_SIZE},
+        }
+
     @property
     def database_uri_sync(self) -> str:
         """
@@ -66,6 +185,97 @@ class DefaultSettings(BaseSettings):
             **self.database_settings,
         )
 
+    @property
+    def query_instrumentation_settings(self) -> dict:
+        """
+        Get all settings for the database statement instrumentation.
+        """
+        return {
+            "slow_threshold": self.DB_SLOW_QUERY_THRESHOLD,
+            "repeat_threshold": self.DB_REPEATED_STATEMENT_THRESHOLD,
+        }
+
+    @property
+    def redis_required(self) -> bool:
+        """
+        Whether any configured backend keeps its state in redis.
+        """
+        return self.KEY_VALUE_STORAGE != "memory" or self.USER_CACHE_REDIS_ENABLED
+
+    @property
+    def redis_settings(self) -> dict:
+        """
+        Get all settings for the redis connection pool.
+        """
+        return {
+            "host": self.REDIS_HOST,
+            "port": self.REDIS_PORT,
+            "db": self.REDIS_DB,
+            "password": self.REDIS_PASSWORD,
+            "max_connections": self.REDIS_MAX_CONNECTIONS,
+            "timeout": self.REDIS_POOL_TIMEOUT,
+            "socket_timeout": self.REDIS_SOCKET_TIMEOUT,
+            "socket_connect_timeout": self.REDIS_SOCKET_CONNECT_TIMEOUT,
+            "health_check_interval": self.REDIS_HEALTH_CHECK_INTERVAL,
+        }
+
+    @property
+    def memory_storage_settings(self) -> dict:
+        """
+        Get all settings for the in-process key-value storage.
+        """
+        return {
+            "max_entries": self.MEMORY_STORAGE_MAX_ENTRIES,
+            "tick": self.MEMORY_STORAGE_TICK,
+        }
+
+    @property
+    def tiered_storage_settings(self) -> dict:
+        """
+        Get all settings for the redis storage with a per-worker local tier.
+        """
+        return {
+            "max_entries": self.TIERED_STORAGE_MAX_ENTRIES,
+            "ttl": self.TIERED_STORAGE_TTL,
+            "negative_ttl": self.TIERED_STORAGE_NEGATIVE_TTL,
+            "db": self.REDIS_DB,
+        }
+
+    @property
+    def token_cache_settings(self) -> dict:
+        """
+        Get all settings for the in-process verified token cache.
+        """
+        return {
+            "max_size": self.TOKEN_CACHE_MAX_SIZE,
+            "ttl": self.TOKEN_CACHE_TTL,
+            "channel": self.TOKEN_REVOCATION_CHANNEL,
+        }
+
+    @property
+    def blocklist_filter_settings(self) -> dict:
+        """
+        Get all settings for the in-process blocklist filter.
+        """
+        return {
+            "capacity": self.BLOCKLIST_FILTER_CAPACITY,
+            "error_rate": self.BLOCKLIST_FILTER_ERROR_RATE,
+            "ttl": self.BLOCKLIST_EXPIRE_TIME,
+            "channel": self.BLOCKLIST_FILTER_CHANNEL,
+        }
+
+    @property
+    def user_cache_settings(self) -> dict:
+        """
+        Get all settings for the current user cache.
+        """
+        return {
+            "max_size": self.USER_CACHE_MAX_SIZE,
+            "ttl": self.USER_CACHE_TTL,
+            "storage_ttl": self.USER_CACHE_REDIS_TTL,
+            "channel": self.USER_CACHE_CHANNEL,
+        }
+
     @property
     def email_config(self) -> dict:
         """
@@ -82,6 +292,18 @@ class DefaultSettings(BaseSettings):
             "USE_CREDENTIALS": self.USE_CREDENTIALS,
         }
 
+    @property
+    def password_hash_settings(self) -> dict:
+        """
+        Get all settings for the password hashing worker pool.
+        """
+        return {
+            "executor": self.PASSWORD_HASH_EXECUTOR,
+            "workers": self.PASSWORD_HASH_WORKERS,
+            "queue_size": self.PASSWORD_HASH_QUEUE_SIZE,
+            "queue_timeout": self.PASSWORD_HASH_QUEUE_TIMEOUT,
+        }
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
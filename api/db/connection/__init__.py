@@ -1,4 +1,4 @@
-from api.db.connection.redis import get_redis
+from api.db.connection.redis import RedisManager, get_redis
 from api.db.connection.session import SessionManager, get_session
 
 
@@ -6,4 +6,5 @@ __all__ = [
     "get_session",
     "SessionManager",
     "get_redis",
+    "RedisManager",
 ]
@@ -0,0 +1,114 @@
+import typing as tp
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging import getLogger
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+
+from api.metrics import DB_COMPILED_CACHE, DB_QUERY_DURATION, DB_QUERY_ROWS, DB_REPEATED_STATEMENTS, DB_SLOW_QUERIES
+
+
+logger = getLogger(__name__)
+
+QUERY_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK"})
+
+COMPILED_CACHE_RESULTS = {CACHE_HIT: "hit", CACHE_MISS: "miss"}
+
+
+@dataclass(kw_only=True, slots=True)
+class QueryStats:
+    """
+    Statements executed on behalf of one request. Statements are compiled with bound parameters,
+    so the statement text is its shape: the same text run many times usually means a lazy load in a loop.
+    """
+
+    label: str = ""
+    queries: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    shapes: dict[str, int] = field(default_factory=dict)
+    repeated: list[str] = field(default_factory=list)
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+@contextmanager
+def track_queries(label: str = "") -> tp.Iterator[QueryStats]:
+    """
+    Collect stats of the statements executed within the block, including tasks started from it.
+    """
+    stats = QueryStats(label=label)
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+class QueryInstrumentation:
+    """
+    Engine event hooks recording duration and returned rows of every statement.
+
+    Statements slower than ``slow_threshold`` seconds are logged (without parameters),
+    and a statement executed ``repeat_threshold`` times within one tracked request is reported once.
+    """
+
+    def __init__(self, *, slow_threshold: float, repeat_threshold: int):
+        self._slow_threshold = slow_threshold
+        self._repeat_threshold = repeat_threshold
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+
+    @staticmethod
+    def before_cursor_execute(  # pylint: disable=unused-argument,too-many-arguments
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        conn.info.setdefault("query_started", []).append(perf_counter())
+
+    def after_cursor_execute(  # pylint: disable=unused-argument,too-many-arguments
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        duration = perf_counter() - conn.info["query_started"].pop()
+        rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else 0
+
+        operation = statement.lstrip()[:8].split(None, 1)[0].upper() if statement else ""
+        operation = operation if operation in QUERY_OPERATIONS else "OTHER"
+        DB_QUERY_DURATION.labels(operation).observe(duration)
+        DB_QUERY_ROWS.labels(operation).observe(rows)
+        if context is not None:
+            DB_COMPILED_CACHE.labels(COMPILED_CACHE_RESULTS.get(context.cache_hit, "uncached")).inc()
+
+        stats = current_query_stats.get()
+        if duration >= self._slow_threshold:
+            DB_SLOW_QUERIES.labels(operation).inc()
+            logger.warning(
+                "Slow query: %.1f ms, %d rows%s: %s",
+                duration * 1000,
+                rows,
+                f" in {stats.label}" if stats is not None and stats.label else "",
+                statement,
+            )
+
+        if stats is None:
+            return
+
+        stats.queries += 1
+        stats.rows += rows
+        stats.seconds += duration
+        count = stats.shapes[statement] = stats.shapes.get(statement, 0) + 1
+        if count == self._repeat_threshold:
+            stats.repeated.append(statement)
+            DB_REPEATED_STATEMENTS.inc()
+            logger.warning(
+                "Statement executed %d times in %s, probably an N+1 query: %s",
+                count,
+                stats.label or "one request",
+                statement,
+            )
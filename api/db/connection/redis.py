@@ -1,8 +1,194 @@
-from redis.asyncio import Redis
+import asyncio
+import typing as tp
+from logging import getLogger
+from time import perf_counter
 
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import Pipeline, PubSub
 
-redis: Redis | None = None
+from api.config import get_settings
+from api.metrics import REDIS_COMMAND_DURATION, REDIS_COMMAND_ERRORS
+
+
+logger = getLogger(__name__)
+
+
+# redis-py clients are built from dozens of command mixins, some commands of which are left abstract;
+# the subclasses below only wrap command execution, so both checks are about redis-py itself
+class InstrumentedPipeline(Pipeline):  # pylint: disable=abstract-method,too-many-ancestors
+    """
+    Pipeline that times each round trip as a single PIPELINE command.
+    """
+
+    async def execute(self, raise_on_error: bool = True):
+        if not self.command_stack:
+            return await super().execute(raise_on_error)
+
+        started = perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        except Exception:
+            REDIS_COMMAND_ERRORS.labels("PIPELINE").inc()
+            raise
+        finally:
+            REDIS_COMMAND_DURATION.labels("PIPELINE").observe(perf_counter() - started)
+
+
+class InstrumentedRedis(Redis):  # pylint: disable=abstract-method,too-many-ancestors
+    """
+    Redis client that times every command, labelled by the command name.
+    """
+
+    async def execute_command(self, *args, **options):
+        command = str(args[0]).upper()
+        started = perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        except Exception:
+            REDIS_COMMAND_ERRORS.labels(command).inc()
+            raise
+        finally:
+            REDIS_COMMAND_DURATION.labels(command).observe(perf_counter() - started)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class RedisManager:
+    """
+    A class that owns the application-wide redis connection pool.
+
+    Connections are taken from a blocking pool: when all of them are busy a command waits
+    for a free one instead of opening an ad-hoc connection.
+    """
+
+    def __new__(cls):
+        if not hasattr(cls, "instance"):
+            cls.instance = super(RedisManager, cls).__new__(cls)
+            cls.instance.redis = None
+        return cls.instance  # noqa
+
+    def get_redis(self) -> Redis:
+        if self.redis is None:
+            self.refresh()
+        return self.redis
+
+    def refresh(self) -> None:
+        pool = BlockingConnectionPool(**get_settings().redis_settings)
+        self.redis = InstrumentedRedis(connection_pool=pool)
+
+    async def connect(self) -> None:
+        await self.get_redis().ping()
+
+    async def close(self) -> None:
+        if self.redis is None:
+            return
+        redis = self.redis
+        self.redis = None
+        await redis.close(close_connection_pool=True)
+
+
+async def listen_channel(
+    redis: Redis,
+    channel: str,
+    *,
+    on_message: tp.Callable[[bytes], None],
+    on_subscribe: tp.Callable[[], tp.Awaitable[None]],
+    on_disconnect: tp.Callable[[], None],
+    reconnect_delay: float = 1.0,
+) -> None:
+    """
+    Pass every message published to channel to on_message until cancelled, reconnecting on errors.
+
+    Messages published while the subscription is down are lost, so on_subscribe is awaited
+    every time the subscription is (re)established and on_disconnect is called when it breaks.
+    """
+    await _listen(
+        redis,
+        channel,
+        lambda pubsub: pubsub.subscribe(channel),
+        on_message=lambda message: on_message(message["data"]),
+        on_subscribe=on_subscribe,
+        on_disconnect=on_disconnect,
+        reconnect_delay=reconnect_delay,
+    )
+
+
+async def listen_pattern(
+    redis: Redis,
+    pattern: str,
+    *,
+    on_message: tp.Callable[[bytes, bytes], None],
+    on_subscribe: tp.Callable[[], tp.Awaitable[None]],
+    on_disconnect: tp.Callable[[], None],
+    reconnect_delay: float = 1.0,
+) -> None:
+    """
+    Same as listen_channel for all channels matching pattern, on_message gets the channel and the data.
+    """
+    await _listen(
+        redis,
+        pattern,
+        lambda pubsub: pubsub.psubscribe(pattern),
+        on_message=lambda message: on_message(message["channel"], message["data"]),
+        on_subscribe=on_subscribe,
+        on_disconnect=on_disconnect,
+        reconnect_delay=reconnect_delay,
+    )
+
+
+class Listener:
+    """
+    Runs one of the listen functions above in a background task, owned by a manager of a per-worker cache.
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self, listen: tp.Callable[[], tp.Awaitable[None]]) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(listen())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        task = self._task
+        self._task = None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def _listen(
+    redis: Redis,
+    name: str,
+    subscribe: tp.Callable[[PubSub], tp.Awaitable[None]],
+    *,
+    on_message: tp.Callable[[dict], None],
+    on_subscribe: tp.Callable[[], tp.Awaitable[None]],
+    on_disconnect: tp.Callable[[], None],
+    reconnect_delay: float,
+) -> None:
+    while True:
+        try:
+            async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await subscribe(pubsub)
+                await on_subscribe()
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        on_message(message)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Subscription to %s failed, reconnecting", name)
+            on_disconnect()
+            await asyncio.sleep(reconnect_delay)
 
 
 async def get_redis() -> Redis:
-    return redis
+    return RedisManager().get_redis()
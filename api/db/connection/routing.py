@@ -0,0 +1,163 @@
+import asyncio
+from dataclasses import dataclass
+from itertools import count
+from logging import getLogger
+from time import perf_counter
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from api.metrics import DB_REPLICA_AVAILABLE, DB_REPLICA_LAG, DB_SESSION_ROUTES
+
+
+logger = getLogger(__name__)
+
+# replay delay of a replica, zero while it has replayed everything it received:
+# the last replay timestamp alone keeps growing on an idle primary.
+# NULL while the WAL receiver is not streaming, since then nothing new is received and
+# the replica falls behind unnoticed; without pg_read_all_stats the status is hidden
+# and only a running receiver can be seen
+LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE coalesce(status, 'streaming') = 'streaming') "
+    "THEN NULL "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+ROUTING_STRATEGIES = ("round_robin", "latency")
+
+
+@dataclass(kw_only=True, slots=True)
+class Replica:
+    name: str
+    bind: Engine
+    engine: AsyncEngine | None = None
+    available: bool = False
+    lag: float = 0.0
+    latency: float = 0.0
+
+
+class ReplicaRouter:
+    """
+    Picks the replica for read-only work: round robin or the one with the lowest probe latency,
+    among the replicas that answered the last probe and lag at most ``max_lag`` seconds behind.
+    Returns None when there is no such replica and reads have to go to the primary.
+    """
+
+    LATENCY_SMOOTHING = 0.3
+
+    def __init__(
+        self,
+        replicas: list[Replica],
+        *,
+        strategy: str = "round_robin",
+        max_lag: float = 1.0,
+        probe_timeout: float = 5.0,
+    ):
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unknown replica routing strategy {strategy!r}")
+
+        self.replicas = replicas
+        self._strategy = strategy
+        self._max_lag = max_lag
+        self._probe_timeout = probe_timeout
+        self._counter = count()
+        self._available: list[Replica] = [replica for replica in replicas if replica.available]
+
+    def choose(self) -> Replica | None:
+        if not self._available:
+            return None
+        if self._strategy == "latency":
+            return min(self._available, key=lambda replica: replica.latency)
+        return self._available[next(self._counter) % len(self._available)]
+
+    def update(self, replica: Replica, *, lag: float | None, latency: float | None = None) -> None:
+        """
+        Record a probe result, None meaning the replica could not be reached or is not streaming.
+        """
+        available = lag is not None and lag <= self._max_lag
+        if available != replica.available:
+            if available:
+                logger.info("Replica %s is available", replica.name)
+            elif lag is None:
+                logger.warning("Replica %s is unreachable or not streaming, reading from the primary", replica.name)
+            else:
+                logger.warning("Replica %s lags %.1f s behind, reading from the primary", replica.name, lag)
+
+        replica.available = available
+        if lag is not None:
+            replica.lag = lag
+        if latency is not None:
+            replica.latency = (
+                latency
+                if not replica.latency
+                else replica.latency + self.LATENCY_SMOOTHING * (latency - replica.latency)
+            )
+        self._available = [replica for replica in self.replicas if replica.available]
+
+        DB_REPLICA_AVAILABLE.labels(replica.name).set(1 if available else 0)
+        DB_REPLICA_LAG.labels(replica.name).set(replica.lag)
+
+    async def check(self) -> None:
+        await asyncio.gather(*(self._probe(replica) for replica in self.replicas))
+
+    async def run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.check()
+
+    async def _probe(self, replica: Replica) -> None:
+        try:
+            lag, latency = await asyncio.wait_for(self._measure(replica), self._probe_timeout)
+        except Exception:  # pylint: disable=broad-except
+            self.update(replica, lag=None)
+            return
+        self.update(replica, lag=lag, latency=latency)
+
+    @staticmethod
+    async def _measure(replica: Replica) -> tuple[float | None, float]:
+        async with replica.engine.connect() as connection:
+            started = perf_counter()
+            lag = await connection.scalar(LAG_QUERY)
+            return None if lag is None else float(lag), perf_counter() - started
+
+
+class RoutingSession(Session):
+    """
+    Session sending plain SELECTs to a replica and everything else to the primary bind.
+
+    A session picks one replica for its reads and keeps it, and once it has written anything all of its
+    statements go to the primary, so a request reads its own writes, committed or not.
+    """
+
+    def __init__(self, *args, router: ReplicaRouter | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._router = router
+        self._replica: Replica | None = None
+        self.pinned = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs) -> Engine:
+        replica = self._route(clause)
+        if replica is not None:
+            DB_SESSION_ROUTES.labels("replica").inc()
+            return replica.bind
+
+        if self._router is not None:
+            DB_SESSION_ROUTES.labels("primary").inc()
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    def _route(self, clause) -> Replica | None:
+        if self._router is None or self.pinned:
+            return None
+        locking = getattr(clause, "_for_update_arg", None) is not None
+        if self._flushing or not isinstance(clause, Select) or locking:
+            self.pinned = True
+            return None
+
+        if self._replica is None or not self._replica.available:
+            self._replica = self._router.choose()
+        return self._replica
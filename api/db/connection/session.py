@@ -1,28 +1,139 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+from dataclasses import dataclass
+from time import perf_counter
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from api.config import get_settings
+from api.db.connection.instrumentation import QueryInstrumentation
+from api.db.connection.routing import Replica, ReplicaRouter, RoutingSession
+from api.metrics import DB_POOL_CHECKOUT_WAIT
+
+
+@dataclass(kw_only=True, slots=True)
+class PoolMetrics:
+    checkouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def record_checkout(self, wait: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that measures how long each checkout waits for a connection,
+    including the time to open a new one when the pool is not yet full.
+    """
+
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        started = perf_counter()
+        connection = super()._do_get()
+        wait = perf_counter() - started
+        DB_POOL_CHECKOUT_WAIT.observe(wait)
+        if self.metrics is not None:
+            self.metrics.record_checkout(wait)
+        return connection
 
 
 class SessionManager:
     """
     A class that implements the necessary functionality for working with the database:
     issuing sessions, storing and updating connection settings.
-    """
 
-    def __init__(self) -> None:
-        self.refresh()
+    The engine and its session maker are created once and reused by every request,
+    so connections stay pooled for the whole lifetime of the application.
+
+    With read replicas configured, sessions route their read-only statements to a replica
+    that is probed every ``DB_REPLICA_CHECK_INTERVAL`` seconds, see ``RoutingSession``.
+    """
 
     def __new__(cls):
         if not hasattr(cls, "instance"):
             cls.instance = super(SessionManager, cls).__new__(cls)
+            cls.instance.engine = None
+            cls.instance.router = None
+            cls.instance.metrics = PoolMetrics()
+            cls.instance._session_maker = None
+            cls.instance._checker = None
         return cls.instance  # noqa
 
     def get_session_maker(self) -> sessionmaker:
-        return sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        if self._session_maker is None:
+            self.refresh()
+        return self._session_maker
+
+    async def start(self) -> None:
+        self.get_session_maker()
+        if self.router is None or self._checker is not None:
+            return
+        await self.router.check()
+        self._checker = asyncio.create_task(self.router.run(get_settings().DB_REPLICA_CHECK_INTERVAL))
 
     def refresh(self) -> None:
-        self.engine = create_async_engine(get_settings().database_uri, echo=True, future=True)
+        settings = get_settings()
+        self.engine = self._create_engine(settings.database_uri)
+        self.engine.sync_engine.pool.metrics = self.metrics
+
+        replicas = []
+        for name, uri in settings.database_replica_uris.items():
+            engine = self._create_engine(uri)
+            replicas.append(Replica(name=name, bind=engine.sync_engine, engine=engine))
+        self.router = None
+        if replicas:
+            self.router = ReplicaRouter(
+                replicas,
+                strategy=settings.DB_REPLICA_ROUTING,
+                max_lag=settings.DB_REPLICA_MAX_LAG,
+                probe_timeout=settings.DB_REPLICA_CHECK_INTERVAL,
+            )
+        routing = {"sync_session_class": RoutingSession, "router": self.router} if self.router is not None else {}
+        self._session_maker = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False, **routing)
+
+    async def dispose(self) -> None:
+        if self._checker is not None:
+            self._checker.cancel()
+            await asyncio.gather(self._checker, return_exceptions=True)
+            self._checker = None
+
+        if self.engine is None:
+            return
+        engines: list[AsyncEngine] = [self.engine]
+        if self.router is not None:
+            engines.extend(replica.engine for replica in self.router.replicas)
+        self.engine = None
+        self.router = None
+        self._session_maker = None
+        await asyncio.gather(*(engine.dispose() for engine in engines))
+
+    @staticmethod
+    def _create_engine(uri: str) -> AsyncEngine:
+        settings = get_settings()
+        engine = create_async_engine(
+            uri,
+            future=True,
+            poolclass=InstrumentedAsyncQueuePool,
+            **settings.database_engine_settings,
+        )
+        QueryInstrumentation(**settings.query_instrumentation_settings).attach(engine.sync_engine)
+        return engine
+
+    def get_pool_metrics(self) -> dict:
+        pool = self.engine.sync_engine.pool if self.engine is not None else None
+        return {
+            "size": pool.size() if pool else 0,
+            "checked_out": pool.checkedout() if pool else 0,
+            "overflow": pool.overflow() if pool else 0,
+            "checkouts": self.metrics.checkouts,
+            "wait_seconds_total": self.metrics.wait_seconds_total,
+            "wait_seconds_max": self.metrics.wait_seconds_max,
+        }
 
 
 async def get_session() -> AsyncSession:
@@ -1,3 +1,4 @@
+from .permission import Permission, RolePermission
 from .role import Role
 from .user import User
 
@@ -5,4 +6,6 @@ from .user import User
 __all__ = [
     "User",
     "Role",
+    "Permission",
+    "RolePermission",
 ]
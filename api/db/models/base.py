@@ -1,15 +1,13 @@
-import uuid
-
 from sqlalchemy import Column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 
-from api.utils import camel_to_snake
+from api.utils import camel_to_snake, uuid7
 
 
 @as_declarative()
 class Base:
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     __name__: str
     __table_args__ = {"extend_existing": True}
 
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import INTEGER, TEXT, UUID
+
+from api.db.models.base import Base
+
+
+class Permission(Base):
+    """
+    Model class for table permission
+
+    ``bit`` is the position of the permission in the bitsets embedded in access tokens,
+    it has to stay the same for as long as tokens carrying it are valid.
+    """
+
+    code = Column(TEXT, unique=True, nullable=False)
+    name = Column(TEXT)
+    bit = Column(INTEGER, unique=True, nullable=False)
+
+
+class RolePermission(Base):
+    """
+    Model class for table role_permission
+    """
+
+    __table_args__ = (UniqueConstraint("role_id", "permission_id"), {"extend_existing": True})
+
+    role_id = Column(UUID(as_uuid=True), ForeignKey("role.id", ondelete="CASCADE"), nullable=False)
+    permission_id = Column(UUID(as_uuid=True), ForeignKey("permission.id", ondelete="CASCADE"), nullable=False)
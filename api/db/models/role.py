@@ -1,7 +1,9 @@
 from sqlalchemy import Column
 from sqlalchemy.dialects.postgresql import TEXT
+from sqlalchemy.orm import relationship
 
 from api.db.models.base import Base
+from api.db.models.permission import Permission
 
 
 class Role(Base):
@@ -11,3 +13,5 @@ class Role(Base):
 
     name = Column(TEXT, unique=True, index=True)
     code = Column(TEXT, unique=True)
+
+    permissions = relationship(Permission, secondary="role_permission")
@@ -0,0 +1,43 @@
+import typing as tp
+
+from sqlalchemy.sql import Executable
+
+from api.metrics import DB_STATEMENT_CACHE
+
+
+class StatementCache:
+    """
+    Statements built once per shape and reused with different bound parameters.
+
+    Building a select and generating its cache key costs far more than executing an already compiled one:
+    SQLAlchemy memoizes the cache key on the statement object, so a reused statement goes straight to the
+    engine's compiled cache and the same SQL text lets asyncpg reuse its prepared statement.
+    The shape key has to cover everything the builder puts into the SQL other than bound values.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._statements: dict[tp.Hashable, Executable] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, shape: tp.Hashable, build: tp.Callable[[], Executable]) -> Executable:
+        statement = self._statements.get(shape)
+        if statement is not None:
+            self.hits += 1
+            DB_STATEMENT_CACHE.labels(self.name, "hit").inc()
+            return statement
+
+        self.misses += 1
+        DB_STATEMENT_CACHE.labels(self.name, "miss").inc()
+        statement = self._statements[shape] = build()
+        return statement
+
+    def get_stats(self) -> dict[str, tp.Any]:
+        lookups = self.hits + self.misses
+        return {
+            "shapes": len(self._statements),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
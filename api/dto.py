@@ -5,9 +5,44 @@ from uuid import UUID, uuid4
 from api.db.models.user import User
 
 
+@dataclass(kw_only=True, slots=True)
+class UserSnapshot:
+    id: UUID
+    username: str | None = None
+    bonus_account: int | None = None
+    role_id: UUID | None = None
+
+    @classmethod
+    def from_model(cls, user: User) -> "UserSnapshot":
+        return cls(id=user.id, username=user.username, bonus_account=user.bonus_account, role_id=user.role_id)
+
+
+@dataclass(kw_only=True, slots=True)
+class UserCredentials:
+    id: UUID
+    username: str
+    password: str | None = None
+    role_id: UUID | None = None
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class RoleSnapshot:
+    id: UUID
+    code: str
+    name: str | None = None
+    permissions: int = 0
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class PermissionSet:
+    bits: int
+    version: str
+    role_id: UUID | None = None
+
+
 @dataclass(kw_only=True, slots=True)
 class AuthContext:
-    user: User | None = None
+    user: UserCredentials | None = None
     payload: dict[str, tp.Any] | None = None
     token_type: str | None = None
 
@@ -34,3 +69,16 @@ class RefreshTokenPayload:
 class TokenPair:
     access_token: str
     refresh_token: str
+
+
+@dataclass(kw_only=True, slots=True)
+class UserImportError:
+    line: int
+    username: str | None
+    error: str
+
+
+@dataclass(kw_only=True, slots=True)
+class UserImportReport:
+    inserted: int = 0
+    errors: list[UserImportError] = field(default_factory=list)
@@ -1,12 +1,16 @@
+from api.endpoints.admin import api_router as admin_router
 from api.endpoints.health_check import api_router as health_check_router
+from api.endpoints.metrics import api_router as metrics_router
 from api.endpoints.users import api_router as users_router
 from api.endpoints.tokens import api_router as tokens_router
 
 
 list_of_routes = [
     health_check_router,
+    metrics_router,
     users_router,
     tokens_router,
+    admin_router,
 ]
 
 
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette import status
+
+from api import dto
+from api.responses import OrjsonResponse
+from api.schemas import admin as schemas
+from api.services.auth.dependencies import get_current_admin
+from api.services.user_import import UserImportService, get_user_import_service
+from api.services.users import UsersService, get_users_service
+
+
+api_router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@api_router.get(
+    "/users",
+    description=(
+        "Stream users as NDJSON ordered by username or id. A full page ends with a line holding "
+        "next_cursor, pass it back as cursor to get the next page. Users without a username are "
+        "only listed in id order."
+    ),
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {"content": {"application/x-ndjson": {}}},
+        status.HTTP_400_BAD_REQUEST: {"description": "Invalid cursor"},
+    },
+)
+async def list_users(
+    order_by: schemas.UserListOrder = schemas.UserListOrder.USERNAME,
+    cursor: str | None = None,
+    limit: int = Query(1000, ge=1, le=100000),
+    role: str | None = None,
+    min_bonus: int | None = None,
+    max_bonus: int | None = None,
+    _: dto.UserSnapshot = Depends(get_current_admin),
+    users_service: UsersService = Depends(get_users_service),
+):
+    after = None
+    if cursor is not None:
+        try:
+            after = users_service.parse_cursor(cursor, order_by)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+
+    rows = users_service.iter_users_ndjson(
+        order_by=order_by,
+        after=after,
+        role_code=role,
+        min_bonus=min_bonus,
+        max_bonus=max_bonus,
+        limit=limit,
+    )
+    return StreamingResponse(rows, media_type="application/x-ndjson")
+
+
+@api_router.post(
+    "/users/import",
+    description="Bulk import users from a CSV (with header) or NDJSON request body",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.UserImportResponse,
+)
+async def import_users(
+    request: Request,
+    fmt: schemas.UserImportFormat = Query(schemas.UserImportFormat.CSV, alias="format"),
+    _: dto.UserSnapshot = Depends(get_current_admin),
+    import_service: UserImportService = Depends(get_user_import_service),
+):
+    report = await import_service.import_users(request.stream(), fmt.value)
+    return OrjsonResponse(report)
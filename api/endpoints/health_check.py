@@ -1,7 +1,21 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from starlette import status
 
-from api.schemas import PingResponse
+from api.db.connection import SessionManager
+from api.metrics import DB_COMPILED_CACHE
+from api.repositories.blocklist_filter import BlocklistFilterManager
+from api.repositories.storage import TieredStorageManager
+from api.repositories.user_cache import UserCacheManager
+from api.repositories.users import UsersRepository
+from api.responses import OrjsonResponse
+from api.schemas import (
+    BlocklistFilterResponse,
+    DatabasePoolResponse,
+    KeyValueStorageResponse,
+    PingResponse,
+    StatementCacheResponse,
+    UserCacheResponse,
+)
 
 
 api_router = APIRouter(tags=["Health check"])
@@ -14,3 +28,80 @@ api_router = APIRouter(tags=["Health check"])
 )
 async def health_check():
     return PingResponse()
+
+
+@api_router.get(
+    "/health_check/database_pool",
+    response_model=DatabasePoolResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def database_pool():
+    return OrjsonResponse(SessionManager().get_pool_metrics())
+
+
+@api_router.get(
+    "/health_check/blocklist_filter",
+    response_model=BlocklistFilterResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_404_NOT_FOUND: {
+            "description": "Blocklist filter is disabled",
+        },
+    },
+)
+async def blocklist_filter():
+    current_filter = BlocklistFilterManager().get_filter()
+    if current_filter is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Blocklist filter is disabled")
+    return OrjsonResponse(current_filter.get_stats())
+
+
+@api_router.get(
+    "/health_check/user_cache",
+    response_model=UserCacheResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_404_NOT_FOUND: {
+            "description": "User cache is disabled",
+        },
+    },
+)
+async def user_cache():
+    cache = UserCacheManager().get_cache()
+    if cache is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User cache is disabled")
+    return OrjsonResponse(cache.get_stats())
+
+
+@api_router.get(
+    "/health_check/key_value_storage",
+    response_model=KeyValueStorageResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_404_NOT_FOUND: {
+            "description": "Tiered key-value storage is disabled",
+        },
+    },
+)
+async def key_value_storage():
+    storage = TieredStorageManager().get_storage()
+    if storage is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tiered key-value storage is disabled")
+    return OrjsonResponse(storage.get_stats())
+
+
+@api_router.get(
+    "/health_check/statement_cache",
+    response_model=StatementCacheResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def statement_cache():
+    hits = int(DB_COMPILED_CACHE.labels("hit").value)
+    misses = int(DB_COMPILED_CACHE.labels("miss").value)
+    stats = UsersRepository.statements.get_stats()
+    stats.update(
+        compiled_hits=hits,
+        compiled_misses=misses,
+        compiled_hit_rate=hits / (hits + misses) if hits + misses else 0.0,
+    )
+    return OrjsonResponse(stats)
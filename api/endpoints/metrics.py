@@ -0,0 +1,47 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette import status
+
+from api.db.connection import SessionManager
+from api.logs import LoggingManager
+from api.metrics import (
+    DB_POOL_CONNECTIONS,
+    LOG_RECORDS_DROPPED,
+    LOG_RECORDS_SUPPRESSED,
+    PASSWORD_HASH_IN_FLIGHT,
+    PROCESS_MEMORY,
+    REGISTRY,
+)
+from api.services.passwords.service import PasswordHasher
+from api.utils.memory import read_memory
+
+
+api_router = APIRouter(tags=["Health check"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def collect() -> None:
+    """
+    Refresh gauges that are read from their owners at scrape time rather than kept up to date.
+    """
+    pool = SessionManager().get_pool_metrics()
+    DB_POOL_CONNECTIONS.labels("size").set(pool["size"])
+    DB_POOL_CONNECTIONS.labels("checked_out").set(pool["checked_out"])
+    DB_POOL_CONNECTIONS.labels("overflow").set(pool["overflow"])
+    PASSWORD_HASH_IN_FLIGHT.set(PasswordHasher().in_flight)
+    log_stats = LoggingManager().get_stats()
+    LOG_RECORDS_DROPPED.set(log_stats["dropped"])
+    LOG_RECORDS_SUPPRESSED.set(log_stats["suppressed"])
+    for kind, size in read_memory().items():
+        PROCESS_MEMORY.labels(kind).set(size)
+
+
+@api_router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def metrics():
+    collect()
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
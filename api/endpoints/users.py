@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Body, Depends, HTTPException
 from starlette import status
 
+from api.responses import OrjsonResponse
 from api.schemas import users as schemas
 from api.services.users import UsersService, get_users_service
 
@@ -25,7 +26,7 @@ async def registration(
 ):
     is_success, message = await users_service.register_user(registration_form)
     if is_success:
-        return {"message": message}
+        return OrjsonResponse({"message": message}, status_code=status.HTTP_201_CREATED)
     raise HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST,
         detail=message,
@@ -49,7 +50,7 @@ async def edit(
 ):
     is_success, message = await users_service.edit_user(edit_form)
     if is_success:
-        return {"message": message}
+        return OrjsonResponse({"message": message})
     raise HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST,
         detail=message,
@@ -0,0 +1,218 @@
+import logging
+import sys
+import typing as tp
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import Empty, Full, Queue
+from random import random
+from time import monotonic
+
+import orjson
+
+from api.config import get_settings
+
+
+# attributes every LogRecord has, anything else was passed in ``extra``
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# loggers that come with their own handlers and are rerouted through the queue
+CAPTURED_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+
+def parse_rules(value: str) -> dict[str, float]:
+    """
+    Parse per-logger settings like ``"sqlalchemy=0.01,api.db=0.5"``.
+    """
+    rules = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, number = item.partition("=")
+        rules[name.strip()] = float(number)
+    return rules
+
+
+class OrjsonFormatter(logging.Formatter):
+    """
+    One JSON object per record with the message, its origin, the formatted exception and extra fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES:
+                entry[key] = value
+        return orjson.dumps(entry, default=str).decode()  # pylint: disable=no-member
+
+
+def create_sink(log_format: str) -> logging.Handler:
+    """
+    Handler writing records to stdout either as JSON lines or as plain text.
+    """
+    sink = logging.StreamHandler(sys.stdout)
+    if log_format == "json":
+        sink.setFormatter(OrjsonFormatter())
+    else:
+        sink.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    return sink
+
+
+class TokenBucket:
+    __slots__ = ("rate", "tokens", "updated_at")
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = monotonic()
+
+    def take(self) -> bool:
+        now = monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a ``sampling`` share of the records below ERROR and at most ``rate_limits`` records
+    per second of any level, both configured per logger and inherited by child loggers.
+    """
+
+    def __init__(self, *, sampling: dict[str, float], rate_limits: dict[str, float]):
+        super().__init__()
+        self._sampling = sampling
+        self._rate_limits = rate_limits
+        self._rules: dict[str, tuple[float, TokenBucket | None]] = {}
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rule = self._rules.get(record.name)
+        if rule is None:
+            rule = self._rules[record.name] = self._resolve(record.name)
+
+        share, bucket = rule
+        if (record.levelno < logging.ERROR and share < 1 and random() >= share) or (
+            bucket is not None and not bucket.take()
+        ):
+            self.suppressed += 1
+            return False
+        return True
+
+    def _resolve(self, name: str) -> tuple[float, TokenBucket | None]:
+        share = self._lookup(self._sampling, name)
+        rate = self._lookup(self._rate_limits, name)
+        return 1.0 if share is None else share, None if rate is None else TokenBucket(rate)
+
+    @staticmethod
+    def _lookup(rules: dict[str, float], name: str) -> float | None:
+        while True:
+            if name in rules:
+                return rules[name]
+            if "." not in name:
+                return rules.get("")
+            name = name.rpartition(".")[0]
+
+
+class DropOldestQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks the caller: when the buffer is full the oldest record is dropped.
+
+    Only the message and the traceback are rendered in the calling thread,
+    serialization is left to the listener thread.
+    """
+
+    def __init__(self, queue: Queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except Empty:
+                    pass
+
+
+class LogListener(QueueListener):
+    """
+    Queue listener whose stop waits for room in a full buffer instead of failing.
+    """
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+class LoggingManager:
+    """
+    A class that owns the queue-based logging pipeline: the root logger and the captured
+    server loggers only put records into a bounded queue, a background thread writes them out.
+    """
+
+    def __new__(cls):
+        if not hasattr(cls, "instance"):
+            cls.instance = super(LoggingManager, cls).__new__(cls)
+            cls.instance.handler = None
+            cls.instance.filter = None
+            cls.instance._listener = None
+        return cls.instance  # noqa
+
+    def start(self) -> None:
+        if self._listener is not None:
+            return
+
+        settings = get_settings()
+        sink = create_sink(settings.LOG_FORMAT)
+        self.filter = SamplingFilter(
+            sampling=parse_rules(settings.LOG_SAMPLING), rate_limits=parse_rules(settings.LOG_RATE_LIMITS)
+        )
+        self.handler = DropOldestQueueHandler(Queue(maxsize=settings.LOG_QUEUE_SIZE))
+        self.handler.addFilter(self.filter)
+
+        root = logging.getLogger()
+        root.handlers = [self.handler]
+        root.setLevel(settings.LOG_LEVEL)
+        for name in CAPTURED_LOGGERS:
+            logger = logging.getLogger(name)
+            logger.handlers = []
+            logger.propagate = True
+
+        self._listener = LogListener(self.handler.queue, sink, respect_handler_level=True)
+        self._listener.start()
+
+    def stop(self) -> None:
+        """
+        Flush the queued records and detach from the root logger.
+        """
+        if self._listener is None:
+            return
+        logging.getLogger().removeHandler(self.handler)
+        self._listener.stop()
+        self._listener = None
+
+    def get_stats(self) -> dict[str, tp.Any]:
+        return {
+            "dropped": self.handler.dropped if self.handler is not None else 0,
+            "suppressed": self.filter.suppressed if self.filter is not None else 0,
+        }
@@ -0,0 +1,104 @@
+from api.metrics.registry import Counter, Gauge, Histogram, Registry
+
+
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+HASH_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "Handled HTTP requests.", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time to handle an HTTP request, body included.", ("method", "route")
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests being handled.")
+
+DB_POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds", "Time to get a connection from the database pool.", buckets=FAST_BUCKETS
+)
+DB_POOL_CONNECTIONS = REGISTRY.gauge("db_pool_connections", "Database pool connections by state.", ("state",))
+DB_QUERY_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds", "Time to execute a database statement.", ("operation",), buckets=FAST_BUCKETS
+)
+DB_QUERY_ROWS = REGISTRY.histogram(
+    "db_query_rows", "Rows returned or affected by a database statement.", ("operation",), buckets=ROW_BUCKETS
+)
+DB_SLOW_QUERIES = REGISTRY.counter("db_slow_queries_total", "Statements slower than the threshold.", ("operation",))
+DB_REPEATED_STATEMENTS = REGISTRY.counter(
+    "db_repeated_statements_total", "Requests that repeated one statement past the threshold."
+)
+DB_QUERIES_PER_REQUEST = REGISTRY.histogram(
+    "db_queries_per_request", "Database statements executed per HTTP request.", ("route",), QUERY_COUNT_BUCKETS
+)
+DB_TIME_PER_REQUEST = REGISTRY.histogram(
+    "db_time_per_request_seconds", "Database time spent per HTTP request.", ("route",), FAST_BUCKETS
+)
+DB_COMPILED_CACHE = REGISTRY.counter(
+    "db_compiled_cache_total", "Statement executions by their engine compiled cache result.", ("result",)
+)
+DB_STATEMENT_CACHE = REGISTRY.counter(
+    "db_statement_cache_total", "Lookups of prebuilt repository statements.", ("cache", "result")
+)
+DB_REPLICA_AVAILABLE = REGISTRY.gauge(
+    "db_replica_available", "Whether a read replica is used: reachable and within the lag limit.", ("replica",)
+)
+DB_REPLICA_LAG = REGISTRY.gauge("db_replica_lag_seconds", "Replay lag of a read replica.", ("replica",))
+DB_SESSION_ROUTES = REGISTRY.counter(
+    "db_session_routes_total", "Statements routed to the primary or to a read replica.", ("target",)
+)
+
+REDIS_COMMAND_DURATION = REGISTRY.histogram(
+    "redis_command_duration_seconds", "Time to execute a redis command or pipeline.", ("command",), buckets=FAST_BUCKETS
+)
+REDIS_COMMAND_ERRORS = REGISTRY.counter("redis_command_errors_total", "Failed redis commands.", ("command",))
+
+PASSWORD_HASH_DURATION = REGISTRY.histogram(
+    "password_hash_duration_seconds", "Time to hash or verify a password in a worker.", ("operation",), HASH_BUCKETS
+)
+PASSWORD_HASH_QUEUE_WAIT = REGISTRY.histogram(
+    "password_hash_queue_wait_seconds", "Time waited for a free password hashing slot.", buckets=FAST_BUCKETS
+)
+PASSWORD_HASH_IN_FLIGHT = REGISTRY.gauge(
+    "password_hash_in_flight", "Password hashing operations admitted to the worker pool."
+)
+
+LOG_RECORDS_DROPPED = REGISTRY.gauge("log_records_dropped", "Log records dropped because the buffer was full.")
+LOG_RECORDS_SUPPRESSED = REGISTRY.gauge("log_records_suppressed", "Log records left out by sampling or rate caps.")
+
+PROCESS_MEMORY = REGISTRY.gauge(
+    "process_memory_bytes", "Resident memory of this worker: rss, pss, shared and private.", ("kind",)
+)
+
+
+__all__ = [
+    "Counter",
+    "DB_COMPILED_CACHE",
+    "DB_POOL_CHECKOUT_WAIT",
+    "DB_POOL_CONNECTIONS",
+    "DB_QUERIES_PER_REQUEST",
+    "DB_QUERY_DURATION",
+    "DB_QUERY_ROWS",
+    "DB_REPEATED_STATEMENTS",
+    "DB_REPLICA_AVAILABLE",
+    "DB_REPLICA_LAG",
+    "DB_SESSION_ROUTES",
+    "DB_SLOW_QUERIES",
+    "DB_STATEMENT_CACHE",
+    "DB_TIME_PER_REQUEST",
+    "Gauge",
+    "HTTP_REQUEST_DURATION",
+    "HTTP_REQUESTS",
+    "HTTP_REQUESTS_IN_FLIGHT",
+    "Histogram",
+    "LOG_RECORDS_DROPPED",
+    "LOG_RECORDS_SUPPRESSED",
+    "PASSWORD_HASH_DURATION",
+    "PASSWORD_HASH_IN_FLIGHT",
+    "PASSWORD_HASH_QUEUE_WAIT",
+    "PROCESS_MEMORY",
+    "REDIS_COMMAND_DURATION",
+    "REDIS_COMMAND_ERRORS",
+    "REGISTRY",
+    "Registry",
+]
@@ -0,0 +1,78 @@
+import typing as tp
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.db.connection.instrumentation import track_queries
+from api.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+)
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Records count, duration and status of every HTTP request labelled with its route template,
+    so that paths with parameters do not blow up the number of series.
+
+    The router stores the matched endpoint in the request scope, the template is looked up
+    from the application routes once per endpoint. Database statements are tracked per request;
+    with ``server_timing`` their count and time so far are sent in a Server-Timing header.
+    """
+
+    def __init__(self, app: ASGIApp, *, server_timing: bool = False):
+        self.app = app
+        self._server_timing = server_timing
+        self._templates: dict[tp.Callable, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        method = scope["method"]
+
+        with track_queries(f"{method} {scope['path']}") as query_stats:
+
+            async def send_with_status(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    if self._server_timing:
+                        timing = f'db;dur={query_stats.seconds * 1000:.2f};desc="{query_stats.queries} queries"'
+                        message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+                await send(message)
+
+            HTTP_REQUESTS_IN_FLIGHT.inc()
+            started = perf_counter()
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                duration = perf_counter() - started
+                HTTP_REQUESTS_IN_FLIGHT.dec()
+                route = self._get_template(scope)
+                HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+                HTTP_REQUEST_DURATION.labels(method, route).observe(duration)
+                DB_QUERIES_PER_REQUEST.labels(route).observe(query_stats.queries)
+                DB_TIME_PER_REQUEST.labels(route).observe(query_stats.seconds)
+
+    def _get_template(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+
+        template = self._templates.get(endpoint)
+        if template is None:
+            template = next(
+                (route.path for route in scope["app"].routes if getattr(route, "endpoint", None) is endpoint),
+                UNMATCHED_ROUTE,
+            )
+            self._templates[endpoint] = template
+        return template
@@ -0,0 +1,152 @@
+import typing as tp
+from time import time
+
+from redis.asyncio import Redis
+
+from api.config import get_settings
+from api.db.connection import RedisManager
+from api.db.connection.redis import Listener, listen_channel
+from api.utils.bloom import RotatingBloomFilter
+
+
+class BlocklistFilter:
+    """
+    Per-worker Bloom filter of revoked token ids and of users with an allblock.
+
+    A negative answer means the token is certainly not revoked and redis need not be asked.
+    Members are also written to a redis sorted set scored by insertion time, which is used to
+    rebuild the filter on startup, and are published to ``channel`` so every worker adds them.
+    Until the first rebuild finishes the filter answers positively for every token.
+    """
+
+    INDEX_KEY = "blocklist:index"
+
+    def __init__(self, *, redis: Redis, capacity: int, error_rate: float, ttl: int, channel: str):
+        self._redis = redis
+        self._ttl = ttl
+        self._channel = channel
+        self._bloom = RotatingBloomFilter(capacity, error_rate, period=ttl)
+        self.ready = False
+
+        self.lookups = 0
+        self.filter_hits = 0
+        self.confirmed_hits = 0
+
+    def might_be_revoked(self, token_payload: dict[str, tp.Any]) -> bool:
+        if not self.ready:
+            return True
+
+        self.lookups += 1
+        hit = self._token_member(token_payload.get("jti")) in self._bloom or (
+            self._user_member(token_payload.get("sub")) in self._bloom
+        )
+        if hit:
+            self.filter_hits += 1
+        return hit
+
+    def record_confirmed_hit(self) -> None:
+        if self.ready:
+            self.confirmed_hits += 1
+
+    async def add_token(self, jti: str) -> None:
+        await self._add(self._token_member(jti))
+
+    async def add_user(self, sub: str) -> None:
+        await self._add(self._user_member(sub))
+
+    async def rebuild(self) -> None:
+        now = time()
+        async with self._redis.pipeline(transaction=False) as pipeline:
+            pipeline.zremrangebyscore(self.INDEX_KEY, "-inf", now - self._ttl)
+            pipeline.zrangebyscore(self.INDEX_KEY, now - self._ttl, "+inf")
+            _, members = await pipeline.execute()
+
+        self._bloom.clear()
+        for member in members:
+            self._bloom.add(member.decode())
+        self.ready = True
+
+    async def listen(self) -> None:
+        """
+        Subscribe to members added by other workers, then rebuild the filter, until cancelled.
+        The filter is rebuilt every time the subscription is (re)established.
+        """
+        await listen_channel(
+            self._redis,
+            self._channel,
+            on_message=self._add_published,
+            on_subscribe=self.rebuild,
+            on_disconnect=self._mark_not_ready,
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "entries": self._bloom.count,
+            "memory_bytes": self._bloom.memory_bytes,
+            "estimated_false_positive_rate": self._bloom.false_positive_rate,
+            "lookups": self.lookups,
+            "filter_hits": self.filter_hits,
+            "confirmed_hits": self.confirmed_hits,
+        }
+
+    async def _add(self, member: str) -> None:
+        self._bloom.add(member)
+        now = time()
+        async with self._redis.pipeline(transaction=False) as pipeline:
+            pipeline.zadd(self.INDEX_KEY, {member: now})
+            pipeline.zremrangebyscore(self.INDEX_KEY, "-inf", now - self._ttl)
+            pipeline.publish(self._channel, member)
+            await pipeline.execute()
+
+    def _add_published(self, data: bytes) -> None:
+        member = data.decode()
+        if member not in self._bloom:  # own members come back through the channel too
+            self._bloom.add(member)
+
+    def _mark_not_ready(self) -> None:
+        self.ready = False
+
+    @staticmethod
+    def _token_member(jti: str) -> str:
+        return f"jti:{jti}"
+
+    @staticmethod
+    def _user_member(sub: str) -> str:
+        return f"sub:{sub}"
+
+
+class BlocklistFilterManager:
+    """
+    A class that owns the per-worker blocklist filter and its update subscription.
+    """
+
+    def __new__(cls):
+        if not hasattr(cls, "instance"):
+            cls.instance = super(BlocklistFilterManager, cls).__new__(cls)
+            cls.instance.filter = None
+            cls.instance._listener = Listener()
+        return cls.instance  # noqa
+
+    def get_filter(self) -> BlocklistFilter | None:
+        settings = get_settings()
+        if self.filter is None and settings.BLOCKLIST_FILTER_ENABLED and settings.redis_required:
+            self.refresh()
+        return self.filter
+
+    def refresh(self) -> None:
+        settings = get_settings()
+        self.filter = BlocklistFilter(redis=RedisManager().get_redis(), **settings.blocklist_filter_settings)
+
+    async def start(self) -> None:
+        blocklist_filter = self.get_filter()
+        if blocklist_filter is not None:
+            self._listener.start(blocklist_filter.listen)
+
+    async def stop(self) -> None:
+        await self._listener.stop()
+        self.filter = None
+
+
+async def get_blocklist_filter() -> BlocklistFilter | None:
+    return BlocklistFilterManager().get_filter()
@@ -0,0 +1,102 @@
+import asyncio
+import typing as tp
+from functools import lru_cache
+from hashlib import blake2b
+from time import monotonic
+from uuid import UUID
+
+from api.config import get_settings
+from api.dto import RoleSnapshot
+
+
+# roles with their permission bitsets and the permission catalogue, code to bit position
+Loader = tp.Callable[[], tp.Awaitable[tuple[tp.Iterable[RoleSnapshot], tp.Mapping[str, int]]]]
+
+
+def get_version(roles: tp.Iterable[RoleSnapshot], permissions: tp.Mapping[str, int]) -> str:
+    """
+    Digest of the compiled table, the same in every worker that loaded the same rows.
+    """
+    digest = blake2b(digest_size=4)
+    for role in sorted(roles, key=lambda role: role.id):
+        digest.update(f"{role.id}:{role.permissions:x};".encode())
+    for code, bit in sorted(permissions.items()):
+        digest.update(f"{code}:{bit};".encode())
+    return digest.hexdigest()
+
+
+class RoleRegistry:
+    """
+    The role table kept in the worker: a handful of rows read on every registration and admin check
+    that only change with migrations.
+
+    Every role carries its permissions compiled into a bitset, so a permission check is a bitwise AND.
+    ``version`` changes whenever a reload brings different roles or permissions; it is embedded in access
+    tokens next to their bitset, and a token with another version has its permissions resolved again.
+
+    The table is loaded on first use and reloaded once it is older than ``ttl`` seconds or invalidated.
+    The loader comes from the caller, so the registry is shared by the whole process
+    while the rows are read through the session of whichever request needs them first.
+    """
+
+    def __init__(self, *, ttl: float):
+        self._ttl = ttl
+        self._by_id: dict[UUID, RoleSnapshot] = {}
+        self._by_code: dict[str, RoleSnapshot] = {}
+        self._bits: dict[str, int] = {}
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self.version = ""
+        self.loads = 0
+
+    async def get_by_id(self, role_id: UUID, load: Loader) -> RoleSnapshot | None:
+        await self._ensure(load)
+        return self._by_id.get(role_id)
+
+    async def get_by_code(self, code: str, load: Loader) -> RoleSnapshot | None:
+        await self._ensure(load)
+        return self._by_code.get(code)
+
+    async def get_ids(self, load: Loader) -> dict[str, UUID]:
+        await self._ensure(load)
+        return {code: role.id for code, role in self._by_code.items()}
+
+    async def get_mask(self, codes: tp.Iterable[str], load: Loader) -> int | None:
+        """
+        Bitset of the given permissions, None if any of them does not exist and so cannot be granted.
+        """
+        await self._ensure(load)
+        mask = 0
+        for code in codes:
+            bit = self._bits.get(code)
+            if bit is None:
+                return None
+            mask |= 1 << bit
+        return mask
+
+    async def get_version(self, load: Loader) -> str:
+        await self._ensure(load)
+        return self.version
+
+    def invalidate(self) -> None:
+        self._expires_at = 0.0
+
+    async def _ensure(self, load: Loader) -> None:
+        if self._expires_at > monotonic():
+            return
+        async with self._lock:
+            if self._expires_at > monotonic():
+                return
+            roles, permissions = await load()
+            roles = list(roles)
+            self._by_id = {role.id: role for role in roles}
+            self._by_code = {role.code: role for role in roles}
+            self._bits = dict(permissions)
+            self.version = get_version(roles, self._bits)
+            self._expires_at = monotonic() + self._ttl
+            self.loads += 1
+
+
+@lru_cache
+def get_role_registry() -> RoleRegistry:
+    return RoleRegistry(ttl=get_settings().ROLE_REGISTRY_TTL)
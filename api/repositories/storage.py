@@ -0,0 +1,387 @@
+import typing as tp
+from abc import abstractmethod
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from functools import lru_cache
+from time import time
+
+import orjson
+from fastapi import Depends
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+
+from api.config import get_settings
+from api.db.connection import RedisManager, get_redis
+from api.db.connection.redis import Listener, listen_pattern
+from api.utils.timing_wheel import TimingWheel
+
+
+# keyspace notifications for string and generic commands, expirations and evictions
+KEYSPACE_EVENTS = "K$gxe"
+
+
+class BaseKeyValueStorage(tp.Protocol):
+    @abstractmethod
+    async def set(self, key: str, value: tp.Any, ex: int | timedelta | None = None):
+        pass
+
+    @abstractmethod
+    async def get(self, key: str) -> tp.Any | None:
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    async def get_many(self, *keys: str) -> list[tp.Any | None]:
+        pass
+
+
+# pylint: disable=no-member
+def encode(value: tp.Any) -> bytes:
+    return value if isinstance(value, bytes) else orjson.dumps(value)
+
+
+def decode(value: bytes | None) -> tp.Any | None:
+    """
+    Values starting with a control character are binary, JSON never starts with one.
+    """
+    if value is None or value[:1] < b" ":
+        return value
+    return orjson.loads(value)
+
+
+class RedisStorage(BaseKeyValueStorage):
+    """
+    Values are stored as JSON, except bytes which are stored as they are and have to start
+    with a byte below 0x20 to be told apart from JSON when read back.
+    """
+
+    def __init__(self, redis: Redis):
+        self._redis = redis
+
+    async def set(self, key: str, value: tp.Any, ex: int | timedelta | None = None):
+        await self._redis.set(key, encode(value), ex=ex)
+
+    async def get(self, key: str) -> tp.Any | None:
+        return decode(await self._redis.get(key))
+
+    async def delete(self, key: str):
+        await self._redis.delete(key)
+
+    async def get_many(self, *keys: str) -> list[tp.Any | None]:
+        values = await self._redis.mget(keys)
+        return [decode(value) for value in values]
+
+    @asynccontextmanager
+    async def pipeline(self, *, transaction: bool = True) -> tp.AsyncIterator["RedisStoragePipeline"]:
+        """
+        Batch several commands into one round trip, wrapped in MULTI/EXEC if transaction is set.
+        """
+        async with self._redis.pipeline(transaction=transaction) as pipeline:
+            yield RedisStoragePipeline(pipeline)
+
+
+class RedisStoragePipeline:
+    """
+    Queues storage commands with the same encoding as RedisStorage, results are returned by execute.
+    """
+
+    def __init__(self, pipeline: Pipeline):
+        self._pipeline = pipeline
+        self._decode: list[bool] = []
+
+    def set(self, key: str, value: tp.Any, ex: int | timedelta | None = None) -> "RedisStoragePipeline":
+        self._pipeline.set(key, encode(value), ex=ex)
+        self._decode.append(False)
+        return self
+
+    def get(self, key: str) -> "RedisStoragePipeline":
+        self._pipeline.get(key)
+        self._decode.append(True)
+        return self
+
+    def delete(self, key: str) -> "RedisStoragePipeline":
+        self._pipeline.delete(key)
+        self._decode.append(False)
+        return self
+
+    async def execute(self) -> list[tp.Any]:
+        results = await self._pipeline.execute()
+        decoding, self._decode = self._decode, []
+        return [decode(result) if need_decode else result for need_decode, result in zip(decoding, results)]
+
+
+class InMemoryStorage(BaseKeyValueStorage):
+    """
+    Process-local storage for single-node deployments, tests and load rigs.
+
+    Values are kept as is, without serialization, so they must not be mutated after set or get.
+    Expiry is driven by a timing wheel advanced on every call, and at most ``max_entries`` keys
+    are kept, evicting the least recently used ones. No method awaits while touching the entries,
+    so each call is atomic with respect to other asyncio tasks and needs no lock.
+    """
+
+    def __init__(self, *, max_entries: int, tick: float = 1.0):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tp.Any] = OrderedDict()
+        self._expires_at: dict[str, float] = {}
+        self._wheel = TimingWheel(tick=tick, now=time())
+
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def set(self, key: str, value: tp.Any, ex: int | timedelta | None = None):
+        now = self._advance()
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        if ex is None:
+            self._expires_at.pop(key, None)
+            self._wheel.cancel(key)
+        else:
+            expires_at = now + (ex.total_seconds() if isinstance(ex, timedelta) else ex)
+            self._expires_at[key] = expires_at
+            if not self._wheel.schedule(key, expires_at):
+                self._remove(key)
+                return
+
+        while len(self._entries) > self._max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evicted += 1
+
+    async def get(self, key: str) -> tp.Any | None:
+        return self._get(key, self._advance())
+
+    async def delete(self, key: str):
+        self._advance()
+        self._remove(key)
+
+    async def get_many(self, *keys: str) -> list[tp.Any | None]:
+        now = self._advance()
+        return [self._get(key, now) for key in keys]
+
+    def discard(self, key: str) -> None:
+        self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._expires_at.clear()
+        self._wheel.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "timers": len(self._wheel),
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+    def _get(self, key: str, now: float) -> tp.Any | None:
+        if key not in self._entries:
+            return None
+
+        # the wheel fires up to one tick late, the exact deadline is checked here
+        expires_at = self._expires_at.get(key)
+        if expires_at is not None and expires_at <= now:
+            self._remove(key)
+            self.expired += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def _advance(self) -> float:
+        now = time()
+        for key in self._wheel.advance(now):
+            self._entries.pop(key, None)
+            self._expires_at.pop(key, None)
+            self.expired += 1
+        return now
+
+    def _remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._expires_at.pop(key, None)
+        self._wheel.cancel(key)
+
+
+class TieredStorage(BaseKeyValueStorage):
+    """
+    Redis storage fronted by a per-worker local tier that also remembers absent keys.
+
+    Reads are served locally for up to ``ttl`` seconds (``negative_ttl`` for absent keys, never
+    longer than the expiry set in redis), writes and deletes go through to redis first. Other
+    workers learn about changed keys from redis keyspace notifications, so the local tier is only
+    filled while that subscription is up, and a value read from redis is only cached if no
+    invalidation arrived while it was being read.
+    """
+
+    ABSENT = object()
+
+    def __init__(
+        self,
+        remote: BaseKeyValueStorage,
+        *,
+        max_entries: int,
+        ttl: float,
+        negative_ttl: float,
+        redis: Redis | None = None,
+        db: int = 0,
+    ):
+        self._remote = remote
+        self._local = InMemoryStorage(max_entries=max_entries, tick=min(ttl, negative_ttl) / 4)
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._redis = redis
+        self._prefix = f"__keyspace@{db}__:"
+
+        self._generation = 0
+        self._subscribed = redis is None
+
+        self.local_hits = 0
+        self.negative_hits = 0
+        self.remote_hits = 0
+        self.remote_misses = 0
+
+    async def set(self, key: str, value: tp.Any, ex: int | timedelta | None = None):
+        generation = self._generation
+        await self._remote.set(key, value, ex=ex)
+        await self._fill(key, value, ex, generation)
+
+    async def get(self, key: str) -> tp.Any | None:
+        return (await self.get_many(key))[0]
+
+    async def delete(self, key: str):
+        generation = self._generation
+        await self._remote.delete(key)
+        await self._fill(key, None, None, generation)
+
+    async def get_many(self, *keys: str) -> list[tp.Any | None]:
+        values = await self._local.get_many(*keys)
+        missing = [i for i, value in enumerate(values) if value is None]
+        for value in values:
+            if value is self.ABSENT:
+                self.negative_hits += 1
+            elif value is not None:
+                self.local_hits += 1
+
+        if missing:
+            generation = self._generation
+            fetched = await self._remote.get_many(*(keys[i] for i in missing))
+            for i, value in zip(missing, fetched):
+                if value is None:
+                    self.remote_misses += 1
+                else:
+                    self.remote_hits += 1
+                await self._fill(keys[i], value, None, generation)
+                values[i] = value
+
+        return [None if value is self.ABSENT else value for value in values]
+
+    def evict(self, key: str) -> None:
+        self._generation += 1
+        self._local.discard(key)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._local.clear()
+
+    async def listen(self) -> None:
+        """
+        Evict keys changed in redis until cancelled. The local tier is dropped
+        and not filled while the subscription is down.
+        """
+
+        async def on_subscribe() -> None:
+            self.clear()
+            self._subscribed = True
+
+        def on_disconnect() -> None:
+            self._subscribed = False
+            self.clear()
+
+        await listen_pattern(
+            self._redis,
+            f"{self._prefix}*",
+            on_message=lambda channel, _: self.evict(channel.decode()[len(self._prefix) :]),
+            on_subscribe=on_subscribe,
+            on_disconnect=on_disconnect,
+        )
+
+    def get_stats(self) -> dict:
+        lookups = self.local_hits + self.negative_hits + self.remote_hits + self.remote_misses
+        return {
+            "entries": len(self._local),
+            "local_hits": self.local_hits,
+            "negative_hits": self.negative_hits,
+            "remote_hits": self.remote_hits,
+            "remote_misses": self.remote_misses,
+            "local_hit_rate": (self.local_hits + self.negative_hits) / lookups if lookups else 0.0,
+            "remote_hit_rate": self.remote_hits / lookups if lookups else 0.0,
+        }
+
+    async def _fill(self, key: str, value: tp.Any | None, ex: int | timedelta | None, generation: int) -> None:
+        if not self._subscribed or generation != self._generation:
+            self._local.discard(key)
+            return
+
+        ttl = self._ttl if value is not None else self._negative_ttl
+        if ex is not None:
+            ttl = min(ttl, ex.total_seconds() if isinstance(ex, timedelta) else ex)
+        await self._local.set(key, self.ABSENT if value is None else value, ex=ttl)
+
+
+class TieredStorageManager:
+    """
+    A class that owns the per-worker tiered storage and its keyspace notification subscription.
+    """
+
+    def __new__(cls):
+        if not hasattr(cls, "instance"):
+            cls.instance = super(TieredStorageManager, cls).__new__(cls)
+            cls.instance.storage = None
+            cls.instance._listener = Listener()
+        return cls.instance  # noqa
+
+    def get_storage(self) -> TieredStorage | None:
+        if self.storage is None and get_settings().KEY_VALUE_STORAGE == "tiered":
+            self.refresh()
+        return self.storage
+
+    def refresh(self) -> None:
+        settings = get_settings()
+        redis = RedisManager().get_redis()
+        self.storage = TieredStorage(RedisStorage(redis), redis=redis, **settings.tiered_storage_settings)
+
+    async def start(self) -> None:
+        storage = self.get_storage()
+        if storage is None or self._listener.running:
+            return
+
+        if get_settings().TIERED_STORAGE_CONFIGURE_NOTIFICATIONS:
+            await RedisManager().get_redis().config_set("notify-keyspace-events", KEYSPACE_EVENTS)
+        self._listener.start(storage.listen)
+
+    async def stop(self) -> None:
+        await self._listener.stop()
+        self.storage = None
+
+
+@lru_cache(maxsize=1)
+def get_memory_storage() -> InMemoryStorage:
+    return InMemoryStorage(**get_settings().memory_storage_settings)
+
+
+async def get_key_value_storage(redis: Redis = Depends(get_redis)) -> BaseKeyValueStorage:
+    kind = get_settings().KEY_VALUE_STORAGE
+    if kind == "memory":
+        return get_memory_storage()
+    if kind == "tiered":
+        return TieredStorageManager().get_storage()
+    return RedisStorage(redis=redis)
@@ -0,0 +1,40 @@
+"""
+Binary values of the token entries kept in the key-value storage.
+
+An entry is a format version byte followed by a big-endian unix timestamp and a 16-byte UUID, 21 bytes
+in place of a JSON token payload. The version byte is below 0x20, which no JSON document starts with,
+so the storage hands such values back as they are, and values written as JSON before are still read.
+"""
+import struct
+import typing as tp
+from uuid import UUID
+
+
+FORMAT_VERSION = 1
+ENTRY = struct.Struct(">BI16s")
+NIL = bytes(16)
+
+# a blocklist entry only has to exist
+PRESENT = bytes([FORMAT_VERSION])
+
+
+def pack_entry(timestamp: int, token_id: str | None) -> bytes:
+    """
+    Raises ValueError if ``token_id`` is not a UUID.
+    """
+    return ENTRY.pack(FORMAT_VERSION, timestamp, UUID(token_id).bytes if token_id is not None else NIL)
+
+
+def unpack_entry(value: bytes | dict[str, tp.Any], *fields: str) -> tuple[int, str | None]:
+    """
+    Timestamp and UUID of an entry. A legacy JSON entry, decoded by the storage, is read from ``fields``:
+    the names its timestamp and its token id had in the payload.
+    """
+    if isinstance(value, dict):
+        timestamp_field, token_id_field = fields
+        return value.get(timestamp_field), value.get(token_id_field)
+
+    version, timestamp, token_id = ENTRY.unpack(value)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unknown token entry format {version}")
+    return timestamp, str(UUID(bytes=token_id)) if token_id != NIL else None
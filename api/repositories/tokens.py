@@ -1,130 +1,187 @@
 import typing as tp
-from abc import abstractmethod
 from datetime import datetime, timedelta, timezone
 
-import orjson
 from fastapi import Depends
-from redis.asyncio import Redis
 
-from api.db.connection import get_redis
+from api.config import get_settings
+from api.repositories.blocklist_filter import BlocklistFilter, get_blocklist_filter
+from api.repositories.storage import BaseKeyValueStorage, get_key_value_storage
+from api.repositories.token_entries import PRESENT, pack_entry, unpack_entry
 
 
 def utcnow() -> int:
     return int(datetime.now(tz=timezone.utc).timestamp())
 
 
-class BaseKeyValueStorage(tp.Protocol):
-    @abstractmethod
-    async def set(self, key: str, value: tp.Any, ex: int | timedelta | None = None):
-        pass
-
-    @abstractmethod
-    async def get(self, key: str) -> tp.Any | None:
-        pass
-
-    @abstractmethod
-    async def delete(self, key: str):
-        pass
-
-
-# pylint: disable=no-member
-class RedisStorage(BaseKeyValueStorage):
-    def __init__(self, redis: Redis):
-        self._redis = redis
-
-    async def set(self, key: str, value: tp.Any, ex: int | timedelta | None = None):
-        encoded = orjson.dumps(value)
-        await self._redis.set(key, encoded, ex=ex)
-
-    async def get(self, key: str) -> tp.Any | None:
-        value = await self._redis.get(key)
-
-        if value is not None:
-            value = orjson.loads(value)
-
-        return value
-
-    async def delete(self, key: str):
-        await self._redis.delete(key)
+def remaining(token_payload: dict[str, tp.Any], default: int | timedelta) -> int | timedelta | None:
+    """
+    Seconds until the token expires, None once it has: entries about it are useless afterwards.
+    """
+    exp = token_payload.get("exp")
+    if exp is None:
+        return default
+    left = exp - utcnow()
+    return left if left > 0 else None
 
 
 class RefreshTokensRepository:
-    def __init__(self, storage: BaseKeyValueStorage, *, expire_time: int | timedelta = timedelta(weeks=2)):
+    """
+    Keeps the jti of the current refresh token of every user, in the compact format of ``token_entries``,
+    under ``r:<sub>`` until the token expires.
+
+    With ``read_legacy`` set, users without an entry are looked up under the key and in the JSON format
+    used before, until every refresh token written that way has expired.
+    """
+
+    def __init__(
+        self,
+        storage: BaseKeyValueStorage,
+        *,
+        expire_time: int | timedelta = timedelta(weeks=2),
+        read_legacy: bool = False,
+    ):
         self._storage = storage
         self._expire_time = expire_time
+        self._read_legacy = read_legacy
 
     async def set_refresh_token(self, payload: dict[str, tp.Any]):
-        sub = payload.get("sub")
-        refresh_key = self.generate_refresh_key(sub)
-        await self._storage.set(refresh_key, payload, ex=self._expire_time)
+        ex = remaining(payload, self._expire_time)
+        if ex is None:
+            return
+        value = pack_entry(payload.get("exp", 0), payload.get("jti"))
+        await self._storage.set(self.generate_refresh_key(payload.get("sub")), value, ex=ex)
 
     async def unset_refresh_token(self, sub: str):
-        refresh_key = self.generate_refresh_key(sub)
-        await self._storage.delete(refresh_key)
-
-    async def get_refresh_token_from_storage(self, sub: str) -> dict[str, tp.Any] | None:
-        refresh_key = self.generate_refresh_key(sub)
-        return await self._storage.get(refresh_key)
+        await self._storage.delete(self.generate_refresh_key(sub))
+        if self._read_legacy:
+            await self._storage.delete(f"{sub}:refresh")
+
+    async def get_refresh_jti(self, sub: str) -> str | None:
+        keys = [self.generate_refresh_key(sub)]
+        if self._read_legacy:
+            keys.append(f"{sub}:refresh")
+        entry = next((value for value in await self._storage.get_many(*keys) if value is not None), None)
+        if entry is None:
+            return None
+        _, jti = unpack_entry(entry, "exp", "jti")
+        return jti
 
     def generate_refresh_key(self, sub: str) -> str:
-        return f"{sub}:refresh"
+        return f"r:{sub}"
 
 
 class BlocklistRepository:
-    def __init__(self, storage: BaseKeyValueStorage, *, expire_time: int | timedelta = timedelta(hours=1)):
+    """
+    Blocklist entries are a single byte under ``b:<jti>`` that lives as long as the blocked token.
+    Allblock entries hold the time of the block and the excluded jti under ``a:<sub>`` for
+    ``allblock_expire_time``, the longest lifetime of a token issued before the block.
+
+    With ``read_legacy`` set, the keys and the JSON values used before are read as well.
+    """
+
+    def __init__(
+        self,
+        storage: BaseKeyValueStorage,
+        *,
+        expire_time: int | timedelta = timedelta(hours=1),
+        allblock_expire_time: int | timedelta = timedelta(weeks=2),
+        blocklist_filter: BlocklistFilter | None = None,
+        read_legacy: bool = False,
+    ):
         self._storage = storage
         self._expire_time = expire_time
+        self._allblock_expire_time = allblock_expire_time
+        self._filter = blocklist_filter
+        self._read_legacy = read_legacy
 
     async def in_blocklist(self, token_payload: dict[str, tp.Any]) -> bool:
-        key = self.generate_blocklist_key(token_payload)
-        return await self._storage.get(key) is not None
+        keys = [self.generate_blocklist_key(token_payload)]
+        if self._read_legacy:
+            keys.append(token_payload.get("jti"))
+        return any(value is not None for value in await self._storage.get_many(*keys))
 
     async def add_to_blocklist(self, token_payload: dict[str, tp.Any]):
-        key = self.generate_blocklist_key(token_payload)
-        await self._storage.set(key, token_payload, ex=self._expire_time)
+        ex = remaining(token_payload, self._expire_time)
+        if ex is not None:
+            await self._storage.set(self.generate_blocklist_key(token_payload), PRESENT, ex=ex)
+        if self._filter is not None:
+            await self._filter.add_token(token_payload.get("jti"))
 
     async def blocked_by_allblock(self, token_payload: dict[str, tp.Any]) -> bool:
-        jti = token_payload.get("jti")
-        iat = token_payload.get("iat")
+        allblock = await self._get_allblock(token_payload.get("sub"))
+        return self.allblock_applies(token_payload, allblock)
+
+    async def is_revoked(self, token_payload: dict[str, tp.Any]) -> bool:
+        """
+        Check both the token's own blocklist entry and its owner's allblock in a single storage round trip.
+        The storage is not asked at all when the blocklist filter knows neither of them. The filter is
+        bypassed while legacy entries are read: they were written before it and are not in its index.
+        """
+        if self._filter is not None and not self._read_legacy and not self._filter.might_be_revoked(token_payload):
+            return False
 
-        key = self.generate_allblock_key(token_payload.get("sub"))
-        allblock = await self._storage.get(key)
+        sub = token_payload.get("sub")
+        keys = [self.generate_blocklist_key(token_payload), self.generate_allblock_key(sub)]
+        if self._read_legacy:
+            keys += [token_payload.get("jti"), f"{sub}:allblock"]
+        values = await self._storage.get_many(*keys)
+        blocked, allblock = values[0], values[1]
+        if self._read_legacy:
+            blocked = blocked if blocked is not None else values[2]
+            allblock = allblock if allblock is not None else values[3]
+
+        revoked = blocked is not None or self.allblock_applies(token_payload, allblock)
+        if revoked and self._filter is not None:
+            self._filter.record_confirmed_hit()
+        return revoked
+
+    @staticmethod
+    def allblock_applies(token_payload: dict[str, tp.Any], allblock: bytes | dict[str, tp.Any] | None) -> bool:
         if allblock is None:
             return False
 
-        exclude_jti = allblock.get("exclude")
-        blocked_at = allblock.get("blocked_at")
-        return (jti != exclude_jti) and (iat <= blocked_at)
+        blocked_at, exclude_jti = unpack_entry(allblock, "blocked_at", "exclude")
+        return (token_payload.get("jti") != exclude_jti) and (token_payload.get("iat") <= blocked_at)
 
     async def block_all_except_current(self, token_payload: dict):
-        jti = token_payload.get("jti")
-        key = self.generate_allblock_key(token_payload.get("sub"))
-        now = utcnow()
-        await self._storage.set(key, {"blocked_at": now, "exclude": jti})
+        await self._block_all(token_payload.get("sub"), exclude=token_payload.get("jti"))
 
     async def block_all(self, user_id: str):
+        await self._block_all(user_id, exclude=None)
+
+    async def _block_all(self, user_id: str, *, exclude: str | None) -> None:
         key = self.generate_allblock_key(user_id)
-        now = utcnow()
-        await self._storage.set(key, {"blocked_at": now, "exclude": None})
+        await self._storage.set(key, pack_entry(utcnow(), exclude), ex=self._allblock_expire_time)
+        if self._filter is not None:
+            await self._filter.add_user(user_id)
+
+    async def _get_allblock(self, sub: str) -> bytes | dict[str, tp.Any] | None:
+        keys = [self.generate_allblock_key(sub)]
+        if self._read_legacy:
+            keys.append(f"{sub}:allblock")
+        return next((value for value in await self._storage.get_many(*keys) if value is not None), None)
 
     def generate_allblock_key(self, sub: str) -> str:
-        return f"{sub}:allblock"
+        return f"a:{sub}"
 
     def generate_blocklist_key(self, token_payload: dict[str, tp.Any]) -> str:
-        return token_payload.get("jti")
-
-
-async def get_key_value_storage(redis: Redis = Depends(get_redis)) -> RedisStorage:
-    return RedisStorage(redis=redis)
+        return f"b:{token_payload.get('jti')}"
 
 
 async def get_refresh_tokens_repository(
-    storage: RedisStorage = Depends(get_key_value_storage),
+    storage: BaseKeyValueStorage = Depends(get_key_value_storage),
 ) -> RefreshTokensRepository:
-    return RefreshTokensRepository(storage)
+    return RefreshTokensRepository(storage, read_legacy=get_settings().TOKEN_STORAGE_READ_LEGACY)
 
 
 async def get_blocklist_repository(
-    storage: RedisStorage = Depends(get_key_value_storage),
+    storage: BaseKeyValueStorage = Depends(get_key_value_storage),
+    blocklist_filter: BlocklistFilter | None = Depends(get_blocklist_filter),
 ) -> BlocklistRepository:
-    return BlocklistRepository(storage)
+    settings = get_settings()
+    return BlocklistRepository(
+        storage,
+        expire_time=settings.BLOCKLIST_EXPIRE_TIME,
+        blocklist_filter=blocklist_filter,
+        read_legacy=settings.TOKEN_STORAGE_READ_LEGACY,
+    )
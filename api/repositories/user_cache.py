@@ -0,0 +1,221 @@
+from collections import OrderedDict
+from secrets import token_hex
+from time import monotonic
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from api.config import get_settings
+from api.db.connection import RedisManager
+from api.db.connection.redis import Listener, listen_channel
+from api.dto import UserSnapshot
+from api.repositories.storage import BaseKeyValueStorage, RedisStorage
+
+
+class UserCache:
+    """
+    Cache of user snapshots keyed by user id: a per-worker LRU in front of an optional shared storage.
+
+    Invalidations remove the user from the local tier and are published to ``channel``,
+    so the local tiers of all other workers drop the user as well. While the subscription
+    is down nothing is cached locally, since invalidations published meanwhile would be missed.
+
+    In the shared storage every snapshot is stored with the version of the user it was loaded at,
+    and an invalidation moves the version on: a snapshot loaded before an invalidation
+    and written after it never matches the version again, so it is never read.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int,
+        ttl: int,
+        channel: str,
+        redis: Redis | None = None,
+        storage: BaseKeyValueStorage | None = None,
+        storage_ttl: int | None = None,
+    ):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._channel = channel
+        self._redis = redis
+        self._storage = storage
+        self._storage_ttl = storage_ttl
+
+        self._entries: OrderedDict[str, tuple[UserSnapshot, float]] = OrderedDict()
+        self._versions: OrderedDict[str, str | None] = OrderedDict()
+        self._generation = 0
+        self.ready = redis is None
+
+        self.local_hits = 0
+        self.storage_hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self) -> int:
+        """
+        Changes on every invalidation. A snapshot loaded from the database may only be cached
+        if the generation did not change while it was being loaded.
+        """
+        return self._generation
+
+    @property
+    def distributed(self) -> bool:
+        """
+        Whether invalidations are shared with other workers through redis.
+        """
+        return self._redis is not None
+
+    async def get(self, user_id: UUID | str) -> UserSnapshot | None:
+        key = str(user_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            snapshot, expires_at = entry
+            if expires_at > monotonic():
+                self._entries.move_to_end(key)
+                self.local_hits += 1
+                return snapshot
+            del self._entries[key]
+
+        if self._storage is not None:
+            stored, version = await self._storage.get_many(self.generate_key(key), self.generate_version_key(key))
+            if stored is not None and stored[0] == version:
+                snapshot = self.decode(stored[1])
+                self._put_local(key, snapshot)
+                self.storage_hits += 1
+                return snapshot
+            self._remember_version(key, version)
+
+        self.misses += 1
+        return None
+
+    async def set(self, snapshot: UserSnapshot, *, generation: int) -> None:
+        if generation != self._generation:
+            return
+
+        key = str(snapshot.id)
+        self._put_local(key, snapshot)
+        if self._storage is not None and key in self._versions:
+            stored = [self._versions.pop(key), self.encode(snapshot)]
+            await self._storage.set(self.generate_key(key), stored, ex=self._storage_ttl)
+
+    async def invalidate(self, user_id: UUID | str) -> None:
+        key = str(user_id)
+        self.evict(key)
+        if self._storage is not None:
+            # outlives every snapshot stored with the previous version
+            version_ttl = 2 * self._storage_ttl if self._storage_ttl else None
+            await self._storage.set(self.generate_version_key(key), token_hex(8), ex=version_ttl)
+        if self._redis is not None:
+            await self._redis.publish(self._channel, key)
+
+    def evict(self, user_id: str) -> None:
+        self._generation += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    async def listen(self) -> None:
+        """
+        Apply invalidations published by other workers until cancelled.
+        The local tier is dropped whenever the subscription is (re)established.
+        """
+
+        await listen_channel(
+            self._redis,
+            self._channel,
+            on_message=lambda data: self.evict(data.decode()),
+            on_subscribe=self._mark_ready,
+            on_disconnect=self._mark_not_ready,
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "local_hits": self.local_hits,
+            "storage_hits": self.storage_hits,
+            "misses": self.misses,
+        }
+
+    async def _mark_ready(self) -> None:
+        self.clear()
+        self.ready = True
+
+    def _mark_not_ready(self) -> None:
+        self.ready = False
+        self.clear()
+
+    def _remember_version(self, key: str, version: str | None) -> None:
+        self._versions[key] = version
+        self._versions.move_to_end(key)
+        while len(self._versions) > self._max_size:
+            self._versions.popitem(last=False)
+
+    def _put_local(self, key: str, snapshot: UserSnapshot) -> None:
+        if not self.ready:
+            return
+        self._entries[key] = (snapshot, monotonic() + self._ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def generate_key(user_id: str) -> str:
+        return f"{user_id}:user"
+
+    @staticmethod
+    def generate_version_key(user_id: str) -> str:
+        return f"{user_id}:user:version"
+
+    @staticmethod
+    def encode(snapshot: UserSnapshot) -> list:
+        return [str(snapshot.id), snapshot.username, snapshot.bonus_account, snapshot.role_id and str(snapshot.role_id)]
+
+    @staticmethod
+    def decode(encoded: list) -> UserSnapshot:
+        user_id, username, bonus_account, role_id = encoded
+        return UserSnapshot(
+            id=UUID(user_id),
+            username=username,
+            bonus_account=bonus_account,
+            role_id=role_id and UUID(role_id),
+        )
+
+
+class UserCacheManager:
+    """
+    A class that owns the per-worker user cache and its invalidation subscription.
+    """
+
+    def __new__(cls):
+        if not hasattr(cls, "instance"):
+            cls.instance = super(UserCacheManager, cls).__new__(cls)
+            cls.instance.cache = None
+            cls.instance._listener = Listener()
+        return cls.instance  # noqa
+
+    def get_cache(self) -> UserCache | None:
+        if self.cache is None and get_settings().USER_CACHE_ENABLED:
+            self.refresh()
+        return self.cache
+
+    def refresh(self) -> None:
+        settings = get_settings()
+        redis = RedisManager().get_redis() if settings.redis_required else None
+        storage = RedisStorage(redis) if settings.USER_CACHE_REDIS_ENABLED else None
+        self.cache = UserCache(redis=redis, storage=storage, **settings.user_cache_settings)
+
+    async def start(self) -> None:
+        cache = self.get_cache()
+        if cache is not None and cache.distributed:
+            self._listener.start(cache.listen)
+
+    async def stop(self) -> None:
+        await self._listener.stop()
+        self.cache = None
+
+
+async def get_user_cache() -> UserCache | None:
+    return UserCacheManager().get_cache()
@@ -1,54 +1,268 @@
+import typing as tp
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import exc, select, update
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import bindparam, column, exc, select, table, text, tuple_, update
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
 
 from api.db.connection import get_session
-from api.db.models import Role, User
+from api.db.models import Permission, Role, RolePermission, User
+from api.db.statements import StatementCache
+from api.dto import RoleSnapshot, UserCredentials, UserSnapshot
+from api.repositories.roles import RoleRegistry, get_role_registry
+from api.repositories.user_cache import UserCache, get_user_cache
+from api.utils import uuid7
+
+
+DEFAULT_ROLE = "user"
+IMPORT_COLUMNS = ("id", "username", "password", "bonus_account", "role_id")
+import_table = table("user_import", *(column(name) for name in IMPORT_COLUMNS))
+CREATE_IMPORT_TABLE = text(
+    'CREATE TEMP TABLE IF NOT EXISTS user_import (LIKE "user" INCLUDING DEFAULTS) ON COMMIT DROP'
+)
+
+
+def build_find(fields: tuple[tuple[str, bool], ...]) -> Select:
+    query = select(User).limit(1)
+    for field, is_null in fields:
+        user_column = getattr(User, field)
+        query = query.where(user_column.is_(None) if is_null else user_column == bindparam(field))
+    return query
+
+
+def build_get_credentials() -> Select:
+    return select(User.id, User.password, User.role_id).where(User.username == bindparam("username")).limit(1)
+
+
+def build_get_snapshot() -> Select:
+    return select(User.id, User.username, User.bonus_account, User.role_id).where(User.id == bindparam("user_id"))
+
+
+def build_add_user() -> Insert:
+    return (
+        insert(User)
+        .values(
+            id=bindparam("id"),
+            username=bindparam("username"),
+            password=bindparam("password"),
+            role_id=bindparam("role_id"),
+        )
+        .on_conflict_do_nothing(index_elements=[User.username])
+        .returning(User.id)
+    )
+
+
+def build_load_roles() -> Select:
+    return (
+        select(Role.id, Role.code, Role.name, Permission.bit)
+        .outerjoin(RolePermission, RolePermission.role_id == Role.id)
+        .outerjoin(Permission, Permission.id == RolePermission.permission_id)
+    )
+
+
+def build_copy_users() -> Insert:
+    return (
+        insert(User)
+        .from_select(IMPORT_COLUMNS, select(import_table))
+        .on_conflict_do_nothing(index_elements=[User.username])
+        .returning(User.username)
+    )
+
+
+def build_stream_users(order_by: str, resume: bool, by_role: bool, min_bonus: bool, max_bonus: bool) -> Select:
+    columns = (User.username, User.id) if order_by == "username" else (User.id,)
+    query = (
+        select(User.id, User.username, User.bonus_account, User.role_id).order_by(*columns).limit(bindparam("limit"))
+    )
+    if resume:
+        key = (bindparam(f"after_{i}", type_=key_column.type) for i, key_column in enumerate(columns))
+        query = query.where(tuple_(*columns) > tuple_(*key))
+    if by_role:
+        query = query.join(Role, User.role_id == Role.id).where(Role.code == bindparam("role_code"))
+    if min_bonus:
+        query = query.where(User.bonus_account >= bindparam("min_bonus"))
+    if max_bonus:
+        query = query.where(User.bonus_account <= bindparam("max_bonus"))
+    return query
 
 
 class UsersRepository:
-    def __init__(self, session: AsyncSession):
+    """
+    Statements are built once per process and per shape, see ``StatementCache``.
+    """
+
+    statements = StatementCache("users")
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        user_cache: UserCache | None = None,
+        role_registry: RoleRegistry | None = None,
+    ):
         self._session = session
+        self._user_cache = user_cache
+        self._role_registry = role_registry if role_registry is not None else get_role_registry()
 
     async def get_by_id(self, user_id: UUID) -> User:
-        query = select(User).where(User.id == user_id)
-        user = await self._session.scalar(query)
+        query = self.statements.get("get_by_id", lambda: select(User).where(User.id == bindparam("user_id")))
+        user = await self._session.scalar(query, {"user_id": user_id})
         return user
 
-    async def find(self, **kwargs) -> User:
-        query = select(User)
-        for field, value in kwargs.items():
-            query = query.where(getattr(User, field) == value)
+    async def get_credentials(self, username: str) -> UserCredentials | None:
+        """
+        What login needs of a user, read as plain rows: no ORM instance, identity map or attribute tracking.
+        """
+        query = self.statements.get("get_credentials", build_get_credentials)
+        row = (await self._session.execute(query, {"username": username})).first()
+        if row is None:
+            return None
+        user_id, password, role_id = row
+        return UserCredentials(id=user_id, username=username, password=password, role_id=role_id)
+
+    async def get_snapshot(self, user_id: UUID) -> UserSnapshot | None:
+        if self._user_cache is None:
+            return await self._load_snapshot(user_id)
+
+        snapshot = await self._user_cache.get(user_id)
+        if snapshot is not None:
+            return snapshot
+
+        generation = self._user_cache.generation
+        snapshot = await self._load_snapshot(user_id)
+        if snapshot is None:
+            return None
 
-        users = await self._session.scalars(query)
+        await self._user_cache.set(snapshot, generation=generation)
+        return snapshot
+
+    async def _load_snapshot(self, user_id: UUID) -> UserSnapshot | None:
+        query = self.statements.get("get_snapshot", build_get_snapshot)
+        row = (await self._session.execute(query, {"user_id": user_id})).first()
+        if row is None:
+            return None
+        user_id, username, bonus_account, role_id = row
+        return UserSnapshot(id=user_id, username=username, bonus_account=bonus_account, role_id=role_id)
+
+    async def find(self, **kwargs) -> User:
+        shape = tuple(sorted((field, value is None) for field, value in kwargs.items()))
+        query = self.statements.get(("find", shape), lambda: build_find(shape))
+        params = {field: value for field, value in kwargs.items() if value is not None}
+        users = await self._session.scalars(query, params)
         return users.first()
 
-    async def add_user(self, email: str, password: str) -> tuple[bool, str]:
-        try:
-            query = select(Role).where(code="user")
-            role = await self._session.scalars(query)
-            role = role.first()
+    async def add_user(self, username: str, password: str) -> tuple[bool, str]:
+        """
+        Insert a user with the default role in one round trip, a taken username is reported, not raised.
+        """
+        role = await self._role_registry.get_by_code(DEFAULT_ROLE, self._load_roles)
+        if role is None:
+            raise LookupError(f"Role {DEFAULT_ROLE!r} does not exist")
 
-            query = insert(User).values(email=email, password=password, role_id=role.id)
-            await self._session.execute(query)
-            await self._session.commit()
-        except exc.IntegrityError:
-            return False, "User with that email already exists."
+        query = self.statements.get("add_user", build_add_user)
+        user_id = await self._session.scalar(
+            query, {"id": uuid7(), "username": username, "password": password, "role_id": role.id}
+        )
+        await self._session.commit()
+        if user_id is None:
+            return False, "User with that username already exists."
         return True, "Successful registration!"
 
     async def edit_user(self, user_id: UUID, fields: dict) -> tuple[bool, str]:
         try:
-
-            query = update(User).where(id=user_id).values(**fields)
+            query = update(User).where(User.id == user_id).values(**fields)
             await self._session.execute(query)
             await self._session.commit()
         except exc.IntegrityError:
             return False, "User with that email already exists."
+
+        if self._user_cache is not None:
+            await self._user_cache.invalidate(user_id)
         return True, "Successful registration!"
 
+    async def get_role(self, role_id: UUID) -> RoleSnapshot | None:
+        return await self._role_registry.get_by_id(role_id, self._load_roles)
+
+    async def get_role_ids(self) -> dict[str, UUID]:
+        return await self._role_registry.get_ids(self._load_roles)
+
+    async def get_permission_mask(self, codes: tp.Iterable[str]) -> int | None:
+        return await self._role_registry.get_mask(codes, self._load_roles)
+
+    async def get_permissions_version(self) -> str:
+        return await self._role_registry.get_version(self._load_roles)
+
+    async def _load_roles(self) -> tuple[list[RoleSnapshot], dict[str, int]]:
+        """
+        Roles with their permissions folded into bitsets, and the permission catalogue.
+        """
+        rows = await self._session.execute(self.statements.get("load_roles", build_load_roles))
+        names: dict[UUID, tuple[str, str | None]] = {}
+        bitsets: dict[UUID, int] = {}
+        for role_id, code, name, bit in rows:
+            names[role_id] = code, name
+            bitsets[role_id] = bitsets.get(role_id, 0) | (0 if bit is None else 1 << bit)
+        roles = [
+            RoleSnapshot(id=role_id, code=code, name=name, permissions=bitsets[role_id])
+            for role_id, (code, name) in names.items()
+        ]
+
+        permissions = await self._session.execute(
+            self.statements.get("load_permissions", lambda: select(Permission.code, Permission.bit))
+        )
+        return roles, dict(permissions.all())
+
+    async def copy_users(self, rows: tp.Sequence[tuple]) -> set[str]:
+        """
+        Load rows of IMPORT_COLUMNS through COPY into a staging table and move them into user,
+        skipping usernames that already exist. Returns usernames that were actually inserted.
+        """
+        await self._session.execute(CREATE_IMPORT_TABLE)
+        connection = await self._session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            "user_import", records=rows, columns=IMPORT_COLUMNS
+        )
+
+        inserted = await self._session.scalars(self.statements.get("copy_users", build_copy_users))
+        inserted = set(inserted)
+        await self._session.commit()
+        return inserted
+
+    async def stream_users(
+        self,
+        *,
+        order_by: str = "username",
+        after: tuple | None = None,
+        role_code: str | None = None,
+        min_bonus: int | None = None,
+        max_bonus: int | None = None,
+        limit: int,
+        batch_size: int,
+    ) -> tp.AsyncIterator[tp.Sequence[Row]]:
+        """
+        Stream (id, username, bonus_account, role_id) rows through a server-side cursor in batches.
+        Rows are ordered by username or id and resume strictly after the ``after`` key of the same order.
+        """
+        filters = {"role_code": role_code, "min_bonus": min_bonus, "max_bonus": max_bonus}
+        flags = (after is not None, *(value is not None for value in filters.values()))
+        query = self.statements.get(("stream_users", order_by, *flags), lambda: build_stream_users(order_by, *flags))
+
+        params = {"limit": limit}
+        params.update((name, value) for name, value in filters.items() if value is not None)
+        if after is not None:
+            params.update((f"after_{i}", value) for i, value in enumerate(after))
+
+        result = await self._session.stream(query, params, execution_options={"yield_per": batch_size})
+        async for partition in result.partitions():
+            yield partition
+
 
-async def get_users_repository(session: AsyncSession = Depends(get_session)) -> UsersRepository:
-    return UsersRepository(session=session)
+async def get_users_repository(
+    session: AsyncSession = Depends(get_session),
+    user_cache: UserCache | None = Depends(get_user_cache),
+    role_registry: RoleRegistry = Depends(get_role_registry),
+) -> UsersRepository:
+    return UsersRepository(session=session, user_cache=user_cache, role_registry=role_registry)
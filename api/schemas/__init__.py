@@ -1,6 +1,18 @@
-from api.schemas.health_check import PingResponse
+from api.schemas.health_check import (
+    BlocklistFilterResponse,
+    DatabasePoolResponse,
+    KeyValueStorageResponse,
+    PingResponse,
+    StatementCacheResponse,
+    UserCacheResponse,
+)
 
 
 __all__ = [
+    "BlocklistFilterResponse",
+    "DatabasePoolResponse",
+    "KeyValueStorageResponse",
     "PingResponse",
+    "StatementCacheResponse",
+    "UserCacheResponse",
 ]
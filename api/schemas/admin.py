@@ -0,0 +1,24 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class UserImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class UserImportError(BaseModel):
+    line: int
+    username: str | None
+    error: str
+
+
+class UserImportResponse(BaseModel):
+    inserted: int
+    errors: list[UserImportError]
+
+
+class UserListOrder(str, Enum):
+    USERNAME = "username"
+    ID = "id"
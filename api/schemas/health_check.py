@@ -3,3 +3,49 @@ from pydantic import BaseModel, Field
 
 class PingResponse(BaseModel):
     message: str = Field(default="Pong!")
+
+
+class DatabasePoolResponse(BaseModel):
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class BlocklistFilterResponse(BaseModel):
+    ready: bool
+    entries: int
+    memory_bytes: int
+    estimated_false_positive_rate: float
+    lookups: int
+    filter_hits: int
+    confirmed_hits: int
+
+
+class UserCacheResponse(BaseModel):
+    entries: int
+    local_hits: int
+    storage_hits: int
+    misses: int
+
+
+class KeyValueStorageResponse(BaseModel):
+    entries: int
+    local_hits: int
+    negative_hits: int
+    remote_hits: int
+    remote_misses: int
+    local_hit_rate: float
+    remote_hit_rate: float
+
+
+class StatementCacheResponse(BaseModel):
+    shapes: int
+    hits: int
+    misses: int
+    hit_rate: float
+    compiled_hits: int
+    compiled_misses: int
+    compiled_hit_rate: float
@@ -0,0 +1,222 @@
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+from importlib.util import find_spec
+from logging import getLogger
+from time import monotonic
+
+from fastapi import FastAPI
+from uvicorn import Config, Server
+
+from api.config import DefaultSettings
+from api.logs import create_sink
+from api.utils import get_hostname
+from api.utils.memory import read_memory
+
+
+logger = getLogger(__name__)
+
+# the master blocks these and waits for them synchronously, workers get them unblocked
+MASTER_SIGNALS = frozenset({signal.SIGCHLD, signal.SIGINT, signal.SIGTERM})
+
+# exit code of a worker whose application failed to start, restarting it would not help
+STARTUP_FAILURE = 3
+
+
+def get_loop() -> str:
+    return "uvloop" if find_spec("uvloop") is not None else "asyncio"
+
+
+def get_http() -> str:
+    return "httptools" if find_spec("httptools") is not None else "h11"
+
+
+def create_socket(host: str, port: int, *, reuse_port: bool, backlog: int) -> socket.socket:
+    host = host.strip("[]")
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Arbiter:
+    """
+    Pre-forking master of the production server.
+
+    The application is imported and warmed once in the master, then the heap is moved out of the collector's
+    reach with ``gc.freeze`` so that collections in the workers do not touch, and thereby copy, the pages
+    they share with the master. Every worker runs its own uvicorn server and its own application lifespan.
+
+    Workers either accept on one listening socket inherited from the master or, with SO_REUSEPORT,
+    bind a socket each and let the kernel spread connections between them; the latter balances better
+    but connections still queued on a worker that exits are reset.
+
+    SIGTERM or SIGINT drain the workers: they stop accepting, finish in-flight requests and shut their
+    resources down, and whatever is left after ``SERVER_GRACEFUL_TIMEOUT`` seconds is killed.
+    A worker that dies on its own is replaced, unless its application failed to start.
+    """
+
+    def __init__(self, app: FastAPI, settings: DefaultSettings):
+        self.app = app
+        self.settings = settings
+        self.workers: dict[int, int] = {}
+        self._socket: socket.socket | None = None
+        self._deadline: float | None = None
+        self._reported_at = 0.0
+        self._exit_code = 0
+
+    def run(self) -> int:
+        self._configure_logging()
+        self.warm_up()
+        if not self.settings.SERVER_REUSE_PORT:
+            self._socket = self._bind()
+
+        signal.pthread_sigmask(signal.SIG_BLOCK, MASTER_SIGNALS)
+        gc.collect()
+        gc.freeze()
+        logger.info(
+            "Starting %d workers on %s:%d with %s and %s",
+            self.settings.SERVER_WORKERS,
+            get_hostname(self.settings.APP_HOST),
+            self.settings.APP_PORT,
+            get_loop(),
+            get_http(),
+        )
+        for index in range(self.settings.SERVER_WORKERS):
+            self.spawn(index)
+
+        self._reported_at = monotonic()
+        while self.workers:
+            received = signal.sigtimedwait(MASTER_SIGNALS, 1.0)
+            if received is not None and received.si_signo != signal.SIGCHLD:
+                self.stop()
+            self.reap()
+            if self._deadline is not None and monotonic() >= self._deadline:
+                self.kill()
+            elif (
+                self._deadline is None
+                and monotonic() - self._reported_at >= self.settings.SERVER_MEMORY_REPORT_INTERVAL
+            ):
+                self.report_memory()
+
+        logger.info("Server stopped")
+        return self._exit_code
+
+    def warm_up(self) -> None:
+        """
+        Build what would otherwise be built lazily in every worker.
+        """
+        self.app.openapi()
+
+    def spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = index
+            return
+
+        code = 1
+        try:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, MASTER_SIGNALS)
+            code = self.serve()
+        except SystemExit as exc:
+            code = exc.code if isinstance(exc.code, int) else 1
+        except BaseException:  # pylint: disable=broad-except
+            logger.exception("Worker %d crashed", index)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)  # pylint: disable=protected-access
+
+    def serve(self) -> int:
+        """
+        Run one worker until it is told to stop, in the forked process.
+        """
+        sock = self._socket if self._socket is not None else self._bind()
+        config = Config(
+            self.app,
+            loop=get_loop(),
+            http=get_http(),
+            lifespan="on",
+            log_config=None,
+            backlog=self.settings.SERVER_BACKLOG,
+            timeout_keep_alive=self.settings.SERVER_KEEP_ALIVE,
+        )
+        server = Server(config)
+        server.run(sockets=[sock])
+        return 0 if server.started else STARTUP_FAILURE
+
+    def reap(self) -> None:
+        while self.workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if not pid:
+                return
+
+            index = self.workers.pop(pid, None)
+            if index is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if self._deadline is not None:
+                logger.info("Worker %d (pid %d) exited with %d", index, pid, code)
+            elif code == STARTUP_FAILURE:
+                logger.error("Worker %d (pid %d) failed to start the application, stopping", index, pid)
+                self._exit_code = STARTUP_FAILURE
+                self.stop()
+            else:
+                logger.warning("Worker %d (pid %d) exited with %d, restarting", index, pid, code)
+                self.spawn(index)
+
+    def stop(self) -> None:
+        if self._deadline is not None:
+            return
+        logger.info("Stopping workers, waiting up to %.0f seconds", self.settings.SERVER_GRACEFUL_TIMEOUT)
+        self._deadline = monotonic() + self.settings.SERVER_GRACEFUL_TIMEOUT
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        for pid in self.workers:
+            os.kill(pid, signal.SIGTERM)
+
+    def kill(self) -> None:
+        for pid, index in self.workers.items():
+            logger.warning("Worker %d (pid %d) did not stop in time, killing", index, pid)
+            os.kill(pid, signal.SIGKILL)
+        self._deadline = float("inf")
+
+    def report_memory(self) -> None:
+        self._reported_at = monotonic()
+        for pid, index in [(os.getpid(), None), *self.workers.items()]:
+            usage = read_memory(pid)
+            if not usage:
+                continue
+            logger.info(
+                "%s (pid %d) memory: rss %.1f MiB, pss %.1f MiB, private %.1f MiB",
+                "Master" if index is None else f"Worker {index}",
+                pid,
+                usage.get("rss", 0) / 2**20,
+                usage.get("pss", 0) / 2**20,
+                usage.get("private", 0) / 2**20,
+                extra={"worker": index, "pid": pid, "memory": usage},
+            )
+
+    def _bind(self) -> socket.socket:
+        return create_socket(
+            get_hostname(self.settings.APP_HOST),
+            self.settings.APP_PORT,
+            reuse_port=self.settings.SERVER_REUSE_PORT,
+            backlog=self.settings.SERVER_BACKLOG,
+        )
+
+    def _configure_logging(self) -> None:
+        """
+        Plain synchronous logging for the master, workers replace it with the queued pipeline on startup.
+        """
+        root = logging.getLogger()
+        root.handlers = [create_sink(self.settings.LOG_FORMAT)]
+        root.setLevel(self.settings.LOG_LEVEL)
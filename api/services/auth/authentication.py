@@ -3,13 +3,12 @@ import uuid
 from fastapi import Depends
 
 from api import dto
-from api.db.models import User
 from api.repositories.users import UsersRepository, get_users_repository
-from api.services.auth.authorization import AuthorizationService, get_authorization_service
+from api.services.auth.authorization import AuthorizationService, get_authorization_service, get_permission_claims
 from api.services.auth.base import BaseAuthenticationService, BaseAuthorizationService
 from api.services.auth.exc import BadCredentialsError
 from api.services.jwt.service import JwtService, get_jwt_service
-from api.utils import verify_password
+from api.services.passwords.service import PasswordHasher, get_password_hasher
 
 
 # pylint: disable=arguments-differ
@@ -20,10 +19,12 @@ class JwtAuthenticationService(BaseAuthenticationService):
         users_repository: UsersRepository,
         jwt: JwtService,
         authorization: BaseAuthorizationService,
+        hasher: PasswordHasher,
     ):
         self._users_repository = users_repository
         self._jwt = jwt
         self._authorization = authorization
+        self._hasher = hasher
 
         self._context = dto.AuthContext()
 
@@ -49,29 +50,27 @@ class JwtAuthenticationService(BaseAuthenticationService):
         )
         self._context.payload = token_payload
 
-    async def verify_credentials(self, username: str, password: str) -> User:
-        user = await self._users_repository.find(username=username)
+    async def verify_credentials(self, username: str, password: str) -> dto.UserCredentials:
+        user = await self._users_repository.get_credentials(username)
         if not user:
             raise BadCredentialsError("User with specified username was not found")
 
         hashed_password = user.password
-        password_ok = verify_password(password, hashed_password)
+        password_ok = await self._hasher.verify(password, hashed_password)
         if not password_ok:
             raise BadCredentialsError("Wrong password")
 
         return user
 
-    async def get_current_user(self) -> User | None:
-        user = self._context.user
-        if user is not None:
-            return user
-
-        if self._context.payload is None:
+    async def get_current_user(self) -> dto.UserSnapshot | None:
+        if self._context.user is not None:
+            user_id = self._context.user.id
+        elif self._context.payload is not None:
+            user_id = self._context.payload.get("sub")
+        else:
             return None
 
-        user_id = self._context.payload.get("sub")
-        user = await self._users_repository.get_by_id(user_id)
-        return user
+        return await self._users_repository.get_snapshot(user_id)
 
     def get_auth_context(self) -> dto.AuthContext:
         return self._context
@@ -90,20 +89,21 @@ class JwtAuthenticationService(BaseAuthenticationService):
         access_payload = self._context.payload
         await self._jwt.revoke_all_tokens_except_current(access_payload)
 
-    async def create_access_token(self, user_id: uuid.UUID):
-        perms = await self._authorization.get_user_permissions(user_id)
-        token = await self._jwt.create_access_token(
-            str(user_id),
-            perms_in_workspaces={str(perm.workspace_id): perm.permissions for perm in perms},
-        )
-        return token
+    async def create_access_token(self, user_id: uuid.UUID | str):
+        user = self._context.user
+        if user is not None and str(user.id) == str(user_id):
+            permissions = await self._authorization.get_role_permissions(user.role_id)
+        else:
+            permissions = await self._authorization.get_user_permissions(user_id)
+        return await self._jwt.create_access_token(str(user_id), **get_permission_claims(permissions))
 
 
 async def get_authentication_service(
     users_repository: UsersRepository = Depends(get_users_repository),
     authorization_service: AuthorizationService = Depends(get_authorization_service),
     jwt_service: JwtService = Depends(get_jwt_service),
+    hasher: PasswordHasher = Depends(get_password_hasher),
 ) -> JwtAuthenticationService:
     return JwtAuthenticationService(
-        users_repository=users_repository, jwt=jwt_service, authorization=authorization_service
+        users_repository=users_repository, jwt=jwt_service, authorization=authorization_service, hasher=hasher
     )
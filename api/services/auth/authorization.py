@@ -1,13 +1,76 @@
+import typing as tp
+from hashlib import blake2b
+from uuid import UUID
+
 from fastapi import Depends
 
+from api import dto
 from api.repositories.users import UsersRepository, get_users_repository
 from api.services.auth.base import BaseAuthorizationService
 
 
+# access token claims: the permission bitset in hex and a digest of the role table version
+# and the role it was compiled for
+PERMISSIONS_CLAIM = "prm"
+PERMISSIONS_VERSION_CLAIM = "prv"
+
+
+def get_token_version(version: str, role_id: UUID | None) -> str:
+    return blake2b(f"{version}:{role_id}".encode(), digest_size=4).hexdigest()
+
+
+def get_permission_claims(permissions: dto.PermissionSet) -> dict[str, str]:
+    return {
+        PERMISSIONS_CLAIM: f"{permissions.bits:x}",
+        PERMISSIONS_VERSION_CLAIM: get_token_version(permissions.version, permissions.role_id),
+    }
+
+
 class AuthorizationService(BaseAuthorizationService):
+    """
+    Permission checks against the role table compiled in the worker, see ``RoleRegistry``.
+
+    Access tokens carry the bitset of their user's role. While the role table has not changed since
+    the token was issued and the user still has the same role, a check reads nothing but the user
+    snapshot the request already resolved; otherwise the permissions come from the user's current role.
+    """
+
     def __init__(self, *, users_repository: UsersRepository):
         self._users_repository = users_repository
 
+    async def has_role(self, user: dto.UserSnapshot, code: str) -> bool:
+        if user.role_id is None:
+            return False
+        role = await self._users_repository.get_role(user.role_id)
+        return role is not None and role.code == code
+
+    async def get_role_permissions(self, role_id: UUID | None) -> dto.PermissionSet:
+        version = await self._users_repository.get_permissions_version()
+        role = await self._users_repository.get_role(role_id) if role_id is not None else None
+        return dto.PermissionSet(bits=role.permissions if role is not None else 0, version=version, role_id=role_id)
+
+    async def get_user_permissions(self, user_id: UUID | str) -> dto.PermissionSet:
+        user = await self._users_repository.get_snapshot(user_id)
+        return await self.get_role_permissions(user.role_id if user is not None else None)
+
+    async def has_permissions(
+        self,
+        user: dto.UserSnapshot,
+        codes: tp.Iterable[str],
+        token_payload: dict[str, tp.Any] | None = None,
+    ) -> bool:
+        mask = await self._users_repository.get_permission_mask(codes)
+        if mask is None:
+            return False
+
+        version = await self._users_repository.get_permissions_version()
+        token_version = token_payload.get(PERMISSIONS_VERSION_CLAIM) if token_payload is not None else None
+        if token_version == get_token_version(version, user.role_id):
+            bits = int(token_payload.get(PERMISSIONS_CLAIM, "0"), 16)
+        else:
+            bits = (await self.get_role_permissions(user.role_id)).bits
+        return bits & mask == mask
+
 
 async def get_authorization_service(
     users_repository: UsersRepository = Depends(get_users_repository),
@@ -10,4 +10,11 @@ class BaseAuthenticationService:
 
 
 class BaseAuthorizationService:
-    pass
+    async def get_role_permissions(self, role_id):
+        pass
+
+    async def get_user_permissions(self, user_id):
+        pass
+
+    async def has_permissions(self, user, codes, token_payload=None):
+        pass
@@ -0,0 +1,56 @@
+import typing as tp
+
+from fastapi import Depends, HTTPException
+from starlette import status
+
+from api import dto
+from api.config import get_settings
+from api.services.auth.authentication import JwtAuthenticationService, get_authentication_service
+from api.services.auth.authorization import AuthorizationService, get_authorization_service
+from api.services.jwt.exc import JwtException
+
+
+async def get_current_user(
+    token: str = Depends(get_settings().OAUTH2_SCHEME),
+    auth_service: JwtAuthenticationService = Depends(get_authentication_service),
+) -> dto.UserSnapshot:
+    try:
+        await auth_service.verify_authentication(token)
+    except JwtException as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from e
+
+    user = await auth_service.get_current_user()
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return user
+
+
+async def get_current_admin(
+    user: dto.UserSnapshot = Depends(get_current_user),
+    authorization_service: AuthorizationService = Depends(get_authorization_service),
+) -> dto.UserSnapshot:
+    if not await authorization_service.has_role(user, "admin"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role is required")
+    return user
+
+
+def require_permissions(*codes: str) -> tp.Callable[..., tp.Awaitable[dto.UserSnapshot]]:
+    """
+    Dependency granting access to users whose role has all of the given permissions.
+    """
+
+    async def dependency(
+        user: dto.UserSnapshot = Depends(get_current_user),
+        auth_service: JwtAuthenticationService = Depends(get_authentication_service),
+        authorization_service: AuthorizationService = Depends(get_authorization_service),
+    ) -> dto.UserSnapshot:
+        token_payload = auth_service.get_auth_context().payload
+        if not await authorization_service.has_permissions(user, codes, token_payload):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+        return user
+
+    return dependency
@@ -0,0 +1,180 @@
+import typing as tp
+from collections import OrderedDict
+from hashlib import blake2b
+from time import time
+
+import orjson
+from redis.asyncio import Redis
+
+from api.config import get_settings
+from api.db.connection import RedisManager
+from api.db.connection.redis import Listener, listen_channel
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified access token payloads keyed by token digest.
+
+    Entries live until the token expires or ``ttl`` seconds pass, whichever comes first.
+    Revocations evict matching entries locally and are published to ``channel``,
+    so the caches of all other workers drop them as well. While the subscription is down
+    nothing is cached, since revocations published meanwhile would be missed.
+    """
+
+    def __init__(self, *, max_size: int, ttl: int, channel: str, redis: Redis | None = None):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._channel = channel
+        self._redis = redis
+
+        self._entries: OrderedDict[bytes, tuple[dict[str, tp.Any], float]] = OrderedDict()
+        self._by_sub: dict[str, set[bytes]] = {}
+        self._generation = 0
+        self.ready = redis is None
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self) -> int:
+        """
+        Changes on every eviction caused by revocation. A payload verified against storage
+        may only be cached if the generation did not change while it was being verified.
+        """
+        return self._generation
+
+    @property
+    def distributed(self) -> bool:
+        """
+        Whether invalidations are shared with other workers through redis.
+        """
+        return self._redis is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> dict[str, tp.Any] | None:
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        payload, expires_at = entry
+        if expires_at <= time():
+            self._remove(digest)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return payload
+
+    def put(self, token: str, payload: dict[str, tp.Any], *, generation: int) -> None:
+        if not self.ready or generation != self._generation:
+            return
+
+        digest = self._digest(token)
+        expires_at = min(time() + self._ttl, payload.get("exp", 0))
+        if digest in self._entries:
+            self._remove(digest)
+        self._entries[digest] = (payload, expires_at)
+        self._by_sub.setdefault(payload.get("sub"), set()).add(digest)
+
+        while len(self._entries) > self._max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def evict(self, sub: str, *, jti: str | None = None, exclude: str | None = None) -> None:
+        """
+        Evict cached tokens of sub: only the one with jti if it is set, otherwise all except exclude.
+        """
+        self._generation += 1
+        for digest in list(self._by_sub.get(sub, ())):
+            token_jti = self._entries[digest][0].get("jti")
+            if jti is not None and token_jti != jti:
+                continue
+            if exclude is not None and token_jti == exclude:
+                continue
+            self._remove(digest)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._by_sub.clear()
+
+    async def revoke(self, sub: str, *, jti: str | None = None, exclude: str | None = None) -> None:
+        self.evict(sub, jti=jti, exclude=exclude)
+        if self._redis is not None:
+            message = {"sub": sub, "jti": jti, "exclude": exclude}
+            await self._redis.publish(self._channel, orjson.dumps(message))  # pylint: disable=no-member
+
+    async def listen(self) -> None:
+        """
+        Apply revocations published by other workers until cancelled.
+        The whole cache is dropped whenever the subscription is (re)established.
+        """
+
+        await listen_channel(
+            self._redis,
+            self._channel,
+            on_message=lambda data: self.evict(**orjson.loads(data)),  # pylint: disable=no-member
+            on_subscribe=self._mark_ready,
+            on_disconnect=self._mark_not_ready,
+        )
+
+    async def _mark_ready(self) -> None:
+        self.clear()
+        self.ready = True
+
+    def _mark_not_ready(self) -> None:
+        self.ready = False
+        self.clear()
+
+    def _remove(self, digest: bytes) -> None:
+        payload, _ = self._entries.pop(digest)
+        digests = self._by_sub.get(payload.get("sub"))
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._by_sub[payload.get("sub")]
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return blake2b(token.encode(), digest_size=16).digest()
+
+
+class TokenCacheManager:
+    """
+    A class that owns the per-worker verified token cache and its revocation subscription.
+    """
+
+    def __new__(cls):
+        if not hasattr(cls, "instance"):
+            cls.instance = super(TokenCacheManager, cls).__new__(cls)
+            cls.instance.cache = None
+            cls.instance._listener = Listener()
+        return cls.instance  # noqa
+
+    def get_cache(self) -> VerifiedTokenCache | None:
+        if self.cache is None and get_settings().TOKEN_CACHE_ENABLED:
+            self.refresh()
+        return self.cache
+
+    def refresh(self) -> None:
+        settings = get_settings()
+        redis = RedisManager().get_redis() if settings.redis_required else None
+        self.cache = VerifiedTokenCache(redis=redis, **settings.token_cache_settings)
+
+    async def start(self) -> None:
+        cache = self.get_cache()
+        if cache is not None and cache.distributed:
+            self._listener.start(cache.listen)
+
+    async def stop(self) -> None:
+        await self._listener.stop()
+        self.cache = None
+
+
+async def get_token_cache() -> VerifiedTokenCache | None:
+    return TokenCacheManager().get_cache()
@@ -1,5 +1,10 @@
+import hmac
 import typing as tp
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import lru_cache
+from hashlib import sha256
 from json import JSONEncoder
+from time import time
 
 import jwt
 import orjson
@@ -12,13 +17,101 @@ class OrjsonEncoder(JSONEncoder):
         return orjson.dumps(o).decode()  # pylint: disable=no-member
 
 
+def b64encode(data: bytes) -> bytes:
+    return urlsafe_b64encode(data).rstrip(b"=")
+
+
+def b64decode(data: bytes) -> bytes:
+    return urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class HS256Codec:
+    """
+    HS256 JWT codec for our own tokens, byte-for-byte compatible with PyJWT using OrjsonEncoder.
+
+    The header segment and the keyed HMAC state are computed once per key, payloads go straight
+    through orjson and signatures are compared in constant time. Tokens with any other header
+    are handed over to PyJWT, so foreign or malformed tokens get its full validation.
+    """
+
+    HEADER = b64encode(orjson.dumps({"typ": "JWT", "alg": "HS256"}))  # pylint: disable=no-member
+
+    def __init__(self, key: str | bytes):
+        self._key = key
+        self._hmac = hmac.new(key.encode() if isinstance(key, str) else key, digestmod=sha256)
+
+    def encode(self, payload: dict[str, tp.Any]) -> str:
+        signing_input = self.HEADER + b"." + b64encode(orjson.dumps(payload))  # pylint: disable=no-member
+        return (signing_input + b"." + b64encode(self._sign(signing_input))).decode()
+
+    def decode(self, token: str) -> dict[str, tp.Any]:
+        raw = token.encode()
+        signing_input, _, signature = raw.rpartition(b".")
+        header, _, payload = signing_input.partition(b".")
+        if header != self.HEADER or not payload:
+            return self._decode_with_pyjwt(token)
+
+        try:
+            signature = b64decode(signature)
+        except ValueError as e:
+            raise TokenDecodeError("Invalid crypto padding") from e
+        if not hmac.compare_digest(signature, self._sign(signing_input)):
+            raise TokenDecodeError("Signature verification failed")
+
+        try:
+            payload = orjson.loads(b64decode(payload))  # pylint: disable=no-member
+        except ValueError as e:
+            raise TokenDecodeError("Invalid payload string") from e
+        if not isinstance(payload, dict):
+            raise TokenDecodeError("Invalid payload string: must be a json object")
+
+        self._validate_claims(payload)
+        return payload
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._hmac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    @staticmethod
+    def _validate_claims(payload: dict[str, tp.Any]) -> None:
+        now = time()
+        try:
+            exp = int(payload["exp"]) if "exp" in payload else None
+            iat = int(payload["iat"]) if "iat" in payload else None
+            nbf = int(payload["nbf"]) if "nbf" in payload else None
+        except (ValueError, TypeError, OverflowError) as e:
+            raise TokenDecodeError("Time claims (exp, iat, nbf) must be integers") from e
+
+        if exp is not None and exp <= now:
+            raise TokenDecodeError("Signature has expired")
+        if (iat is not None and iat > now) or (nbf is not None and nbf > now):
+            raise TokenDecodeError("The token is not yet valid")
+        if "aud" in payload:
+            raise TokenDecodeError("Invalid audience")
+
+    def _decode_with_pyjwt(self, token: str) -> dict[str, tp.Any]:
+        try:
+            return jwt.decode(token, self._key, algorithms=["HS256"])
+        except jwt.exceptions.PyJWTError as e:
+            raise TokenDecodeError(str(e)) from e
+
+
+@lru_cache(maxsize=8)
+def get_hs256_codec(key: str | bytes) -> HS256Codec:
+    return HS256Codec(key)
+
+
 class JwtTokenEncoderMixin:
     def encode_token(self, payload: dict[str, tp.Any], key: str | bytes) -> str:
-        return jwt.encode(payload, key, json_encoder=OrjsonEncoder)
+        return get_hs256_codec(key).encode(payload)
 
 
 class JwtTokenDecoderMixin:
     def decode_token(self, token: str, key: str | bytes, algorithms: list[str] | None = None) -> dict[str, tp.Any]:
+        if algorithms == ["HS256"]:
+            return get_hs256_codec(key).decode(token)
+
         try:
             return jwt.decode(token, key, algorithms=algorithms)
         except jwt.exceptions.PyJWTError as e:
@@ -4,6 +4,7 @@ from datetime import timedelta
 
 from fastapi import Depends
 
+from api.config import get_settings
 from api.dto import TokenPair
 from api.repositories.tokens import (
     BlocklistRepository,
@@ -11,6 +12,7 @@ from api.repositories.tokens import (
     get_blocklist_repository,
     get_refresh_tokens_repository,
 )
+from api.services.jwt.cache import VerifiedTokenCache, get_token_cache
 from api.services.jwt.coders import JwtTokenDecoderMixin, JwtTokenEncoderMixin
 from api.services.jwt.utils import to_seconds, utcnow
 from api.services.jwt.verifier import JwtTokenVerifierMixin
@@ -26,12 +28,14 @@ class JwtService(
         *,
         refresh_tokens_repository: RefreshTokensRepository,
         blocklist_repository: BlocklistRepository,
+        token_cache: VerifiedTokenCache | None = None,
         secret_key: str = "",
         access_ex_time: int | timedelta = timedelta(hours=1),
         refresh_ex_time: int | timedelta = timedelta(weeks=2),
     ):
         self._refresh_tokens_repository = refresh_tokens_repository
         self._blocklist_repository = blocklist_repository
+        self._token_cache = token_cache
         self._secret_key = secret_key
         self.access_ex_time = to_seconds(access_ex_time)
         self.refresh_ex_time = to_seconds(refresh_ex_time)
@@ -51,7 +55,7 @@ class JwtService(
     async def create_access_token(self, sub: str, **extra_payload) -> tuple[dict[str, tp.Any], str]:
         iat = utcnow()
         payload = {
-            "jti": uuid.uuid4(),
+            "jti": str(uuid.uuid4()),
             "type": "access",
             "sub": sub,
             "iat": iat,
@@ -64,7 +68,7 @@ class JwtService(
     async def create_refresh_token(self, sub: str, **extra_payload) -> tuple[dict[str, tp.Any], str]:
         iat = utcnow()
         payload = {
-            "jti": uuid.uuid4(),
+            "jti": str(uuid.uuid4()),
             "type": "refresh",
             "sub": sub,
             "iat": iat,
@@ -85,16 +89,28 @@ class JwtService(
         sub = access_payload.get("sub")
         await self._blocklist_repository.add_to_blocklist(access_payload)
         await self._refresh_tokens_repository.unset_refresh_token(sub)
+        if self._token_cache is not None:
+            await self._token_cache.revoke(sub, jti=access_payload.get("jti"))
 
     async def revoke_all_tokens_except_current(self, access_payload: dict[str, tp.Any]):
         await self._blocklist_repository.block_all_except_current(access_payload)
+        if self._token_cache is not None:
+            await self._token_cache.revoke(access_payload.get("sub"), exclude=access_payload.get("jti"))
 
     async def revoke_all_tokens(self, user_id: uuid.UUID):
         await self._blocklist_repository.block_all(str(user_id))
+        if self._token_cache is not None:
+            await self._token_cache.revoke(str(user_id))
 
 
 async def get_jwt_service(
     blocklist_repository: BlocklistRepository = Depends(get_blocklist_repository),
     refresh_tokens_repository: RefreshTokensRepository = Depends(get_refresh_tokens_repository),
+    token_cache: VerifiedTokenCache | None = Depends(get_token_cache),
 ) -> JwtService:
-    return JwtService(refresh_tokens_repository=refresh_tokens_repository, blocklist_repository=blocklist_repository)
+    return JwtService(
+        refresh_tokens_repository=refresh_tokens_repository,
+        blocklist_repository=blocklist_repository,
+        token_cache=token_cache,
+        secret_key=get_settings().JWT_SECRET_KEY,
+    )
@@ -1,23 +1,32 @@
 from typing import Any
 
+from api.services.jwt.cache import VerifiedTokenCache
 from api.services.jwt.exc import InvalidTokenTypeError, TokenRevokedError, WrongRefreshTokenError
 
 
 class JwtTokenVerifierMixin:
     _secret_key: str | bytes = None
+    _token_cache: VerifiedTokenCache | None = None
 
     async def verify_access_token(self, token: str) -> dict[str, Any]:
+        if self._token_cache is not None:
+            token_payload = self._token_cache.get(token)
+            if token_payload is not None:
+                return token_payload
+            generation = self._token_cache.generation
+
         token_payload = self.decode_token(token, self._secret_key, algorithms=["HS256"])
 
         token_type = token_payload.get("type")
         if token_type != "access":
             raise InvalidTokenTypeError(token_type, expected_type="access")
 
-        if await self._blocklist_repository.in_blocklist(
-            token_payload
-        ) or await self._blocklist_repository.blocked_by_allblock(token_payload):
+        if await self._blocklist_repository.is_revoked(token_payload):
             raise TokenRevokedError
 
+        if self._token_cache is not None:
+            self._token_cache.put(token, token_payload, generation=generation)
+
         return token_payload
 
     async def verify_refresh_token(self, token: str) -> dict[str, Any]:
@@ -30,11 +39,11 @@ class JwtTokenVerifierMixin:
         jti = token_payload.get("jti")
         sub = token_payload.get("sub")
 
-        stored_refresh = await self._refresh_tokens_repository.get_refresh_token_from_storage(sub)
-        if not stored_refresh:
+        stored_jti = await self._refresh_tokens_repository.get_refresh_jti(sub)
+        if stored_jti is None:
             raise TokenRevokedError
 
-        if jti != stored_refresh.get("jti"):
+        if jti != stored_jti:
             raise WrongRefreshTokenError
 
         return token_payload
@@ -0,0 +1,14 @@
+class PasswordHasherException(Exception):
+    def __init__(self, *args, msg: str | None = None, **kwargs):
+        if msg is None:
+            msg = self.__class__.__doc__
+        super().__init__(msg, *args, **kwargs)
+
+
+class HashingQueueFullError(PasswordHasherException):
+    """Too many password hashing operations in progress, try again later"""
+
+
+class UnknownExecutorError(PasswordHasherException):
+    def __init__(self, executor: str):
+        super().__init__(msg=f"Unknown password hash executor {executor!r}, expected 'process' or 'thread'")
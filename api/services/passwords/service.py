@@ -0,0 +1,103 @@
+import asyncio
+import typing as tp
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+
+from api.config import get_settings
+from api.metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_QUEUE_WAIT
+from api.services.passwords.exc import HashingQueueFullError, UnknownExecutorError
+from api.utils import hash_password, verify_password
+
+
+class PasswordHasher:
+    """
+    Runs pbkdf2 hashing and verification in a bounded worker pool instead of the event loop.
+
+    At most ``workers + queue_size`` operations are admitted at once. Callers over that limit
+    wait up to ``queue_timeout`` seconds for a free slot and then get HashingQueueFullError,
+    so a login burst is pushed back to clients instead of piling up in memory.
+    """
+
+    def __new__(cls):
+        if not hasattr(cls, "instance"):
+            cls.instance = super(PasswordHasher, cls).__new__(cls)
+            cls.instance._executor = None
+            cls.instance._slots = None
+            cls.instance._in_flight = 0
+            cls.instance._queue_timeout = 0.0
+        return cls.instance  # noqa
+
+    def start(self, *, executor: str, workers: int, queue_size: int, queue_timeout: float) -> None:
+        if self._executor is not None:
+            return
+
+        if executor == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        elif executor == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+        else:
+            raise UnknownExecutorError(executor)
+
+        self._slots = asyncio.Semaphore(workers + queue_size)
+        self._in_flight = 0
+        self._queue_timeout = queue_timeout
+
+    def shutdown(self) -> None:
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        self._slots = None
+
+    @property
+    def in_flight(self) -> int:
+        if self._slots is None:
+            return 0
+        return self._in_flight
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password)
+
+    async def hash_many(self, passwords: tp.Iterable[str], *, concurrency: int) -> list[str]:
+        """
+        Hash passwords in bulk while holding at most concurrency slots, so logins still get admitted.
+        A bulk job waits for free slots as long as it takes instead of failing after ``queue_timeout``.
+        """
+        limit = asyncio.Semaphore(concurrency)
+
+        async def hash_one(password: str) -> str:
+            async with limit:
+                return await self._run("hash", hash_password, password, wait=True)
+
+        return await asyncio.gather(*(hash_one(password) for password in passwords))
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password, password, hashed_password)
+
+    async def _run(self, operation: str, func: tp.Callable, *args: tp.Any, wait: bool = False) -> tp.Any:
+        executor = self._get_executor()
+        started = perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=None if wait else self._queue_timeout)
+        except asyncio.TimeoutError as e:
+            raise HashingQueueFullError from e
+        finally:
+            PASSWORD_HASH_QUEUE_WAIT.observe(perf_counter() - started)
+
+        self._in_flight += 1
+        started = perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        finally:
+            PASSWORD_HASH_DURATION.labels(operation).observe(perf_counter() - started)
+            self._in_flight -= 1
+            self._slots.release()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self.start(**get_settings().password_hash_settings)
+        return self._executor
+
+
+async def get_password_hasher() -> PasswordHasher:
+    return PasswordHasher()
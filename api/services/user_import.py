@@ -0,0 +1,242 @@
+import asyncio
+import csv
+import typing as tp
+
+import orjson
+from fastapi import Depends
+
+from api import dto
+from api.config import get_settings
+from api.repositories.users import UsersRepository, get_users_repository
+from api.services.passwords.service import PasswordHasher, get_password_hasher
+from api.utils import uuid7
+
+
+MIN_PASSWORD_LENGTH = 8
+
+
+async def iter_lines(chunks: tp.AsyncIterable[bytes]) -> tp.AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+class CsvRows:
+    """
+    One csv reader fed line by line. A quoted field may span several lines, so a line
+    yields a row only once the lines fed since the last row make up a complete record.
+    """
+
+    def __init__(self) -> None:
+        self._lines: list[str] = []
+        self._position = 0
+        self._exhausted = False
+        self._reader = csv.reader(self)
+
+    def __iter__(self) -> "CsvRows":
+        return self
+
+    def __next__(self) -> str:
+        if self._position == len(self._lines):
+            self._exhausted = True
+            raise StopIteration
+        self._position += 1
+        return self._lines[self._position - 1]
+
+    @property
+    def pending(self) -> bool:
+        """
+        Whether the lines fed so far end inside a quoted field.
+        """
+        return bool(self._lines)
+
+    def feed(self, line: str) -> list[str] | None:
+        # the record is parsed again from its first line, the reader starts over after running out of input
+        self._lines.append(line)
+        self._position = 0
+        self._exhausted = False
+        try:
+            row = next(self._reader, None)
+        except csv.Error:
+            self._lines.clear()
+            raise
+        if self._exhausted:
+            return None
+        self._lines.clear()
+        return row
+
+
+class UserImportService:
+    """
+    Imports users from a CSV (with a header) or NDJSON stream.
+
+    Records have ``username`` and ``password`` and optionally ``bonus_account`` and ``role`` (a role code,
+    "user" by default). Rows are validated, their passwords hashed by the worker pool and the result
+    is written in batches through COPY; hashing of a batch overlaps with writing of the previous one.
+    Rows that fail validation or clash with an existing username are reported, not raised.
+    """
+
+    def __init__(
+        self,
+        users_repository: UsersRepository,
+        hasher: PasswordHasher,
+        *,
+        batch_size: int,
+        hash_concurrency: int,
+    ) -> None:
+        self._users_repository = users_repository
+        self._hasher = hasher
+        self._batch_size = batch_size
+        self._hash_concurrency = hash_concurrency
+
+    async def import_users(self, chunks: tp.AsyncIterable[bytes], fmt: str) -> dto.UserImportReport:
+        report = dto.UserImportReport()
+        role_ids = await self._users_repository.get_role_ids()
+
+        batch: list[tuple[int, str, str, int, tp.Any]] = []
+        batch_usernames: set[str] = set()
+        pending: asyncio.Task | None = None
+
+        async for line_number, record in self._parse(chunks, fmt, report):
+            row = self._validate(line_number, record, role_ids, report)
+            if row is None:
+                continue
+            if row[1] in batch_usernames:
+                report.errors.append(dto.UserImportError(line=line_number, username=row[1], error="Duplicate username"))
+                continue
+
+            batch.append(row)
+            batch_usernames.add(row[1])
+            if len(batch) >= self._batch_size:
+                pending = await self._flush(batch, pending, report)
+                batch, batch_usernames = [], set()
+
+        if batch:
+            pending = await self._flush(batch, pending, report)
+        if pending is not None:
+            await pending
+
+        report.errors.sort(key=lambda error: error.line)
+        return report
+
+    async def _flush(
+        self,
+        batch: list[tuple[int, str, str, int, tp.Any]],
+        pending: asyncio.Task | None,
+        report: dto.UserImportReport,
+    ) -> asyncio.Task:
+        hashed = await self._hasher.hash_many((row[2] for row in batch), concurrency=self._hash_concurrency)
+        if pending is not None:
+            await pending
+        return asyncio.create_task(self._write(batch, hashed, report))
+
+    async def _write(
+        self,
+        batch: list[tuple[int, str, str, int, tp.Any]],
+        hashed: list[str],
+        report: dto.UserImportReport,
+    ) -> None:
+        rows = [
+            (uuid7(), username, password, bonus_account, role_id)
+            for (_, username, _, bonus_account, role_id), password in zip(batch, hashed)
+        ]
+        inserted = await self._users_repository.copy_users(rows)
+
+        report.inserted += len(inserted)
+        for line_number, username, *_ in batch:
+            if username not in inserted:
+                report.errors.append(
+                    dto.UserImportError(
+                        line=line_number, username=username, error="User with that username already exists."
+                    )
+                )
+
+    @staticmethod
+    async def _parse(
+        chunks: tp.AsyncIterable[bytes], fmt: str, report: dto.UserImportReport
+    ) -> tp.AsyncIterator[tuple[int, dict[str, tp.Any]]]:
+        rows = CsvRows() if fmt == "csv" else None
+        header: list[str] | None = None
+        line_number = record_line = 0
+        async for line in iter_lines(chunks):
+            line_number += 1
+            if rows is None or not rows.pending:
+                if not line.strip():
+                    continue
+                record_line = line_number
+
+            try:
+                if rows is None:
+                    record = orjson.loads(line)  # pylint: disable=no-member
+                    if not isinstance(record, dict):
+                        raise ValueError("Expected a JSON object")
+                else:
+                    row = rows.feed(line.decode() + "\n")
+                    if row is None:
+                        continue
+                    if header is None:
+                        header = row
+                        continue
+                    record = dict(zip(header, row))
+            except (ValueError, csv.Error) as e:
+                report.errors.append(dto.UserImportError(line=record_line, username=None, error=str(e)))
+                continue
+
+            yield record_line, record
+
+        if rows is not None and rows.pending:
+            error = "Unterminated quoted field"
+            report.errors.append(dto.UserImportError(line=record_line, username=None, error=error))
+
+    @staticmethod
+    def _validate(
+        line_number: int,
+        record: dict[str, tp.Any],
+        role_ids: dict[str, tp.Any],
+        report: dto.UserImportReport,
+    ) -> tuple[int, str, str, int, tp.Any] | None:
+        username = record.get("username")
+        password = record.get("password")
+        role = record.get("role") or "user"
+
+        error = None
+        if not isinstance(username, str) or not username:
+            error = "Username is required"
+        elif not isinstance(password, str) or len(password) < MIN_PASSWORD_LENGTH:
+            error = f"Password must be at least {MIN_PASSWORD_LENGTH} characters long"
+        elif role not in role_ids:
+            error = f"Unknown role {role!r}"
+
+        bonus_account = 0
+        if error is None:
+            try:
+                bonus_account = int(record.get("bonus_account") or 0)
+            except (TypeError, ValueError):
+                error = "Bonus account must be an integer"
+
+        if error is not None:
+            report.errors.append(
+                dto.UserImportError(
+                    line=line_number, username=username if isinstance(username, str) else None, error=error
+                )
+            )
+            return None
+        return line_number, username, password, bonus_account, role_ids[role]
+
+
+async def get_user_import_service(
+    users_repository: UsersRepository = Depends(get_users_repository),
+    hasher: PasswordHasher = Depends(get_password_hasher),
+) -> UserImportService:
+    settings = get_settings()
+    return UserImportService(
+        users_repository,
+        hasher,
+        batch_size=settings.USER_IMPORT_BATCH_SIZE,
+        hash_concurrency=settings.PASSWORD_HASH_WORKERS,
+    )
@@ -1,23 +1,85 @@
+import typing as tp
+from uuid import UUID
+
+import orjson
 from fastapi import Depends
 
+from api.config import get_settings
 from api.repositories.users import UsersRepository, get_users_repository
+from api.schemas import admin as admin_schemas
 from api.schemas import users as schemas
+from api.services.passwords.service import PasswordHasher, get_password_hasher
+from api.utils import decode_cursor, encode_cursor
 
 
 class UsersService:
-    def __init__(self, users_repository: UsersRepository) -> None:
+    def __init__(self, users_repository: UsersRepository, hasher: PasswordHasher, *, list_batch_size: int) -> None:
         self._users_repository = users_repository
+        self._hasher = hasher
+        self._list_batch_size = list_batch_size
 
-    async def register(self, registration_model: schemas.RegistrationModel) -> tuple[bool, str]:
-        return await self._users_repository.add_user(**registration_model.dict())
+    async def register_user(self, registration_model: schemas.RegistrationModel) -> tuple[bool, str]:
+        """
+        Users log in with the email they registered with, it is stored as their username.
+        """
+        password = await self._hasher.hash(registration_model.password)
+        return await self._users_repository.add_user(registration_model.email, password)
 
     async def edit_user(self, edit_model: schemas.EditModel) -> tuple[bool, str]:
         fields = edit_model.dict(exclude_none=True)
         user_id = fields.pop("user_id")
+        if "password" in fields:
+            fields["password"] = await self._hasher.hash(fields["password"])
         return await self._users_repository.edit_user(user_id, fields)
 
+    @staticmethod
+    def parse_cursor(cursor: str, order_by: admin_schemas.UserListOrder) -> tuple:
+        """
+        Raises ValueError if the cursor does not match the requested order.
+        """
+        values = decode_cursor(cursor)
+        if order_by == admin_schemas.UserListOrder.USERNAME:
+            username, user_id = values
+            return username, UUID(str(user_id))
+        (user_id,) = values
+        return (UUID(str(user_id)),)
+
+    async def iter_users_ndjson(
+        self,
+        *,
+        order_by: admin_schemas.UserListOrder,
+        after: tuple | None,
+        role_code: str | None,
+        min_bonus: int | None,
+        max_bonus: int | None,
+        limit: int,
+    ) -> tp.AsyncIterator[bytes]:
+        """
+        Yield users as NDJSON, one chunk per fetched batch. If the page is full,
+        the last line is an object with the ``next_cursor`` to continue from.
+        """
+        count, last = 0, None
+        partitions = self._users_repository.stream_users(
+            order_by=order_by.value,
+            after=after,
+            role_code=role_code,
+            min_bonus=min_bonus,
+            max_bonus=max_bonus,
+            limit=limit,
+            batch_size=self._list_batch_size,
+        )
+        async for partition in partitions:
+            yield b"".join(orjson.dumps(row._asdict()) + b"\n" for row in partition)  # pylint: disable=no-member
+            count += len(partition)
+            last = partition[-1]
+
+        if last is not None and count >= limit:
+            key = [last.username, str(last.id)] if order_by == admin_schemas.UserListOrder.USERNAME else [str(last.id)]
+            yield orjson.dumps({"next_cursor": encode_cursor(key)}) + b"\n"  # pylint: disable=no-member
+
 
 async def get_users_service(
     users_repository: UsersRepository = Depends(get_users_repository),
+    hasher: PasswordHasher = Depends(get_password_hasher),
 ) -> UsersService:
-    return UsersService(users_repository)
+    return UsersService(users_repository, hasher, list_batch_size=get_settings().USER_LIST_BATCH_SIZE)
@@ -1,10 +1,15 @@
-from .common import camel_to_snake, get_hostname
+from .common import camel_to_snake, decode_cursor, encode_cursor, get_hostname
 from .core import hash_password, verify_password
+from .uuid7 import uuid7, uuid7_time
 
 
 __all__ = [
     "camel_to_snake",
+    "decode_cursor",
+    "encode_cursor",
     "get_hostname",
     "verify_password",
     "hash_password",
+    "uuid7",
+    "uuid7_time",
 ]
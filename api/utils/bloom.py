@@ -0,0 +1,89 @@
+from hashlib import blake2b
+from math import ceil, exp, log
+from time import monotonic
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter sized for ``capacity`` items at the given false positive rate.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self._size = max(8, ceil(-capacity * log(error_rate) / log(2) ** 2))
+        self._hashes = max(1, round(self._size / capacity * log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+        self.count = 0
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    @property
+    def false_positive_rate(self) -> float:
+        return (1 - exp(-self._hashes * self.count / self._size)) ** self._hashes
+
+    def _positions(self, item: str):
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self._size for i in range(self._hashes))
+
+
+class RotatingBloomFilter:
+    """
+    Pair of Bloom filters rotated every ``period`` seconds.
+
+    Items are added to the current filter and looked up in both, so an item is remembered
+    for at least one and at most two periods, after which it ages out without a rebuild.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, period: float):
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._period = period
+        self.clear()
+
+    def clear(self) -> None:
+        self._current = BloomFilter(self._capacity, self._error_rate)
+        self._previous = BloomFilter(self._capacity, self._error_rate)
+        self._rotated_at = monotonic()
+
+    def add(self, item: str) -> None:
+        self._rotate()
+        self._current.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        self._rotate()
+        return item in self._current or item in self._previous
+
+    @property
+    def count(self) -> int:
+        return self._current.count + self._previous.count
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._current.memory_bytes + self._previous.memory_bytes
+
+    @property
+    def false_positive_rate(self) -> float:
+        current, previous = self._current.false_positive_rate, self._previous.false_positive_rate
+        return 1 - (1 - current) * (1 - previous)
+
+    def _rotate(self) -> None:
+        rotations = int((monotonic() - self._rotated_at) // self._period)
+        if rotations == 0:
+            return
+        if rotations == 1:
+            self._previous = self._current
+        else:
+            self._previous = BloomFilter(self._capacity, self._error_rate)
+        self._current = BloomFilter(self._capacity, self._error_rate)
+        self._rotated_at += rotations * self._period
@@ -1,6 +1,10 @@
 import re
+import typing as tp
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from urllib.parse import urlparse
 
+import orjson
+
 
 def camel_to_snake(name) -> str:
     name = re.sub(r"(.)([A-Z][a-z]+)", r"\1_\2", name)
@@ -9,3 +13,17 @@ def camel_to_snake(name) -> str:
 
 def get_hostname(url: str) -> str:
     return urlparse(url).netloc
+
+
+def encode_cursor(values: tp.Sequence[tp.Any]) -> str:
+    return urlsafe_b64encode(orjson.dumps(values)).decode()  # pylint: disable=no-member
+
+
+def decode_cursor(cursor: str) -> list[tp.Any]:
+    """
+    Raises ValueError if the cursor was not produced by encode_cursor.
+    """
+    values = orjson.loads(urlsafe_b64decode(cursor.encode()))  # pylint: disable=no-member
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
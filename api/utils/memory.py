@@ -0,0 +1,44 @@
+import os
+
+
+# smaps_rollup fields summed into the reported kinds
+SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared",
+    "Shared_Dirty": "shared",
+    "Private_Clean": "private",
+    "Private_Dirty": "private",
+}
+
+
+def read_memory(pid: int | str = "self") -> dict[str, int]:
+    """
+    Resident memory of a process in bytes.
+
+    ``rss`` counts every page the process maps, including the ones still shared with the master it was
+    forked from, ``pss`` divides shared pages between the processes sharing them and ``private`` is
+    what only this process holds. Only ``rss`` is known without smaps_rollup, nothing without /proc.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as file:
+            return parse_smaps(file.read())
+    except OSError:
+        pass
+
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as file:
+            resident = int(file.read().split()[1])
+    except OSError:
+        return {}
+    return {"rss": resident * os.sysconf("SC_PAGE_SIZE")}
+
+
+def parse_smaps(text: str) -> dict[str, int]:
+    usage: dict[str, int] = {}
+    for line in text.splitlines():
+        name, _, value = line.partition(":")
+        kind = SMAPS_FIELDS.get(name)
+        if kind is not None:
+            usage[kind] = usage.get(kind, 0) + int(value.split()[0]) * 1024
+    return usage
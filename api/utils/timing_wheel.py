@@ -0,0 +1,134 @@
+import typing as tp
+from math import ceil
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel of key deadlines with ``tick`` seconds resolution.
+
+    Level ``i`` has ``slots`` buckets of ``slots ** i`` ticks each. A key sits in the lowest level whose
+    bucket span still separates its deadline from the current tick and moves down a level each time
+    its bucket comes up, so scheduling, cancelling and expiring are O(1) per key and nothing is scanned.
+    Deadlines never fire early: they are rounded up to the next tick.
+    """
+
+    def __init__(self, *, tick: float = 1.0, slots: int = 64, levels: int = 4, now: float = 0.0):
+        if slots & (slots - 1):
+            raise ValueError("Number of slots must be a power of two")
+
+        self._tick = tick
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self._levels = levels
+        self._current = int(now // tick)
+
+        self._wheels: list[list[dict[tp.Hashable, int]]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._counts = [0] * levels
+        self._overflow: dict[tp.Hashable, int] = {}
+        self._timers: dict[tp.Hashable, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: tp.Hashable) -> bool:
+        return key in self._timers
+
+    def schedule(self, key: tp.Hashable, deadline: float) -> bool:
+        """
+        Schedule key to expire at deadline, replacing its previous deadline.
+        Returns False without scheduling if the deadline is already due.
+        """
+        self.cancel(key)
+        return self._insert(key, ceil(deadline / self._tick))
+
+    def cancel(self, key: tp.Hashable) -> None:
+        position = self._timers.pop(key, None)
+        if position is None:
+            return
+
+        level, slot = position
+        if level == self._levels:
+            del self._overflow[key]
+        else:
+            del self._wheels[level][slot][key]
+            self._counts[level] -= 1
+
+    def clear(self) -> None:
+        for level, wheel in enumerate(self._wheels):
+            for bucket in wheel:
+                bucket.clear()
+            self._counts[level] = 0
+        self._overflow.clear()
+        self._timers.clear()
+
+    def advance(self, now: float) -> list[tp.Hashable]:
+        """
+        Move the wheel to now and return the keys whose deadlines passed.
+        Spans where the lower levels are empty are skipped without visiting every tick.
+        """
+        target = int(now // self._tick)
+        expired: list[tp.Hashable] = []
+        while self._current < target:
+            if not self._timers:
+                self._current = target
+                break
+
+            self._current = min(self._next_tick(), target)
+            tick = self._current
+            for level in range(1, self._levels + 1):
+                if tick & ((1 << (self._bits * level)) - 1):
+                    break
+                self._cascade(level, expired)
+
+            bucket = self._wheels[0][tick & self._mask]
+            if bucket:
+                for key in bucket:
+                    del self._timers[key]
+                    expired.append(key)
+                self._counts[0] -= len(bucket)
+                bucket.clear()
+        return expired
+
+    def _next_tick(self) -> int:
+        """
+        The next tick that has to be visited: the next one if level 0 holds keys,
+        otherwise the next bucket boundary of the lowest non-empty level.
+        """
+        level = 0
+        while level < self._levels and not self._counts[level]:
+            level += 1
+        if level == 0:
+            return self._current + 1
+
+        span = 1 << (self._bits * level)
+        return (self._current // span + 1) * span
+
+    def _cascade(self, level: int, expired: list[tp.Hashable]) -> None:
+        if level == self._levels:
+            bucket, self._overflow = self._overflow, {}
+        else:
+            slot = (self._current >> (self._bits * level)) & self._mask
+            bucket, self._wheels[level][slot] = self._wheels[level][slot], {}
+            self._counts[level] -= len(bucket)
+
+        for key, deadline in bucket.items():
+            del self._timers[key]
+            if not self._insert(key, deadline):
+                expired.append(key)
+
+    def _insert(self, key: tp.Hashable, deadline: int) -> bool:
+        if deadline <= self._current:
+            return False
+
+        for level in range(self._levels):
+            shift = self._bits * (level + 1)
+            if deadline >> shift == self._current >> shift:
+                slot = (deadline >> (self._bits * level)) & self._mask
+                self._wheels[level][slot][key] = deadline
+                self._counts[level] += 1
+                self._timers[key] = (level, slot)
+                return True
+
+        self._overflow[key] = deadline
+        self._timers[key] = (self._levels, 0)
+        return True
@@ -0,0 +1,97 @@
+"""
+Component microbenchmarks of the auth and persistence hot paths.
+
+Every case is calibrated so that one repetition lasts at least --min-time seconds and then
+repeated --repeat times; the median per-operation time and its 95% confidence interval are reported.
+Redis cases use an in-memory stand-in unless --redis is passed, database cases only run with --postgres.
+
+    python -m tests.benchmarks --save tests/benchmarks/baseline.json
+    python -m tests.benchmarks --compare tests/benchmarks/baseline.json
+
+With --compare the exit code is 1 if any case got significantly slower than the baseline.
+"""
+import argparse
+import asyncio
+import fnmatch
+import sys
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+import orjson
+
+from tests.benchmarks.harness import Stats, compare, format_duration, measure, to_document
+from tests.benchmarks.suite import CASES, Resources, postgres_session, redis_storage
+
+from api.services.passwords.service import PasswordHasher
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks")
+    parser.add_argument("patterns", nargs="*", default=["*"], help="glob patterns of case names to run")
+    parser.add_argument("--repeat", type=int, default=20, help="repetitions per case")
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimal duration of one repetition")
+    parser.add_argument("--redis", action="store_true", help="run storage cases against the configured redis")
+    parser.add_argument("--postgres", action="store_true", help="run database cases in a temporary database")
+    parser.add_argument("--save", type=Path, help="write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="compare results with this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change regarded as significant")
+    return parser.parse_args()
+
+
+async def run(args: argparse.Namespace) -> dict[str, Stats]:
+    cases = [
+        case
+        for name, case in CASES.items()
+        if any(fnmatch.fnmatch(name, pattern) for pattern in args.patterns)
+        and (args.postgres or not case.needs_postgres)
+    ]
+
+    results = {}
+    async with AsyncExitStack() as stack:
+        hasher = PasswordHasher()
+        hasher.start(executor="thread", workers=1, queue_size=16, queue_timeout=10)
+        stack.callback(hasher.shutdown)
+
+        resources = Resources(storage=await stack.enter_async_context(redis_storage(args.redis)), hasher=hasher)
+        if any(case.needs_postgres for case in cases):
+            resources.session, resources.user_ids = await stack.enter_async_context(postgres_session())
+
+        for case in cases:
+            operation = await case.setup(resources)
+            stats = await measure(operation, repeat=args.repeat, min_time=args.min_time)
+            results[case.name] = stats
+            print(
+                f"{case.name:<36} {format_duration(stats.median):>10}"
+                f"  [{format_duration(stats.ci_low)} .. {format_duration(stats.ci_high)}]"
+                f"  stdev {stats.stdev / stats.mean:6.1%}"
+            )
+
+    return results
+
+
+def main() -> int:
+    args = parse_args()
+    results = asyncio.run(run(args))
+
+    if args.save is not None:
+        args.save.write_bytes(
+            orjson.dumps(to_document(results), option=orjson.OPT_INDENT_2)  # pylint: disable=no-member
+        )
+
+    if args.compare is None:
+        return 0
+
+    baseline = orjson.loads(args.compare.read_bytes())["results"]  # pylint: disable=no-member
+    regressions = 0
+    print()
+    for comparison in compare(results, baseline, args.threshold):
+        print(
+            f"{comparison.name:<36} {format_duration(comparison.baseline):>10} -> "
+            f"{format_duration(comparison.current):>10}  {comparison.change:+7.1%}  {comparison.verdict}"
+        )
+        regressions += comparison.verdict == "slower"
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
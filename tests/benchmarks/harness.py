@@ -0,0 +1,120 @@
+import math
+import platform
+import statistics
+import typing as tp
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from time import perf_counter
+
+
+Operation = tp.Callable[[], tp.Awaitable[tp.Any]]
+
+
+@dataclass(kw_only=True, slots=True)
+class Stats:
+    """
+    Seconds per operation over ``samples`` repetitions. ``ci_low`` and ``ci_high``
+    bound a distribution-free 95% confidence interval of the median.
+    """
+
+    median: float
+    ci_low: float
+    ci_high: float
+    mean: float
+    stdev: float
+    min: float
+    samples: int
+
+    @classmethod
+    def from_samples(cls, samples: list[float]) -> "Stats":
+        ordered = sorted(samples)
+        n = len(ordered)
+        # order statistics around the median covering ~95% under the binomial(n, 1/2) approximation
+        spread = 1.96 * math.sqrt(n) / 2
+        low = max(0, math.floor(n / 2 - spread))
+        high = min(n - 1, math.ceil(n / 2 + spread) - 1)
+        return cls(
+            median=statistics.median(ordered),
+            ci_low=ordered[low],
+            ci_high=ordered[high],
+            mean=statistics.fmean(ordered),
+            stdev=statistics.stdev(ordered) if n > 1 else 0.0,
+            min=ordered[0],
+            samples=n,
+        )
+
+
+async def calibrate(operation: Operation, min_time: float) -> int:
+    """
+    Find how many calls make one repetition last at least min_time, so timer resolution does not matter.
+    """
+    number = 1
+    while True:
+        started = perf_counter()
+        for _ in range(number):
+            await operation()
+        if perf_counter() - started >= min_time:
+            return number
+        number *= 2
+
+
+async def measure(operation: Operation, *, repeat: int, min_time: float) -> Stats:
+    number = await calibrate(operation, min_time)
+    samples = []
+    for _ in range(repeat):
+        started = perf_counter()
+        for _ in range(number):
+            await operation()
+        samples.append((perf_counter() - started) / number)
+    return Stats.from_samples(samples)
+
+
+@dataclass(kw_only=True, slots=True)
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+    change: float
+    verdict: str
+
+
+def compare(current: dict[str, Stats], baseline: dict[str, dict], threshold: float) -> list[Comparison]:
+    """
+    A case counts as slower or faster only if its median moved by more than threshold
+    and the confidence intervals of the two runs do not overlap.
+    """
+    comparisons = []
+    for name, stats in current.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+
+        change = stats.median / previous["median"] - 1
+        verdict = "same"
+        if change > threshold and stats.ci_low > previous["ci_high"]:
+            verdict = "slower"
+        elif change < -threshold and stats.ci_high < previous["ci_low"]:
+            verdict = "faster"
+        comparisons.append(
+            Comparison(name=name, baseline=previous["median"], current=stats.median, change=change, verdict=verdict)
+        )
+    return comparisons
+
+
+def to_document(results: dict[str, Stats]) -> dict:
+    return {
+        "meta": {
+            "created": datetime.now(tz=timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+        },
+        "results": {name: asdict(stats) for name, stats in results.items()},
+    }
+
+
+def format_duration(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
@@ -0,0 +1,44 @@
+"""
+Compares JWT encode/decode throughput of PyJWT with OrjsonEncoder against HS256Codec:
+
+    python -m tests.benchmarks.jwt_codec --iterations 50000
+"""
+import argparse
+import uuid
+import warnings
+from timeit import timeit
+
+import jwt
+
+from api.services.jwt.coders import HS256Codec, OrjsonEncoder
+from api.services.jwt.utils import utcnow
+
+
+KEY = "benchmark-secret-key-of-32-bytes"
+
+
+def report(name: str, iterations: int, seconds: float) -> None:
+    print(f"{name:<14} {iterations / seconds:>12,.0f} ops/s")
+
+
+def main(iterations: int) -> None:
+    warnings.simplefilter("ignore")
+    iat = utcnow()
+    payload = {"jti": uuid.uuid4(), "type": "access", "sub": str(uuid.uuid4()), "iat": iat, "exp": iat + 3600}
+    codec = HS256Codec(KEY)
+    token = codec.encode(payload)
+
+    report(
+        "pyjwt encode",
+        iterations,
+        timeit(lambda: jwt.encode(payload, KEY, json_encoder=OrjsonEncoder), number=iterations),
+    )
+    report("codec encode", iterations, timeit(lambda: codec.encode(payload), number=iterations))
+    report("pyjwt decode", iterations, timeit(lambda: jwt.decode(token, KEY, algorithms=["HS256"]), number=iterations))
+    report("codec decode", iterations, timeit(lambda: codec.decode(token), number=iterations))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50000)
+    main(parser.parse_args().iterations)
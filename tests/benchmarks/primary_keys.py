@@ -0,0 +1,57 @@
+"""
+Compares random and time-ordered primary keys: bulk insert throughput, WAL written and primary key index size.
+
+Needs a running postgres configured by the POSTGRES_* settings, a temporary database is created and dropped:
+
+    python -m tests.benchmarks.primary_keys --rows 1000000 --batch-size 10000
+"""
+import argparse
+import asyncio
+import typing as tp
+from time import perf_counter
+from uuid import UUID, uuid4
+
+from sqlalchemy import TEXT, Column, MetaData, Table, insert, text
+from sqlalchemy.dialects.postgresql import UUID as UUIDType
+
+from tests.benchmarks.suite import postgres_session
+
+from api.utils import uuid7
+
+
+WAL_POSITION = text("SELECT pg_current_wal_lsn()")
+WAL_DIFF = text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), :start)")
+INDEX_SIZE = text("SELECT pg_relation_size(to_regclass(:index))")
+
+
+async def run(connection, name: str, generate: tp.Callable[[], UUID], rows: int, batch_size: int) -> None:
+    keys = Table(name, MetaData(), Column("id", UUIDType(as_uuid=True), primary_key=True), Column("payload", TEXT))
+    await connection.run_sync(keys.create)
+
+    start = await connection.scalar(WAL_POSITION)
+    elapsed = 0.0
+    for _ in range(0, rows, batch_size):
+        batch = [{"id": generate(), "payload": "x" * 32} for _ in range(batch_size)]
+        started = perf_counter()
+        await connection.execute(insert(keys), batch)
+        elapsed += perf_counter() - started
+
+    wal = await connection.scalar(WAL_DIFF, {"start": start})
+    index = await connection.scalar(INDEX_SIZE, {"index": f"{name}_pkey"})
+    print(f"{name:<6} {rows / elapsed:10.0f} rows/s  wal {wal / 2**20:8.1f} MiB  index {index / 2**20:8.1f} MiB")
+
+
+async def main(rows: int, batch_size: int) -> None:
+    async with postgres_session() as (session, _):
+        async with session.bind.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            await run(connection, "uuid4", uuid4, rows, batch_size)
+            await run(connection, "uuid7", uuid7, rows, batch_size)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.batch_size))
@@ -0,0 +1,81 @@
+"""
+Load test of user registration: role lookup, INSERT and IntegrityError on a duplicate
+against one INSERT ... ON CONFLICT DO NOTHING with the role read from the worker's registry.
+
+Passwords are hashed beforehand, so only the database work is measured.
+Needs a running postgres configured by the POSTGRES_* settings, a temporary database is created and dropped:
+
+    python -m tests.benchmarks.registration --concurrency 50 --duration 10
+"""
+import argparse
+import asyncio
+from itertools import count
+from time import monotonic
+from uuid import uuid4
+
+from sqlalchemy import exc, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from tests.benchmarks.suite import postgres_session
+
+from api.db.models import Role, User
+from api.repositories.roles import RoleRegistry
+from api.repositories.users import UsersRepository
+
+
+async def legacy_add_user(session: AsyncSession, username: str, password: str) -> bool:
+    try:
+        role_id = await session.scalar(select(Role.id).where(Role.code == "user"))
+        await session.execute(insert(User).values(id=uuid4(), username=username, password=password, role_id=role_id))
+        await session.commit()
+    except exc.IntegrityError:
+        await session.rollback()
+        return False
+    return True
+
+
+async def run(name: str, register, factory: sessionmaker, concurrency: int, duration: float, duplicates: float):
+    numbers = count()
+    registered = rejected = 0
+    deadline = monotonic() + duration
+
+    async def client() -> None:
+        nonlocal registered, rejected
+        while monotonic() < deadline:
+            number = next(numbers)
+            # every n-th attempt reuses a username that is already taken
+            taken = duplicates and number % round(1 / duplicates) == 0
+            username = "user-0" if taken else f"{name}-{number}@shop.com"
+            async with factory() as session:
+                if await register(session, username, "hash"):
+                    registered += 1
+                else:
+                    rejected += 1
+
+    started = monotonic()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = monotonic() - started
+    print(f"{name:<8} {registered / elapsed:8.1f} registrations/s  {rejected / elapsed:8.1f} duplicates/s")
+
+
+async def main(concurrency: int, duration: float, duplicates: float) -> None:
+    registry = RoleRegistry(ttl=300)
+
+    async def add_user(session: AsyncSession, username: str, password: str) -> bool:
+        registered, _ = await UsersRepository(session, role_registry=registry).add_user(username, password)
+        return registered
+
+    async with postgres_session() as (session, _):
+        factory = sessionmaker(session.bind, class_=AsyncSession, expire_on_commit=False)
+        await run("legacy", legacy_add_user, factory, concurrency, duration, duplicates)
+        await run("upsert", add_user, factory, concurrency, duration, duplicates)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="share of attempts with a taken username")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.duration, args.duplicates))
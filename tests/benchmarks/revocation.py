@@ -0,0 +1,53 @@
+"""
+Compares access token revocation checks: two sequential GETs against one MGET.
+
+Needs a running redis configured by the REDIS_* settings:
+
+    python -m tests.benchmarks.revocation --iterations 5000
+"""
+import argparse
+import asyncio
+from statistics import quantiles
+from time import perf_counter
+from uuid import uuid4
+
+from api.db.connection import RedisManager
+from api.repositories.storage import RedisStorage
+from api.repositories.tokens import BlocklistRepository, utcnow
+
+
+async def measure(check, payload: dict, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        started = perf_counter()
+        await check(payload)
+        timings.append(perf_counter() - started)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    percentiles = quantiles(timings, n=100)
+    print(f"{name:<12} p50={percentiles[49] * 1e6:8.1f}us  p99={percentiles[98] * 1e6:8.1f}us")
+
+
+async def main(iterations: int) -> None:
+    manager = RedisManager()
+    await manager.connect()
+    repository = BlocklistRepository(RedisStorage(manager.get_redis()))
+
+    payload = {"jti": str(uuid4()), "sub": str(uuid4()), "iat": utcnow()}
+
+    async def sequential(token_payload: dict) -> bool:
+        return await repository.in_blocklist(token_payload) or await repository.blocked_by_allblock(token_payload)
+
+    await measure(repository.is_revoked, payload, iterations // 10)
+    report("sequential", await measure(sequential, payload, iterations))
+    report("single mget", await measure(repository.is_revoked, payload, iterations))
+
+    await manager.close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    asyncio.run(main(parser.parse_args().iterations))
@@ -0,0 +1,391 @@
+# pylint: disable=unused-argument
+
+import typing as tp
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field, is_dataclass
+from datetime import timedelta
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy_utils import create_database, drop_database
+
+from tests.benchmarks.harness import Operation
+
+from api import dto
+from api.config import get_settings
+from api.db.connection import RedisManager
+from api.db.models import Role, User
+from api.db.models.base import Base
+from api.db.statements import StatementCache
+from api.repositories.storage import InMemoryStorage, RedisStorage
+from api.repositories.tokens import BlocklistRepository, RefreshTokensRepository
+from api.repositories.users import UsersRepository, build_find
+from api.responses import OrjsonResponse
+from api.schemas import KeyValueStorageResponse
+from api.schemas import admin as admin_schemas
+from api.schemas import tokens as tokens_schemas
+from api.services.jwt.service import JwtService
+from api.services.passwords.service import PasswordHasher
+from api.utils import hash_password, uuid7, verify_password
+
+
+PASSWORD = "benchmark-password"
+SECRET_KEY = "benchmark-secret-key-of-32-bytes"
+SEED_USERS = 1000
+
+
+class InMemoryRedis:
+    """
+    Stand-in for the subset of redis.asyncio.Redis used by RedisStorage, for runs without a redis-server.
+    Expiry is ignored: it measures the storage layer itself, not the network.
+    """
+
+    def __init__(self):
+        self._data: dict[str, bytes] = {}
+
+    async def set(self, key: str, value: bytes, ex: int | timedelta | None = None) -> bool:
+        self._data[key] = value
+        return True
+
+    async def get(self, key: str) -> bytes | None:
+        return self._data.get(key)
+
+    async def mget(self, keys: tp.Iterable[str]) -> list[bytes | None]:
+        return [self._data.get(key) for key in keys]
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+
+@dataclass(kw_only=True)
+class Resources:
+    storage: RedisStorage
+    hasher: PasswordHasher
+    session: AsyncSession | None = None
+    user_ids: list = field(default_factory=list)
+
+
+Setup = tp.Callable[[Resources], tp.Awaitable[Operation]]
+
+
+@dataclass(kw_only=True, slots=True)
+class Case:
+    name: str
+    setup: Setup
+    needs_postgres: bool = False
+
+
+CASES: dict[str, Case] = {}
+
+
+def case(name: str, *, needs_postgres: bool = False) -> tp.Callable[[Setup], Setup]:
+    """
+    Register a benchmark: setup prepares the state and returns the operation to time.
+    """
+
+    def decorator(setup: Setup) -> Setup:
+        CASES[name] = Case(name=name, setup=setup, needs_postgres=needs_postgres)
+        return setup
+
+    return decorator
+
+
+@asynccontextmanager
+async def redis_storage(use_redis: bool) -> tp.AsyncIterator[RedisStorage]:
+    if not use_redis:
+        yield RedisStorage(InMemoryRedis())  # type: ignore[arg-type]
+        return
+
+    manager = RedisManager()
+    await manager.connect()
+    try:
+        yield RedisStorage(manager.get_redis())
+    finally:
+        await manager.close()
+
+
+@asynccontextmanager
+async def postgres_session() -> tp.AsyncIterator[tuple[AsyncSession, list]]:
+    """
+    Create a temporary database next to the configured one, seed it with users and drop it afterwards.
+    """
+    settings = get_settings()
+    settings.POSTGRES_DB = ".".join([uuid4().hex, "benchmark"])
+    create_database(settings.database_uri_sync)
+
+    engine = create_async_engine(settings.database_uri)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)  # pylint: disable=no-member
+            role_id = uuid7()
+            await connection.execute(insert(Role).values(id=role_id, name="User", code="user"))
+            users = [
+                {"id": uuid7(), "username": f"user-{i}", "password": "", "bonus_account": 0, "role_id": role_id}
+                for i in range(SEED_USERS)
+            ]
+            await connection.execute(insert(User), users)
+
+        async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+            yield session, [user["id"] for user in users]
+    finally:
+        await engine.dispose()
+        drop_database(settings.database_uri_sync)
+
+
+def make_jwt_service(storage: RedisStorage) -> JwtService:
+    return JwtService(
+        refresh_tokens_repository=RefreshTokensRepository(storage),
+        blocklist_repository=BlocklistRepository(storage, expire_time=3600),
+        secret_key=SECRET_KEY,
+    )
+
+
+@case("passwords.hash")
+async def passwords_hash(resources: Resources) -> Operation:
+    async def operation():
+        return hash_password(PASSWORD)
+
+    return operation
+
+
+@case("passwords.verify")
+async def passwords_verify(resources: Resources) -> Operation:
+    hashed = hash_password(PASSWORD)
+
+    async def operation():
+        return verify_password(PASSWORD, hashed)
+
+    return operation
+
+
+@case("passwords.hasher_verify")
+async def passwords_hasher_verify(resources: Resources) -> Operation:
+    hashed = hash_password(PASSWORD)
+
+    async def operation():
+        return await resources.hasher.verify(PASSWORD, hashed)
+
+    return operation
+
+
+@case("jwt.create_tokens")
+async def jwt_create_tokens(resources: Resources) -> Operation:
+    service = make_jwt_service(resources.storage)
+    sub = str(uuid4())
+
+    async def operation():
+        return await service.create_tokens(sub)
+
+    return operation
+
+
+@case("jwt.verify_access_token")
+async def jwt_verify_access_token(resources: Resources) -> Operation:
+    service = make_jwt_service(resources.storage)
+    tokens = await service.create_tokens(str(uuid4()))
+
+    async def operation():
+        return await service.verify_access_token(tokens.access_token)
+
+    return operation
+
+
+@case("jwt.verify_refresh_token")
+async def jwt_verify_refresh_token(resources: Resources) -> Operation:
+    service = make_jwt_service(resources.storage)
+    tokens = await service.create_tokens(str(uuid4()))
+
+    async def operation():
+        return await service.verify_refresh_token(tokens.refresh_token)
+
+    return operation
+
+
+@case("storage.set")
+async def storage_set(resources: Resources) -> Operation:
+    key = f"benchmark:{uuid4()}"
+    value = {"jti": str(uuid4()), "sub": str(uuid4()), "iat": 0, "exp": 3600}
+
+    async def operation():
+        return await resources.storage.set(key, value, ex=60)
+
+    return operation
+
+
+@case("storage.get")
+async def storage_get(resources: Resources) -> Operation:
+    key = f"benchmark:{uuid4()}"
+    await resources.storage.set(key, {"jti": str(uuid4()), "sub": str(uuid4()), "iat": 0, "exp": 3600}, ex=600)
+
+    async def operation():
+        return await resources.storage.get(key)
+
+    return operation
+
+
+@case("memory_storage.set")
+async def memory_storage_set(resources: Resources) -> Operation:
+    storage = InMemoryStorage(max_entries=SEED_USERS)
+    key = f"benchmark:{uuid4()}"
+    value = {"jti": str(uuid4()), "sub": str(uuid4()), "iat": 0, "exp": 3600}
+
+    async def operation():
+        return await storage.set(key, value, ex=60)
+
+    return operation
+
+
+@case("memory_storage.get")
+async def memory_storage_get(resources: Resources) -> Operation:
+    storage = InMemoryStorage(max_entries=SEED_USERS)
+    key = f"benchmark:{uuid4()}"
+    await storage.set(key, {"jti": str(uuid4()), "sub": str(uuid4()), "iat": 0, "exp": 3600}, ex=600)
+
+    async def operation():
+        return await storage.get(key)
+
+    return operation
+
+
+def response_cases(name: str, model: type[BaseModel], content: tp.Any) -> None:
+    """
+    Register the cost of turning one endpoint's result into a response body both ways: plain content is
+    validated against response_model, passed through jsonable_encoder and dumped with the stdlib json,
+    an OrjsonResponse built from the DTO is dumped as it is.
+    """
+    field = create_response_field(name=f"Response_{name}", type_=model)
+
+    async def validated(resources: Resources) -> Operation:
+        async def operation():
+            value = asdict(content) if is_dataclass(content) else content
+            value = await serialize_response(field=field, response_content=value, is_coroutine=True)
+            return JSONResponse(value).body
+
+        return operation
+
+    async def direct(resources: Resources) -> Operation:
+        async def operation():
+            return OrjsonResponse(content).body
+
+        return operation
+
+    case(f"responses.{name}.validated")(validated)
+    case(f"responses.{name}.orjson")(direct)
+
+
+response_cases("login", tokens_schemas.TokensResponse, dto.TokenPair(access_token="a" * 400, refresh_token="r" * 300))
+response_cases(
+    "import_users",
+    admin_schemas.UserImportResponse,
+    dto.UserImportReport(
+        inserted=SEED_USERS,
+        errors=[
+            dto.UserImportError(line=line, username=f"user-{line}", error="Username is already taken")
+            for line in range(100)
+        ],
+    ),
+)
+response_cases(
+    "key_value_storage",
+    KeyValueStorageResponse,
+    {
+        "entries": SEED_USERS,
+        "local_hits": 10**6,
+        "negative_hits": 10**4,
+        "remote_hits": 10**5,
+        "remote_misses": 10**3,
+        "local_hit_rate": 0.9,
+        "remote_hit_rate": 0.99,
+    },
+)
+
+
+@case("statements.find.build")
+async def statements_find_build(resources: Resources) -> Operation:
+    async def operation():
+        query = select(User).where(User.username == f"user-{SEED_USERS // 2}")
+        return query._generate_cache_key()  # pylint: disable=protected-access
+
+    return operation
+
+
+@case("statements.find.cached")
+async def statements_find_cached(resources: Resources) -> Operation:
+    statements = StatementCache("benchmark")
+    shape = (("username", False),)
+
+    async def operation():
+        query = statements.get(("find", shape), lambda: build_find(shape))
+        return query._generate_cache_key()  # pylint: disable=protected-access
+
+    return operation
+
+
+@case("keys.uuid4")
+async def keys_uuid4(resources: Resources) -> Operation:
+    async def operation():
+        return uuid4()
+
+    return operation
+
+
+@case("keys.uuid7")
+async def keys_uuid7(resources: Resources) -> Operation:
+    async def operation():
+        return uuid7()
+
+    return operation
+
+
+@case("users.get_by_id", needs_postgres=True)
+async def users_get_by_id(resources: Resources) -> Operation:
+    repository = UsersRepository(resources.session)
+    user_id = resources.user_ids[len(resources.user_ids) // 2]
+
+    async def operation():
+        user = await repository.get_by_id(user_id)
+        resources.session.expunge_all()
+        return user
+
+    return operation
+
+
+@case("users.find", needs_postgres=True)
+async def users_find(resources: Resources) -> Operation:
+    repository = UsersRepository(resources.session)
+    username = f"user-{SEED_USERS // 2}"
+
+    async def operation():
+        user = await repository.find(username=username)
+        resources.session.expunge_all()
+        return user
+
+    return operation
+
+
+@case("users.get_credentials", needs_postgres=True)
+async def users_get_credentials(resources: Resources) -> Operation:
+    repository = UsersRepository(resources.session)
+    username = f"user-{SEED_USERS // 2}"
+
+    async def operation():
+        return await repository.get_credentials(username)
+
+    return operation
+
+
+@case("users.get_snapshot", needs_postgres=True)
+async def users_get_snapshot(resources: Resources) -> Operation:
+    repository = UsersRepository(resources.session)
+    user_id = resources.user_ids[len(resources.user_ids) // 2]
+
+    async def operation():
+        return await repository.get_snapshot(user_id)
+
+    return operation
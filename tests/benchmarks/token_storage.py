@@ -0,0 +1,80 @@
+"""
+Memory taken by the token entries of one session, in the legacy JSON format and in the compact one:
+the refresh entry of a logged in user, and the blocklist entry of a revoked access token.
+
+Key and value sizes are computed offline; with --redis the entries of ``--sessions`` sessions are written
+to the configured redis, measured with MEMORY USAGE and deleted again:
+
+    python -m tests.benchmarks.token_storage
+    python -m tests.benchmarks.token_storage --redis --sessions 10000
+"""
+import argparse
+import asyncio
+import typing as tp
+from uuid import uuid4
+
+import orjson
+
+from api.db.connection import RedisManager
+from api.repositories.token_entries import PRESENT, pack_entry
+from api.repositories.tokens import utcnow
+
+
+def make_session() -> tuple[dict[str, tp.Any], dict[str, tp.Any]]:
+    sub, iat = str(uuid4()), utcnow()
+    access = {"jti": str(uuid4()), "type": "access", "sub": sub, "iat": iat, "exp": iat + 3600}
+    access |= {"prm": "3", "prv": "a1b2c3d4"}
+    refresh = {"jti": str(uuid4()), "type": "refresh", "sub": sub, "iat": iat, "exp": iat + 1209600}
+    return access, refresh
+
+
+def legacy_entries(access: dict[str, tp.Any], refresh: dict[str, tp.Any]) -> dict[str, bytes]:
+    dumps = orjson.dumps  # pylint: disable=no-member
+    return {f"{refresh['sub']}:refresh": dumps(refresh), access["jti"]: dumps(access)}
+
+
+def compact_entries(access: dict[str, tp.Any], refresh: dict[str, tp.Any]) -> dict[str, bytes]:
+    return {f"r:{refresh['sub']}": pack_entry(refresh["exp"], refresh["jti"]), f"b:{access['jti']}": PRESENT}
+
+
+FORMATS = {"legacy": legacy_entries, "compact": compact_entries}
+
+
+async def measure_redis(name: str, sessions: int) -> float:
+    manager = RedisManager()
+    await manager.connect()
+    redis = manager.get_redis()
+    keys = []
+    try:
+        for _ in range(sessions):
+            entries = FORMATS[name](*make_session())
+            await redis.mset(entries)
+            keys.extend(entries)
+        usage = 0
+        for key in keys:
+            usage += await redis.memory_usage(key)
+        return usage / sessions
+    finally:
+        for start in range(0, len(keys), 1000):
+            await redis.delete(*keys[start : start + 1000])
+        await manager.close()
+
+
+async def main(use_redis: bool, sessions: int) -> None:
+    session = make_session()
+    for name, entries in FORMATS.items():
+        encoded = entries(*session)
+        keys = sum(len(key) for key in encoded)
+        values = sum(len(value) for value in encoded.values())
+        line = f"{name:<8} keys {keys:4d} B  values {values:4d} B  total {keys + values:4d} B per session"
+        if use_redis:
+            line += f"  redis {await measure_redis(name, sessions):7.1f} B per session"
+        print(line)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--redis", action="store_true", help="measure MEMORY USAGE in the configured redis")
+    parser.add_argument("--sessions", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(main(args.redis, args.sessions))
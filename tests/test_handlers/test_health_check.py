@@ -1,6 +1,8 @@
 import pytest
 from starlette import status
 
+from api.config import get_settings
+
 
 class TestHealthCheckHandler:
     @staticmethod
@@ -10,3 +12,8 @@ class TestHealthCheckHandler:
     async def test_ping(self, client):
         response = await client.get(url=self.get_url())
         assert response.status_code == status.HTTP_200_OK
+
+    async def test_database_pool(self, client):
+        response = await client.get(url="/api/v1/health_check/database_pool")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["size"] == get_settings().DB_POOL_SIZE
@@ -0,0 +1,26 @@
+from uuid import uuid4
+
+import orjson
+import pytest
+
+from api import dto
+from api.responses import OrjsonResponse
+from api.schemas import PingResponse
+
+
+class TestOrjsonResponse:
+    def test_renders_dataclasses(self):
+        report = dto.UserImportReport(inserted=1, errors=[dto.UserImportError(line=2, username=None, error="Taken")])
+        assert orjson.loads(OrjsonResponse(report).body) == {
+            "inserted": 1,
+            "errors": [{"line": 2, "username": None, "error": "Taken"}],
+        }
+
+    def test_renders_uuids_and_models(self):
+        user_id = uuid4()
+        body = OrjsonResponse({"id": user_id, "ping": PingResponse()}).body
+        assert orjson.loads(body) == {"id": str(user_id), "ping": {"message": "Pong!"}}
+
+    def test_rejects_unknown_types(self):
+        with pytest.raises(TypeError):
+            OrjsonResponse({"value": object()})
@@ -0,0 +1,25 @@
+from mock import patch
+
+from api.__main__ import get_app
+from api.db.connection import RedisManager
+from api.repositories.blocklist_filter import BlocklistFilterManager
+from api.repositories.user_cache import UserCacheManager
+from api.services.jwt.cache import TokenCacheManager
+
+
+class TestStartup:
+    async def test_memory_backend_starts_without_redis(self, monkeypatch):
+        monkeypatch.setenv("KEY_VALUE_STORAGE", "memory")
+        monkeypatch.setenv("TOKEN_CACHE_ENABLED", "true")
+        monkeypatch.setenv("REDIS_HOST", "redis.invalid")
+        RedisManager().redis = None
+        app = get_app()
+
+        with patch.object(RedisManager, "refresh", side_effect=AssertionError("redis is not configured")):
+            await app.router.startup()
+            try:
+                assert BlocklistFilterManager().get_filter() is None
+                assert not TokenCacheManager().get_cache().distributed
+                assert not UserCacheManager().get_cache().distributed
+            finally:
+                await app.router.shutdown()
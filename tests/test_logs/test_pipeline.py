@@ -0,0 +1,73 @@
+import logging
+import sys
+from queue import Queue
+
+import orjson
+from mock import patch
+
+from api.logs import DropOldestQueueHandler, LoggingManager, OrjsonFormatter, SamplingFilter, parse_rules
+
+
+def make_record(name: str = "api", level: int = logging.INFO, msg: str = "message", **extra) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, __file__, 1, msg, (), None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestSamplingFilter:
+    def test_rules_are_inherited_by_child_loggers(self):
+        sampling_filter = SamplingFilter(sampling=parse_rules("api.db=0, api.db.keep = 1"), rate_limits={})
+        assert not sampling_filter.filter(make_record("api.db.connection"))
+        assert sampling_filter.filter(make_record("api.db.keep.child"))
+        assert sampling_filter.filter(make_record("api.services"))
+        assert sampling_filter.filter(make_record("api.db", level=logging.ERROR))
+        assert sampling_filter.suppressed == 1
+
+    def test_rate_cap(self):
+        sampling_filter = SamplingFilter(sampling={}, rate_limits={"": 3})
+        with patch("api.logs.monotonic", return_value=100):
+            assert sum(sampling_filter.filter(make_record(level=logging.ERROR)) for _ in range(10)) == 3
+        with patch("api.logs.monotonic", return_value=101):
+            assert sampling_filter.filter(make_record())
+
+
+class TestDropOldestQueueHandler:
+    def test_full_buffer_drops_oldest(self):
+        handler = DropOldestQueueHandler(Queue(maxsize=2))
+        for i in range(3):
+            handler.handle(make_record(msg=f"record {i}"))
+
+        assert handler.dropped == 1
+        assert [handler.queue.get_nowait().msg for _ in range(2)] == ["record 1", "record 2"]
+
+
+class TestOrjsonFormatter:
+    def test_structured_record(self):
+        handler = DropOldestQueueHandler(Queue())
+        exc_info = None
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            exc_info = sys.exc_info()
+        record = logging.LogRecord("api", logging.ERROR, __file__, 1, "failed %s", ("job",), exc_info)
+        record.user_id = 42
+        entry = orjson.loads(OrjsonFormatter().format(handler.prepare(record)))  # pylint: disable=no-member
+
+        assert entry["message"] == "failed job"
+        assert entry["level"] == "ERROR"
+        assert entry["user_id"] == 42
+        assert "ValueError: boom" in entry["exception"]
+
+
+class TestLoggingManager:
+    def test_records_reach_the_sink(self, capsys):
+        manager = LoggingManager()
+        manager.start()
+        try:
+            logging.getLogger("api.test").warning("hello %s", "world", extra={"request_id": "r1"})
+        finally:
+            manager.stop()
+
+        entry = orjson.loads(capsys.readouterr().out.splitlines()[-1])  # pylint: disable=no-member
+        assert entry["message"] == "hello world"
+        assert entry["request_id"] == "r1"
@@ -0,0 +1,50 @@
+import logging
+
+from sqlalchemy import bindparam, column, create_engine, select, table, text
+
+from api.db.connection.instrumentation import QueryInstrumentation, track_queries
+from api.metrics import DB_COMPILED_CACHE
+
+
+def make_engine(**settings):
+    engine = create_engine("sqlite://")
+    QueryInstrumentation(**settings).attach(engine)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY)"))
+        connection.execute(text("INSERT INTO item (id) VALUES (1), (2), (3)"))
+    return engine
+
+
+class TestQueryInstrumentation:
+    def test_request_stats_and_repeated_statements(self, caplog):
+        engine = make_engine(slow_threshold=60, repeat_threshold=3)
+        with caplog.at_level(logging.WARNING), track_queries("GET /items") as stats, engine.connect() as connection:
+            for item_id in (1, 2, 3, 1):
+                connection.execute(text("SELECT id FROM item WHERE id = :id"), {"id": item_id})
+            connection.execute(text("UPDATE item SET id = id + 10"))
+
+        assert stats.queries == 5
+        assert stats.rows == 3
+        assert stats.repeated == ["SELECT id FROM item WHERE id = ?"]
+        assert [record.message for record in caplog.records] == [
+            "Statement executed 3 times in GET /items, probably an N+1 query: SELECT id FROM item WHERE id = ?"
+        ]
+
+    def test_slow_queries_are_logged_outside_requests(self, caplog):
+        engine = make_engine(slow_threshold=0, repeat_threshold=3)
+        with caplog.at_level(logging.WARNING), engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+        assert caplog.records[-1].message.startswith("Slow query: ")
+        assert caplog.records[-1].message.endswith(" ms, 0 rows: SELECT 1")
+
+    def test_compiled_cache_results(self):
+        engine = make_engine(slow_threshold=60, repeat_threshold=3)
+        query = select(column("id")).select_from(table("item")).where(column("id") == bindparam("item_id"))
+        hits, misses = DB_COMPILED_CACHE.labels("hit").value, DB_COMPILED_CACHE.labels("miss").value
+        with engine.connect() as connection:
+            for item_id in (1, 2, 3):
+                connection.execute(query, {"item_id": item_id})
+
+        assert DB_COMPILED_CACHE.labels("miss").value - misses == 1
+        assert DB_COMPILED_CACHE.labels("hit").value - hits == 2
@@ -0,0 +1,61 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from api.metrics import HTTP_REQUESTS
+from api.metrics.middleware import MetricsMiddleware
+from api.metrics.registry import Registry
+
+
+class TestRegistry:
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5):
+            histogram.labels("/users").observe(value)
+
+        assert registry.render().splitlines()[2:] == [
+            'latency_seconds_bucket{route="/users",le="0.1"} 2',
+            'latency_seconds_bucket{route="/users",le="1.0"} 3',
+            'latency_seconds_bucket{route="/users",le="+Inf"} 4',
+            'latency_seconds_sum{route="/users"} 5.65',
+            'latency_seconds_count{route="/users"} 4',
+        ]
+
+    def test_unlabelled_metrics_and_escaping(self):
+        registry = Registry()
+        registry.gauge("in_flight", "In flight.").inc(2)
+        registry.counter("errors_total", "Errors.", ("reason",)).labels('bad "quote"\n').inc()
+
+        rendered = registry.render()
+        assert "in_flight 2.0\n" in rendered
+        assert 'errors_total{reason="bad \\"quote\\"\\n"} 1.0\n' in rendered
+
+    def test_label_count_is_checked(self):
+        counter = Registry().counter("requests_total", "Requests.", ("method",))
+        with pytest.raises(ValueError):
+            counter.labels("GET", "/")
+
+    def test_duplicate_name(self):
+        registry = Registry()
+        registry.counter("requests_total", "Requests.")
+        with pytest.raises(ValueError):
+            registry.gauge("requests_total", "Requests.")
+
+
+class TestMetricsMiddleware:
+    async def test_requests_are_labelled_by_route_template(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int):
+            return {"id": item_id}
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            await client.get("/items/1")
+            await client.get("/items/2")
+            await client.get("/missing")
+
+        assert HTTP_REQUESTS.labels("GET", "/items/{item_id}", "200").value == 2
+        assert HTTP_REQUESTS.labels("GET", "<unmatched>", "404").value == 1
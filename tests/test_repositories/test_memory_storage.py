@@ -0,0 +1,69 @@
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from mock import patch
+
+from api.repositories.storage import InMemoryStorage
+from api.repositories.tokens import BlocklistRepository, RefreshTokensRepository
+
+
+@pytest.fixture
+def storage() -> InMemoryStorage:
+    with patch("api.repositories.storage.time", return_value=1000):
+        return InMemoryStorage(max_entries=3)
+
+
+class TestInMemoryStorage:
+    async def test_values_are_stored_as_is(self, storage):
+        value = {"jti": "token", "iat": 1}
+        await storage.set("key", value)
+        assert await storage.get("key") is value
+        assert await storage.get_many("key", "missing") == [value, None]
+
+        await storage.delete("key")
+        assert await storage.get("key") is None
+
+    async def test_expiry(self, storage):
+        with patch("api.repositories.storage.time", return_value=1000):
+            await storage.set("short", 1, ex=10)
+            await storage.set("long", 2, ex=timedelta(minutes=1))
+            await storage.set("forever", 3)
+
+        with patch("api.repositories.storage.time", return_value=1010.5):
+            assert await storage.get_many("short", "long", "forever") == [None, 2, 3]
+
+        with patch("api.repositories.storage.time", return_value=1100):
+            assert await storage.get_many("short", "long", "forever") == [None, None, 3]
+            assert storage.get_stats() == {"entries": 1, "timers": 0, "expired": 2, "evicted": 0}
+
+    async def test_overwrite_without_ex_keeps_value(self, storage):
+        with patch("api.repositories.storage.time", return_value=1000):
+            await storage.set("key", 1, ex=10)
+            await storage.set("key", 2)
+
+        with patch("api.repositories.storage.time", return_value=1100):
+            assert await storage.get("key") == 2
+
+    async def test_lru_bound(self, storage):
+        with patch("api.repositories.storage.time", return_value=1000):
+            for key in "abc":
+                await storage.set(key, key, ex=60)
+            await storage.get("a")
+            await storage.set("d", "d", ex=60)
+
+            assert await storage.get_many("a", "b", "c", "d") == ["a", None, "c", "d"]
+            assert storage.get_stats()["timers"] == 3
+            assert storage.evicted == 1
+
+    async def test_token_repositories(self, storage):
+        refresh_tokens = RefreshTokensRepository(storage)
+        blocklist = BlocklistRepository(storage, expire_time=3600)
+        payload = {"jti": str(uuid4()), "sub": "sub", "iat": 1}
+
+        await refresh_tokens.set_refresh_token(payload)
+        assert await refresh_tokens.get_refresh_jti("sub") == payload["jti"]
+
+        assert not await blocklist.is_revoked(payload)
+        await blocklist.add_to_blocklist(payload)
+        assert await blocklist.is_revoked(payload)
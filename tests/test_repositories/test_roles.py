@@ -0,0 +1,90 @@
+import asyncio
+from uuid import uuid4
+
+from mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+
+from api.dto import RoleSnapshot
+from api.repositories.roles import RoleRegistry
+from api.repositories.users import UsersRepository
+
+
+PERMISSIONS = {"users.read": 0, "users.import": 1, "shop.manage": 2}
+ROLES = [
+    RoleSnapshot(id=uuid4(), code="user", name="User", permissions=0b001),
+    RoleSnapshot(id=uuid4(), code="admin", name="Admin", permissions=0b011),
+]
+
+
+def make_session(**kwargs) -> MagicMock:
+    rows = [
+        (role.id, role.code, role.name, bit)
+        for role in ROLES
+        for bit in PERMISSIONS.values()
+        if role.permissions >> bit & 1
+    ]
+    return MagicMock(execute=AsyncMock(side_effect=[rows, MagicMock(all=lambda: list(PERMISSIONS.items()))]), **kwargs)
+
+
+class TestRoleRegistry:
+    async def test_loads_once_for_concurrent_lookups(self):
+        registry = RoleRegistry(ttl=60)
+        load = AsyncMock(return_value=(ROLES, PERMISSIONS))
+
+        found = await asyncio.gather(*(registry.get_by_code("user", load) for _ in range(10)))
+
+        assert found == [ROLES[0]] * 10
+        assert await registry.get_by_id(ROLES[1].id, load) == ROLES[1]
+        assert await registry.get_ids(load) == {"user": ROLES[0].id, "admin": ROLES[1].id}
+        assert load.await_count == 1
+
+    async def test_reloads_when_expired_or_invalidated(self):
+        registry = RoleRegistry(ttl=0)
+        load = AsyncMock(return_value=(ROLES, PERMISSIONS))
+
+        await registry.get_by_code("user", load)
+        await registry.get_by_code("user", load)
+        assert load.await_count == 2
+
+        registry = RoleRegistry(ttl=60)
+        await registry.get_by_code("user", load)
+        registry.invalidate()
+        assert await registry.get_by_code("missing", load) is None
+        assert registry.loads == 2
+
+    async def test_permission_masks_and_version(self):
+        registry = RoleRegistry(ttl=60)
+        load = AsyncMock(return_value=(ROLES, PERMISSIONS))
+
+        assert await registry.get_mask(["users.read", "users.import"], load) == 0b011
+        assert await registry.get_mask(["users.read", "missing"], load) is None
+        version = await registry.get_version(load)
+
+        registry.invalidate()
+        assert await registry.get_version(load) == version
+        load.return_value = ([ROLES[0]], PERMISSIONS)
+        registry.invalidate()
+        assert await registry.get_version(load) != version
+
+
+class TestUsersRepositoryRoles:
+    async def test_load_roles_folds_permissions_into_bitsets(self):
+        repository = UsersRepository(make_session(), role_registry=RoleRegistry(ttl=60))
+
+        assert await repository.get_role(ROLES[1].id) == ROLES[1]
+        assert await repository.get_role(ROLES[0].id) == ROLES[0]
+        assert await repository.get_permission_mask(["shop.manage"]) == 0b100
+
+    async def test_registers_in_one_statement(self):
+        session = make_session(scalar=AsyncMock(side_effect=[uuid4(), None]), commit=AsyncMock())
+        repository = UsersRepository(session, role_registry=RoleRegistry(ttl=60))
+
+        assert (await repository.add_user("polly@shop.com", "hash"))[0]
+        assert not (await repository.add_user("polly@shop.com", "hash"))[0]
+
+        (first, first_params), (second, _) = (call.args for call in session.scalar.await_args_list)
+        assert first is second
+        assert "ON CONFLICT (username) DO NOTHING" in str(first.compile(dialect=postgresql.dialect()))
+        assert first_params["role_id"] == ROLES[0].id
+        assert first_params["username"] == "polly@shop.com"
+        assert session.execute.await_count == 2
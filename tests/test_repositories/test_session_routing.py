@@ -0,0 +1,92 @@
+from mock import AsyncMock, MagicMock
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, select, update
+
+from api.db.connection.routing import Replica, ReplicaRouter, RoutingSession
+
+
+metadata = MetaData()
+origin = Table("origin", metadata, Column("id", Integer, primary_key=True), Column("name", String))
+
+
+def make_engine(name: str):
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(origin.insert().values(id=1, name=name))
+    return engine
+
+
+def make_replica(name: str, **kwargs) -> Replica:
+    return Replica(name=name, bind=make_engine(name), available=True, **kwargs)
+
+
+def read_origin(session: RoutingSession) -> str:
+    return session.execute(select(origin.c.name)).scalar_one()
+
+
+class TestRoutingSession:
+    def test_reads_go_to_replica_until_first_write(self):
+        primary = make_engine("primary")
+        router = ReplicaRouter([make_replica("replica")])
+
+        with RoutingSession(bind=primary, router=router) as session:
+            assert read_origin(session) == "replica"
+            session.execute(update(origin).values(name="written"))
+            assert read_origin(session) == "written"
+            session.commit()
+            assert read_origin(session) == "written"
+
+        with RoutingSession(bind=primary, router=router) as session:
+            assert read_origin(session) == "replica"
+
+    def test_locking_reads_go_to_primary(self):
+        with RoutingSession(bind=make_engine("primary"), router=ReplicaRouter([make_replica("replica")])) as session:
+            assert session.execute(select(origin.c.name).with_for_update()).scalar_one() == "primary"
+            assert read_origin(session) == "primary"
+
+    def test_without_available_replicas_reads_go_to_primary(self):
+        replica = make_replica("replica")
+        router = ReplicaRouter([replica], max_lag=1.0)
+        router.update(replica, lag=5.0)
+
+        with RoutingSession(bind=make_engine("primary"), router=router) as session:
+            assert read_origin(session) == "primary"
+
+        router.update(replica, lag=0.5)
+        with RoutingSession(bind=make_engine("primary"), router=router) as session:
+            assert read_origin(session) == "replica"
+
+
+class TestReplicaRouter:
+    def test_round_robin_skips_unavailable_replicas(self):
+        replicas = [make_replica(name) for name in ("a", "b", "c")]
+        router = ReplicaRouter(replicas)
+        router.update(replicas[1], lag=None)
+
+        assert [router.choose().name for _ in range(4)] == ["a", "c", "a", "c"]
+
+    def test_lowest_latency(self):
+        replicas = [make_replica(name) for name in ("a", "b")]
+        router = ReplicaRouter(replicas, strategy="latency")
+        router.update(replicas[0], lag=0, latency=0.004)
+        router.update(replicas[1], lag=0, latency=0.002)
+        assert router.choose().name == "b"
+
+        for _ in range(5):
+            router.update(replicas[1], lag=0, latency=0.010)
+        assert router.choose().name == "a"
+
+    async def test_replica_not_streaming_is_unavailable(self):
+        replica = make_replica("replica")
+        connection = AsyncMock(scalar=AsyncMock(return_value=None))
+        replica.engine = MagicMock()
+        replica.engine.connect.return_value.__aenter__.return_value = connection
+        router = ReplicaRouter([replica])
+
+        await router.check()
+        assert not replica.available
+        assert router.choose() is None
+
+        connection.scalar.return_value = 0
+        await router.check()
+        assert replica.available
@@ -0,0 +1,38 @@
+from mock import AsyncMock, MagicMock
+from sqlalchemy import select
+
+from api.db.models import User
+from api.db.statements import StatementCache
+from api.repositories.users import UsersRepository
+
+
+class TestStatementCache:
+    def test_builds_each_shape_once(self):
+        cache = StatementCache("test")
+        build = MagicMock(side_effect=lambda: select(User))
+
+        first = cache.get(("find", "username"), build)
+        assert cache.get(("find", "username"), build) is first
+        assert cache.get(("find", "id"), build) is not first
+        assert build.call_count == 2
+        assert cache.get_stats() == {"shapes": 2, "hits": 1, "misses": 2, "hit_rate": 1 / 3}
+
+
+class TestUsersRepositoryStatements:
+    async def test_find_reuses_statement_per_filter_set(self):
+        users = MagicMock()
+        session = MagicMock(scalars=AsyncMock(return_value=users))
+        repository = UsersRepository(session)
+
+        assert await repository.find(username="polly") is users.first.return_value
+        await repository.find(username="shop")
+        await repository.find(username=None)
+
+        (first, first_params), (second, second_params), (third, third_params) = (
+            call.args for call in session.scalars.await_args_list
+        )
+        assert first is second
+        assert (first_params, second_params) == ({"username": "polly"}, {"username": "shop"})
+        assert third is not first
+        assert third_params == {}
+        assert "IS NULL" in str(third)
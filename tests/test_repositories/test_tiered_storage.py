@@ -0,0 +1,76 @@
+import pytest
+
+from api.repositories.storage import InMemoryStorage, TieredStorage
+
+
+@pytest.fixture
+def remote() -> InMemoryStorage:
+    return InMemoryStorage(max_entries=100)
+
+
+@pytest.fixture
+def storage(remote) -> TieredStorage:
+    return TieredStorage(remote, max_entries=100, ttl=60, negative_ttl=60)
+
+
+class TestTieredStorage:
+    async def test_local_and_negative_hits(self, storage, remote):
+        await remote.set("present", {"blocked_at": 1})
+        assert await storage.get_many("present", "absent") == [{"blocked_at": 1}, None]
+        assert await storage.get_many("present", "absent") == [{"blocked_at": 1}, None]
+
+        stats = storage.get_stats()
+        assert (stats["local_hits"], stats["negative_hits"], stats["remote_hits"], stats["remote_misses"]) == (
+            1,
+            1,
+            1,
+            1,
+        )
+        assert stats["local_hit_rate"] == 0.5
+
+    async def test_write_through(self, storage, remote):
+        assert await storage.get("key") is None
+        await storage.set("key", "value")
+        assert await remote.get("key") == "value"
+        assert await storage.get("key") == "value"
+
+        await storage.delete("key")
+        assert await remote.get("key") is None
+        assert await storage.get("key") is None
+        assert (storage.remote_hits, storage.remote_misses, storage.negative_hits) == (0, 1, 1)
+
+    async def test_evicted_key_is_read_again(self, storage, remote):
+        await storage.set("key", "old")
+        await remote.set("key", "new")
+        assert await storage.get("key") == "old"
+
+        storage.evict("key")
+        assert await storage.get("key") == "new"
+
+    async def test_invalidation_during_read_is_not_cached(self, storage, remote):
+        await remote.set("key", "old")
+        get_many = remote.get_many
+
+        async def racing_get_many(*keys):
+            values = await get_many(*keys)
+            await remote.set("key", "new")
+            storage.evict("key")
+            return values
+
+        remote.get_many = racing_get_many
+        assert await storage.get("key") == "old"
+        remote.get_many = get_many
+        assert await storage.get("key") == "new"
+
+    async def test_invalidation_during_write_is_not_cached(self, storage, remote):
+        set_ = remote.set
+
+        async def racing_set(key, value, ex=None):
+            await set_(key, value, ex=ex)
+            await set_(key, "other", ex=ex)
+            storage.evict(key)
+
+        remote.set = racing_set
+        await storage.set("key", "value")
+        remote.set = set_
+        assert await storage.get("key") == "other"
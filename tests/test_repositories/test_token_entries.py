@@ -0,0 +1,95 @@
+from uuid import uuid4
+
+import orjson
+import pytest
+from mock import AsyncMock, MagicMock, patch
+
+from api.repositories.blocklist_filter import BlocklistFilter
+from api.repositories.storage import InMemoryStorage, RedisStorage
+from api.repositories.token_entries import ENTRY, pack_entry, unpack_entry
+from api.repositories.tokens import BlocklistRepository, RefreshTokensRepository
+
+
+NOW = 1_760_000_000
+
+
+@pytest.fixture
+def storage() -> InMemoryStorage:
+    with patch("api.repositories.storage.time", return_value=NOW):
+        return InMemoryStorage(max_entries=100)
+
+
+@pytest.fixture(autouse=True)
+def now():
+    with patch("api.repositories.tokens.utcnow", return_value=NOW):
+        yield
+
+
+class TestTokenEntries:
+    def test_round_trip(self):
+        jti = str(uuid4())
+
+        assert len(pack_entry(NOW, jti)) == ENTRY.size == 21
+        assert unpack_entry(pack_entry(NOW, jti)) == (NOW, jti)
+        assert unpack_entry(pack_entry(NOW, None)) == (NOW, None)
+        assert unpack_entry({"blocked_at": NOW, "exclude": jti}, "blocked_at", "exclude") == (NOW, jti)
+
+    async def test_redis_storage_keeps_binary_values(self):
+        values = {}
+        redis = MagicMock(
+            set=AsyncMock(side_effect=lambda key, value, ex=None: values.__setitem__(key, value)),
+            mget=AsyncMock(side_effect=lambda keys: [values.get(key) for key in keys]),
+        )
+        storage = RedisStorage(redis)
+        entry = pack_entry(NOW, str(uuid4()))
+
+        await storage.set("binary", entry)
+        await storage.set("json", {"jti": "legacy"})
+
+        assert values["json"] == orjson.dumps({"jti": "legacy"})  # pylint: disable=no-member
+        assert await storage.get_many("binary", "json", "missing") == [entry, {"jti": "legacy"}, None]
+
+
+class TestTokenRepositories:
+    async def test_entries_expire_with_their_token(self, storage):
+        refresh_tokens = RefreshTokensRepository(storage)
+        blocklist = BlocklistRepository(storage)
+        sub, jti = str(uuid4()), str(uuid4())
+
+        with patch("api.repositories.storage.time", return_value=NOW):
+            await refresh_tokens.set_refresh_token({"jti": jti, "sub": sub, "exp": NOW + 100})
+            await blocklist.add_to_blocklist({"jti": jti, "sub": sub, "exp": NOW + 10})
+            await blocklist.add_to_blocklist({"jti": str(uuid4()), "sub": sub, "exp": NOW - 1})
+            assert len(storage) == 2
+
+        with patch("api.repositories.storage.time", return_value=NOW + 50):
+            assert await refresh_tokens.get_refresh_jti(sub) == jti
+            assert not await blocklist.in_blocklist({"jti": jti, "sub": sub})
+
+    async def test_legacy_entries_are_read(self, storage):
+        sub, jti, current = str(uuid4()), str(uuid4()), str(uuid4())
+        await storage.set(f"{sub}:refresh", {"jti": jti, "sub": sub, "exp": NOW + 100})
+        await storage.set(jti, {"jti": jti, "sub": sub})
+        await storage.set(f"{sub}:allblock", {"blocked_at": NOW, "exclude": current})
+
+        refresh_tokens = RefreshTokensRepository(storage, read_legacy=True)
+        blocklist = BlocklistRepository(storage, read_legacy=True)
+
+        assert await refresh_tokens.get_refresh_jti(sub) == jti
+        assert await blocklist.is_revoked({"jti": jti, "sub": sub, "iat": NOW + 1})
+        assert await blocklist.is_revoked({"jti": str(uuid4()), "sub": sub, "iat": NOW - 1})
+        assert not await blocklist.is_revoked({"jti": current, "sub": sub, "iat": NOW - 1})
+        assert not await RefreshTokensRepository(storage).get_refresh_jti(sub)
+
+        await refresh_tokens.unset_refresh_token(sub)
+        assert await refresh_tokens.get_refresh_jti(sub) is None
+
+    async def test_legacy_entries_bypass_the_filter(self, storage):
+        jti = str(uuid4())
+        await storage.set(jti, {"jti": jti, "sub": "sub"})
+        blocklist_filter = BlocklistFilter(redis=MagicMock(), capacity=100, error_rate=0.01, ttl=3600, channel="c")
+        blocklist_filter.ready = True
+        token = {"jti": jti, "sub": "sub", "iat": NOW}
+
+        assert not await BlocklistRepository(storage, blocklist_filter=blocklist_filter).is_revoked(token)
+        assert await BlocklistRepository(storage, blocklist_filter=blocklist_filter, read_legacy=True).is_revoked(token)
@@ -0,0 +1,84 @@
+from uuid import uuid4
+
+import pytest
+from mock import MagicMock
+
+from api.dto import UserSnapshot
+from api.repositories.storage import InMemoryStorage
+from api.repositories.user_cache import UserCache
+
+
+@pytest.fixture
+def cache() -> UserCache:
+    return UserCache(max_size=2, ttl=60, channel="test")
+
+
+class TestUserCache:
+    async def test_hit_and_miss(self, cache):
+        snapshot = UserSnapshot(id=uuid4(), username="polly")
+        assert await cache.get(snapshot.id) is None
+        await cache.set(snapshot, generation=cache.generation)
+        assert await cache.get(snapshot.id) == snapshot
+        assert cache.get_stats() == {"entries": 1, "local_hits": 1, "storage_hits": 0, "misses": 1}
+
+    async def test_lru_bound(self, cache):
+        snapshots = [UserSnapshot(id=uuid4()) for _ in range(3)]
+        for snapshot in snapshots:
+            await cache.set(snapshot, generation=cache.generation)
+        assert await cache.get(snapshots[0].id) is None
+        assert await cache.get(snapshots[2].id) == snapshots[2]
+
+    async def test_invalidate(self, cache):
+        snapshot = UserSnapshot(id=uuid4())
+        await cache.set(snapshot, generation=cache.generation)
+        await cache.invalidate(snapshot.id)
+        assert await cache.get(snapshot.id) is None
+
+    async def test_stale_generation_is_not_cached(self, cache):
+        snapshot = UserSnapshot(id=uuid4())
+        generation = cache.generation
+        await cache.invalidate(snapshot.id)
+        await cache.set(snapshot, generation=generation)
+        assert await cache.get(snapshot.id) is None
+
+    async def test_nothing_is_cached_locally_while_unsubscribed(self):
+        cache = UserCache(max_size=2, ttl=60, channel="test", redis=MagicMock())
+        snapshot = UserSnapshot(id=uuid4())
+        await cache.set(snapshot, generation=cache.generation)
+        assert await cache.get(snapshot.id) is None
+
+        await cache._mark_ready()  # pylint: disable=protected-access
+        await cache.set(snapshot, generation=cache.generation)
+        assert await cache.get(snapshot.id) == snapshot
+
+        cache._mark_not_ready()  # pylint: disable=protected-access
+        assert await cache.get(snapshot.id) is None
+
+    async def test_shared_storage(self):
+        storage = InMemoryStorage(max_entries=10)
+        loading, other = (UserCache(max_size=2, ttl=60, channel="test", storage=storage) for _ in range(2))
+        snapshot = UserSnapshot(id=uuid4(), username="polly")
+
+        assert await loading.get(snapshot.id) is None
+        await loading.set(snapshot, generation=loading.generation)
+        assert await other.get(snapshot.id) == snapshot
+        assert other.get_stats()["storage_hits"] == 1
+
+    async def test_snapshot_loaded_before_invalidation_elsewhere_is_not_read(self):
+        storage = InMemoryStorage(max_entries=10)
+        loading, other = (UserCache(max_size=2, ttl=60, channel="test", storage=storage) for _ in range(2))
+        stale = UserSnapshot(id=uuid4(), username="polly")
+
+        assert await loading.get(stale.id) is None
+        generation = loading.generation
+        await other.invalidate(stale.id)
+        await loading.set(stale, generation=generation)
+        assert await other.get(stale.id) is None
+
+        fresh = UserSnapshot(id=stale.id, username="molly")
+        await other.set(fresh, generation=other.generation)
+        assert await UserCache(max_size=2, ttl=60, channel="test", storage=storage).get(stale.id) == fresh
+
+    def test_encoding_roundtrip(self):
+        snapshot = UserSnapshot(id=uuid4(), username="polly", bonus_account=10, role_id=uuid4())
+        assert UserCache.decode(UserCache.encode(snapshot)) == snapshot
@@ -0,0 +1,34 @@
+from uuid import uuid4
+
+from mock import AsyncMock, MagicMock
+
+from api.dto import UserCredentials, UserSnapshot
+from api.repositories.users import UsersRepository
+
+
+def make_session(*rows) -> MagicMock:
+    return MagicMock(execute=AsyncMock(side_effect=[MagicMock(first=MagicMock(return_value=row)) for row in rows]))
+
+
+class TestUserRows:
+    async def test_credentials_select_only_login_columns(self):
+        user_id, role_id = uuid4(), uuid4()
+        session = make_session((user_id, "hash", role_id), None)
+        repository = UsersRepository(session)
+
+        credentials = await repository.get_credentials("polly")
+
+        assert credentials == UserCredentials(id=user_id, username="polly", password="hash", role_id=role_id)
+        assert await repository.get_credentials("shop") is None
+        query, params = session.execute.await_args.args
+        assert [column.name for column in query.selected_columns] == ["id", "password", "role_id"]
+        assert params == {"username": "shop"}
+
+    async def test_snapshot_without_cache_is_read_as_a_row(self):
+        user_id, role_id = uuid4(), uuid4()
+        repository = UsersRepository(make_session((user_id, "polly", 10, role_id)))
+
+        snapshot = await repository.get_snapshot(user_id)
+
+        assert snapshot == UserSnapshot(id=user_id, username="polly", bonus_account=10, role_id=role_id)
+        assert not hasattr(snapshot, "__dict__")
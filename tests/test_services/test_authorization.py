@@ -0,0 +1,62 @@
+from uuid import uuid4
+
+from mock import AsyncMock
+
+from api import dto
+from api.repositories.roles import RoleRegistry
+from api.services.auth.authorization import AuthorizationService, get_permission_claims
+
+
+PERMISSIONS = {"users.read": 0, "users.import": 1}
+ROLES = [
+    dto.RoleSnapshot(id=uuid4(), code="user", permissions=0b01),
+    dto.RoleSnapshot(id=uuid4(), code="admin", permissions=0b11),
+]
+
+
+class FakeUsersRepository:
+    def __init__(self):
+        self.registry = RoleRegistry(ttl=60)
+        self.load = AsyncMock(return_value=(ROLES, PERMISSIONS))
+        self.users = {}
+
+    async def get_snapshot(self, user_id):
+        return self.users.get(user_id)
+
+    async def get_role(self, role_id):
+        return await self.registry.get_by_id(role_id, self.load)
+
+    async def get_permission_mask(self, codes):
+        return await self.registry.get_mask(codes, self.load)
+
+    async def get_permissions_version(self):
+        return await self.registry.get_version(self.load)
+
+
+class TestAuthorizationService:
+    async def test_token_permissions_apply_while_the_role_is_unchanged(self):
+        repository = FakeUsersRepository()
+        service = AuthorizationService(users_repository=repository)
+        admin = dto.UserSnapshot(id=uuid4(), role_id=ROLES[1].id)
+        repository.users[admin.id] = admin
+
+        claims = get_permission_claims(await service.get_user_permissions(admin.id))
+        assert claims["prm"] == "3"
+        assert await service.has_permissions(admin, ["users.import"], claims)
+        assert not await service.has_permissions(admin, ["users.import"], claims | {"prm": "1"})
+        assert await service.has_permissions(admin, ["users.import"], claims | {"prm": "1", "prv": "stale"})
+        assert not await service.has_permissions(admin, ["missing"], claims)
+
+        # the token of a user moved to another role is resolved from the current role
+        demoted = dto.UserSnapshot(id=admin.id, role_id=ROLES[0].id)
+        assert not await service.has_permissions(demoted, ["users.import"], claims)
+        assert await service.has_permissions(demoted, ["users.read"], claims)
+        assert repository.load.await_count == 1
+
+    async def test_user_without_role_has_no_permissions(self):
+        service = AuthorizationService(users_repository=FakeUsersRepository())
+
+        permissions = await service.get_user_permissions(uuid4())
+
+        assert permissions.bits == 0
+        assert not await service.has_permissions(dto.UserSnapshot(id=uuid4()), ["users.read"])
@@ -0,0 +1,68 @@
+from uuid import uuid4
+
+import pytest
+from mock import MagicMock
+
+from api.services.jwt.cache import VerifiedTokenCache
+from api.services.jwt.utils import utcnow
+
+
+def make_payload(sub: str) -> dict:
+    now = utcnow()
+    return {"jti": str(uuid4()), "type": "access", "sub": sub, "iat": now, "exp": now + 3600}
+
+
+@pytest.fixture
+def cache() -> VerifiedTokenCache:
+    return VerifiedTokenCache(max_size=2, ttl=60, channel="test")
+
+
+class TestVerifiedTokenCache:
+    def test_hit_and_miss(self, cache):
+        payload = make_payload("user")
+        assert cache.get("token") is None
+        cache.put("token", payload, generation=cache.generation)
+        assert cache.get("token") == payload
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_lru_bound(self, cache):
+        for token in ("first", "second", "third"):
+            cache.put(token, make_payload("user"), generation=cache.generation)
+        assert len(cache) == 2
+        assert cache.get("first") is None
+
+    def test_expired_entry(self, cache):
+        payload = make_payload("user") | {"exp": utcnow() - 1}
+        cache.put("token", payload, generation=cache.generation)
+        assert cache.get("token") is None
+
+    def test_stale_generation_is_not_cached(self, cache):
+        generation = cache.generation
+        cache.evict("user")
+        cache.put("token", make_payload("user"), generation=generation)
+        assert cache.get("token") is None
+
+    async def test_revoke(self, cache):
+        current, other = make_payload("user"), make_payload("user")
+        cache.put("current", current, generation=cache.generation)
+        cache.put("other", other, generation=cache.generation)
+
+        await cache.revoke("user", exclude=current["jti"])
+        assert cache.get("current") == current
+        assert cache.get("other") is None
+
+        await cache.revoke("user", jti=current["jti"])
+        assert cache.get("current") is None
+
+    async def test_nothing_is_cached_while_unsubscribed(self):
+        cache = VerifiedTokenCache(max_size=2, ttl=60, channel="test", redis=MagicMock())
+        cache.put("token", make_payload("user"), generation=cache.generation)
+        assert len(cache) == 0
+
+        await cache._mark_ready()  # pylint: disable=protected-access
+        cache.put("token", make_payload("user"), generation=cache.generation)
+        assert len(cache) == 1
+
+        cache._mark_not_ready()  # pylint: disable=protected-access
+        cache.put("token", make_payload("user"), generation=cache.generation)
+        assert len(cache) == 0
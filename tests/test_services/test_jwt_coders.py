@@ -0,0 +1,49 @@
+import uuid
+
+import jwt
+import pytest
+
+from api.services.jwt.coders import HS256Codec, OrjsonEncoder
+from api.services.jwt.exc import TokenDecodeError
+from api.services.jwt.utils import utcnow
+
+
+KEY = "test-secret-key-of-32-bytes-long"
+
+
+@pytest.fixture
+def payload() -> dict:
+    iat = utcnow()
+    return {"jti": str(uuid.uuid4()), "type": "access", "sub": str(uuid.uuid4()), "iat": iat, "exp": iat + 60}
+
+
+class TestHS256Codec:
+    def test_wire_compatible_with_pyjwt(self, payload):
+        codec = HS256Codec(KEY)
+        token = jwt.encode(payload, KEY, json_encoder=OrjsonEncoder)
+
+        assert codec.encode(payload) == token
+        assert codec.decode(token) == payload
+        assert jwt.decode(codec.encode(payload), KEY, algorithms=["HS256"]) == payload
+
+    @pytest.mark.parametrize(
+        "tamper",
+        [
+            lambda token: token[:-2] + ("AA" if token[-2:] != "AA" else "BB"),
+            lambda token: "abc",
+            lambda token: HS256Codec("another-secret-key-of-32-bytes!!").encode({"sub": "x"}),
+        ],
+    )
+    def test_invalid_token(self, payload, tamper):
+        with pytest.raises(TokenDecodeError):
+            HS256Codec(KEY).decode(tamper(HS256Codec(KEY).encode(payload)))
+
+    def test_expired_token(self, payload):
+        codec = HS256Codec(KEY)
+        with pytest.raises(TokenDecodeError):
+            codec.decode(codec.encode(payload | {"exp": utcnow() - 1}))
+
+    def test_other_algorithm_is_rejected(self, payload):
+        token = jwt.encode(payload, KEY, algorithm="HS512")
+        with pytest.raises(TokenDecodeError):
+            HS256Codec(KEY).decode(token)
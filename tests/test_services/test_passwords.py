@@ -0,0 +1,37 @@
+import asyncio
+from time import sleep
+
+import pytest
+from mock import patch
+
+from api.services.passwords.exc import HashingQueueFullError, UnknownExecutorError
+from api.services.passwords.service import PasswordHasher
+
+
+@pytest.fixture
+def hasher() -> PasswordHasher:
+    hasher = PasswordHasher()
+    hasher.shutdown()
+    hasher.start(executor="thread", workers=1, queue_size=0, queue_timeout=0.01)
+    yield hasher
+    hasher.shutdown()
+
+
+class TestPasswordHasher:
+    async def test_hash_and_verify(self, hasher):
+        hashed = await hasher.hash("password")
+        assert hashed != "password"
+        assert await hasher.verify("password", hashed)
+        assert not await hasher.verify("wrong password", hashed)
+        assert hasher.in_flight == 0
+
+    async def test_queue_full(self, hasher):
+        with patch("api.services.passwords.service.hash_password", side_effect=lambda password: sleep(0.1)):
+            results = await asyncio.gather(hasher.hash("first"), hasher.hash("second"), return_exceptions=True)
+        assert sum(isinstance(result, HashingQueueFullError) for result in results) == 1
+
+    def test_unknown_executor(self):
+        hasher = PasswordHasher()
+        hasher.shutdown()
+        with pytest.raises(UnknownExecutorError):
+            hasher.start(executor="fiber", workers=1, queue_size=0, queue_timeout=0.01)
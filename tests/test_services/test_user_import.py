@@ -0,0 +1,117 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from api.services.passwords.service import PasswordHasher
+from api.services.user_import import CsvRows, UserImportService, iter_lines
+
+
+class FakeUsersRepository:
+    def __init__(self, existing: set[str]):
+        self.existing = existing
+        self.batches = []
+
+    async def get_role_ids(self) -> dict:
+        return {"user": uuid4(), "admin": uuid4()}
+
+    async def copy_users(self, rows) -> set[str]:
+        self.batches.append(rows)
+        inserted = {username for _, username, *_ in rows} - self.existing
+        self.existing |= inserted
+        return inserted
+
+
+async def chunked(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.fixture
+def hasher() -> PasswordHasher:
+    hasher = PasswordHasher()
+    hasher.shutdown()
+    hasher.start(executor="thread", workers=2, queue_size=8, queue_timeout=5)
+    yield hasher
+    hasher.shutdown()
+
+
+class TestUserImportService:
+    async def test_iter_lines(self):
+        lines = [line async for line in iter_lines(chunked(b"first\nsecond\n\nthird"))]
+        assert lines == [b"first", b"second", b"", b"third"]
+
+    def test_csv_rows(self):
+        rows = CsvRows()
+        assert rows.feed('polly,"multi\n') is None
+        assert rows.pending
+        assert rows.feed('line",pass"word\n') == ["polly", "multi\nline", 'pass"word']
+        assert not rows.pending
+
+    async def test_csv_import(self, hasher):
+        repository = FakeUsersRepository(existing={"taken"})
+        service = UserImportService(repository, hasher, batch_size=2, hash_concurrency=2)
+        data = (
+            b"username,password,bonus_account,role\n"
+            b"polly,password1,10,user\n"
+            b"taken,password2,,\n"
+            b"short,pass,,\n"
+            b"boss,password3,,admin\n"
+            b"polly,password4,,\n"
+            b"ghost,password5,,ghost\n"
+        )
+
+        report = await service.import_users(chunked(data), "csv")
+
+        assert report.inserted == 2
+        assert [(error.line, error.username) for error in report.errors] == [
+            (3, "taken"),
+            (4, "short"),
+            (6, "polly"),
+            (7, "ghost"),
+        ]
+        assert all(row[2] != "password1" for batch in repository.batches for row in batch)
+
+    async def test_ndjson_import(self, hasher):
+        repository = FakeUsersRepository(existing=set())
+        service = UserImportService(repository, hasher, batch_size=10, hash_concurrency=2)
+        data = b'{"username": "polly", "password": "password1"}\nnot json\n[1, 2]\n'
+
+        report = await service.import_users(chunked(data), "ndjson")
+
+        assert report.inserted == 1
+        assert [error.line for error in report.errors] == [2, 3]
+
+    async def test_csv_quoted_fields(self, hasher):
+        repository = FakeUsersRepository(existing=set())
+        service = UserImportService(repository, hasher, batch_size=10, hash_concurrency=2)
+        data = (
+            b"username,password\r\n"
+            b'"polly, the parrot","pass\r\nword1"\r\n'
+            b"\r\n"
+            b'molly,pass"word2\r\n'
+            b'"dolly,password3\r\n'
+            b"holly,password4\r\n"
+        )
+
+        report = await service.import_users(chunked(data), "csv")
+
+        assert report.inserted == 2
+        assert [row[1] for row in repository.batches[0]] == ["polly, the parrot", "molly"]
+        assert [(error.line, error.error) for error in report.errors] == [(6, "Unterminated quoted field")]
+
+    async def test_import_waits_for_busy_hasher(self, hasher):
+        hasher.shutdown()
+        hasher.start(executor="thread", workers=1, queue_size=0, queue_timeout=0.01)
+        repository = FakeUsersRepository(existing=set())
+        service = UserImportService(repository, hasher, batch_size=1, hash_concurrency=1)
+        data = b"username,password\npolly,password1\nmolly,password2\n"
+
+        await hasher._slots.acquire()  # pylint: disable=protected-access
+        import_task = asyncio.create_task(service.import_users(chunked(data), "csv"))
+        await asyncio.sleep(0.05)
+        hasher._slots.release()  # pylint: disable=protected-access
+
+        report = await import_task
+        assert report.inserted == 2
+        assert not report.errors
@@ -0,0 +1,55 @@
+from collections import namedtuple
+from uuid import uuid4
+
+import orjson
+import pytest
+
+from api.schemas.admin import UserListOrder
+from api.services.users import UsersService
+from api.utils import encode_cursor
+
+
+UserRow = namedtuple("UserRow", ["id", "username", "bonus_account", "role_id"])
+
+
+class FakeUsersRepository:
+    def __init__(self, rows: list[UserRow]):
+        self.rows = rows
+
+    async def stream_users(self, *, limit: int, batch_size: int, **_):
+        rows = self.rows[:limit]
+        for start in range(0, len(rows), batch_size):
+            yield rows[start : start + batch_size]
+
+
+class TestListUsers:
+    @staticmethod
+    async def collect(service: UsersService, limit: int) -> list[dict]:
+        chunks = service.iter_users_ndjson(
+            order_by=UserListOrder.USERNAME, after=None, role_code=None, min_bonus=None, max_bonus=None, limit=limit
+        )
+        lines = [line async for chunk in chunks for line in chunk.splitlines()]
+        return [orjson.loads(line) for line in lines]  # pylint: disable=no-member
+
+    async def test_full_page_has_next_cursor(self):
+        rows = [UserRow(uuid4(), f"user{i}", i, None) for i in range(5)]
+        service = UsersService(FakeUsersRepository(rows), hasher=None, list_batch_size=2)
+
+        lines = await self.collect(service, limit=3)
+
+        assert [line["username"] for line in lines[:-1]] == ["user0", "user1", "user2"]
+        after = service.parse_cursor(lines[-1]["next_cursor"], UserListOrder.USERNAME)
+        assert after == ("user2", rows[2].id)
+
+    async def test_last_page_has_no_cursor(self):
+        rows = [UserRow(uuid4(), "polly", 0, None)]
+        service = UsersService(FakeUsersRepository(rows), hasher=None, list_batch_size=2)
+
+        lines = await self.collect(service, limit=3)
+
+        assert lines == [{"id": str(rows[0].id), "username": "polly", "bonus_account": 0, "role_id": None}]
+
+    @pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor(["polly"]), encode_cursor({"id": 1})])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(ValueError):
+            UsersService.parse_cursor(cursor, UserListOrder.USERNAME)
@@ -0,0 +1,35 @@
+from uuid import uuid4
+
+from mock import patch
+
+from api.utils.bloom import BloomFilter, RotatingBloomFilter
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [str(uuid4()) for _ in range(1000)]
+        for item in items:
+            bloom.add(item)
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for _ in range(1000):
+            bloom.add(str(uuid4()))
+        false_positives = sum(str(uuid4()) in bloom for _ in range(10000))
+        assert false_positives < 300
+        assert bloom.false_positive_rate < 0.02
+
+
+class TestRotatingBloomFilter:
+    def test_items_age_out(self):
+        with patch("api.utils.bloom.monotonic", return_value=0):
+            bloom = RotatingBloomFilter(capacity=100, error_rate=0.001, period=10)
+            bloom.add("revoked")
+
+        with patch("api.utils.bloom.monotonic", return_value=15):
+            assert "revoked" in bloom
+
+        with patch("api.utils.bloom.monotonic", return_value=25):
+            assert "revoked" not in bloom
@@ -0,0 +1,38 @@
+import os
+
+from api.utils.memory import parse_smaps, read_memory
+
+
+SMAPS_ROLLUP = """\
+55d0c8a4e000-7ffd2b5f9000 ---p 00000000 00:00 0                          [rollup]
+Rss:               32644 kB
+Pss:               14820 kB
+Pss_Anon:          12000 kB
+Shared_Clean:      25600 kB
+Shared_Dirty:        892 kB
+Private_Clean:       128 kB
+Private_Dirty:      6024 kB
+Referenced:        32644 kB
+Swap:                  0 kB
+"""
+
+
+class TestMemory:
+    def test_parse_smaps(self):
+        assert parse_smaps(SMAPS_ROLLUP) == {
+            "rss": 32644 * 1024,
+            "pss": 14820 * 1024,
+            "shared": (25600 + 892) * 1024,
+            "private": (128 + 6024) * 1024,
+        }
+
+    def test_read_own_memory(self):
+        usage = read_memory()
+        if not os.path.exists("/proc/self/statm"):
+            assert usage == {}
+            return
+        assert usage["rss"] > 0
+        assert read_memory(os.getpid())["rss"] > 0
+
+    def test_missing_process(self):
+        assert read_memory(2**31) == {}
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from api.utils.timing_wheel import TimingWheel
+
+
+class TestTimingWheel:
+    def test_expires_at_deadline(self):
+        wheel = TimingWheel(tick=1, slots=4, levels=2)
+        wheel.schedule("a", 3)
+        assert wheel.advance(2) == []
+        assert wheel.advance(3) == ["a"]
+        assert "a" not in wheel
+
+    def test_cascades_from_higher_levels_and_overflow(self):
+        wheel = TimingWheel(tick=1, slots=4, levels=2)
+        deadlines = {"level0": 2, "level1": 9, "overflow": 50}
+        for key, deadline in deadlines.items():
+            wheel.schedule(key, deadline)
+
+        fired = {}
+        for now in range(60):
+            for key in wheel.advance(now):
+                fired[key] = now
+        assert fired == deadlines
+
+    def test_matches_naive_expiry(self):
+        rnd = random.Random(42)
+        wheel = TimingWheel(tick=1, slots=8, levels=3)
+        deadlines = {key: rnd.randint(1, 2000) for key in range(500)}
+        for key, deadline in deadlines.items():
+            wheel.schedule(key, deadline)
+
+        fired = {}
+        now = 0
+        while wheel:
+            now += rnd.randint(1, 40)
+            for key in wheel.advance(now):
+                fired[key] = now
+        assert all(deadline <= fired[key] < deadline + 40 for key, deadline in deadlines.items())
+
+    def test_cancel_and_reschedule(self):
+        wheel = TimingWheel(tick=1, slots=4, levels=2)
+        wheel.schedule("a", 5)
+        wheel.schedule("b", 5)
+        wheel.cancel("a")
+        wheel.schedule("b", 20)
+        assert wheel.advance(10) == []
+        assert wheel.advance(20) == ["b"]
+
+    def test_due_deadline_is_not_scheduled(self):
+        wheel = TimingWheel(tick=1, now=10)
+        assert not wheel.schedule("a", 10)
+        assert len(wheel) == 0
+
+    def test_slots_must_be_power_of_two(self):
+        with pytest.raises(ValueError):
+            TimingWheel(slots=10)
@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+
+from api.utils.uuid7 import UUIDv7Generator, uuid7_time
+
+
+MILLIS = 1_760_000_000_000
+
+
+class TestUUIDv7:
+    def test_layout(self):
+        value = UUIDv7Generator(clock=lambda: MILLIS * 1_000_000)()
+
+        assert value.version == 7
+        assert value.variant == "specified in RFC 4122"
+        assert uuid7_time(value) == datetime.fromtimestamp(MILLIS / 1000, tz=timezone.utc)
+
+    def test_monotonic_within_a_millisecond_and_when_the_clock_goes_back(self):
+        now = [MILLIS * 1_000_000]
+        generate = UUIDv7Generator(clock=lambda: now[0])
+
+        values = [generate() for _ in range(10_000)]
+        now[0] -= 1_000_000_000
+        values.append(generate())
+
+        assert values == sorted(values)
+        assert len(set(values)) == len(values)
+        # the counter overflowed, the timestamp was carried forward
+        assert uuid7_time(values[-1]) > uuid7_time(values[0])